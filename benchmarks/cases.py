@@ -0,0 +1,188 @@
+import os
+import shutil
+import time
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+from PyQt6.Qsci import QsciScintilla
+from src.editor.file_tree import FileTreeView, IS_DIR_ROLE, PATH_ROLE
+from src.editor.text_editor import TextEditor
+from src.editor.ui_scheduler import ui_scheduler
+from . import fixtures
+
+# 单次操作的最长等待时间（秒）
+TIMEOUT = 1800
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+
+
+def wait_until(predicate, timeout=TIMEOUT):
+    # 处理事件直到条件满足，定时器保证没有其他事件时也能定期检查
+    timer = QTimer()
+    timer.start(10)
+    deadline = time.perf_counter() + timeout
+    try:
+        while not predicate():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("benchmark operation timed out")
+            QApplication.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+    finally:
+        timer.stop()
+
+
+def run_until(signal, action, timeout=TIMEOUT):
+    fired = []
+    handler = lambda *args: fired.append(args)
+    signal.connect(handler)
+    try:
+        action()
+        wait_until(lambda: fired, timeout)
+    finally:
+        signal.disconnect(handler)
+    return fired[0]
+
+
+class Context:
+    def __init__(self, workdir):
+        self.workdir = workdir
+        self.fixtures = os.path.join(workdir, 'fixtures')
+        self.scratch = os.path.join(workdir, 'scratch')
+        os.makedirs(self.fixtures, exist_ok=True)
+        os.makedirs(self.scratch, exist_ok=True)
+        self.editor_window = None
+
+    def window(self):
+        if self.editor_window is None:
+            self.editor_window = TextEditor()
+            self.editor_window.show()
+        return self.editor_window
+
+    def open(self, path, encoding=None):
+        window = self.window()
+        tab = window.open_specific_file(path, encoding)
+        wait_until(lambda: not tab.is_loading and not (tab.large_file and tab.large_file.worker))
+        return tab
+
+    def close(self, tab):
+        tabs = self.window().tabs
+        tab.is_modified = False
+        tabs.close_tab(tabs.indexOf(tab))
+        QApplication.processEvents()
+
+    def scratch_copy(self, path):
+        target = os.path.join(self.scratch, os.path.basename(path))
+        shutil.copyfile(path, target)
+        return target
+
+
+def tree_populate(context, entries):
+    # 设置根目录并加载所有子目录，相当于完整填充文件树
+    root = fixtures.tree(context.fixtures, entries)
+    view = FileTreeView()
+    model = view.file_model
+    started = time.perf_counter()
+    run_until(model.directory_loaded, lambda: model.set_root_path(root))
+    directories = [model.index(row, 0) for row in range(model.rowCount())]
+    directories = [index for index in directories if model.data(index, IS_DIR_ROLE)]
+    pending = {model.data(index, PATH_ROLE) for index in directories}
+    loaded = lambda path: pending.discard(path)
+    model.directory_loaded.connect(loaded)
+    for index in directories:
+        model.fetchMore(index)
+    wait_until(lambda: not pending)
+    elapsed = time.perf_counter() - started
+    model.directory_loaded.disconnect(loaded)
+    view.deleteLater()
+    return elapsed
+
+
+def open_file(context, encoding, size):
+    path = fixtures.text_file(context.fixtures, encoding, size)
+    started = time.perf_counter()
+    tab = context.open(path)
+    elapsed = time.perf_counter() - started
+    context.close(tab)
+    return elapsed
+
+
+def save_file(context, size):
+    path = context.scratch_copy(fixtures.text_file(context.fixtures, 'utf-8', size))
+    tab = context.open(path)
+    window = context.window()
+    tab.editor.insertAt('x', 0, 0)
+    started = time.perf_counter()
+    run_until(window.saver.saved, window.save_file)
+    elapsed = time.perf_counter() - started
+    context.close(tab)
+    return elapsed
+
+
+def format_json(context, size):
+    path = fixtures.json_payload(context.fixtures, size)
+    tab = context.open(path)
+    window = context.window()
+    started = time.perf_counter()
+    run_until(window.json_formatter.finished, window.format_json)
+    # 格式化结果在收到信号时已应用到编辑器
+    elapsed = time.perf_counter() - started
+    context.close(tab)
+    return elapsed
+
+
+def change_encoding(context, size):
+    path = fixtures.text_file(context.fixtures, 'gbk', size)
+    tab = context.open(path)
+    window = context.window()
+    started = time.perf_counter()
+    window.change_encoding('GBK')
+    wait_until(lambda: not tab.is_loading and not (tab.large_file and tab.large_file.worker))
+    elapsed = time.perf_counter() - started
+    context.close(tab)
+    return elapsed
+
+
+def cursor_storm(context, line_length, moves):
+    # 模拟按住方向键：每次移动光标后处理一次事件，在超长行和普通行之间来回切换
+    path = fixtures.long_line_file(context.fixtures, line_length)
+    tab = context.open(path)
+    editor = tab.editor
+    started = time.perf_counter()
+    for i in range(moves):
+        # setCursorPosition 按字符逐个换算列号，在超长行上每次要数秒，测的是换算而不是编辑器；
+        # 直接用字节位置移动，和方向键走的是同一条路径
+        if i % 100 < 50:
+            position = (i * 997) % line_length
+        else:
+            position = editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, 1 + i % 50) + i % 10
+        editor.SendScintilla(QsciScintilla.SCI_GOTOPOS, position)
+        QApplication.processEvents()
+    wait_until(lambda: not ui_scheduler().pending)
+    elapsed = time.perf_counter() - started
+    context.close(tab)
+    return elapsed
+
+
+def all_cases(max_size):
+    # 名称 -> (函数, 参数)
+    cases = {
+        'tree_populate_1k': (tree_populate, {'entries': 1000}),
+        'tree_populate_100k': (tree_populate, {'entries': 100000}),
+    }
+    sizes = [('1k', KB), ('1m', MB), ('32m', 32 * MB), ('256m', 256 * MB), ('1g', GB)]
+    for label, size in sizes:
+        if size > max_size:
+            continue
+        cases[f'open_utf8_{label}'] = (open_file, {'encoding': 'utf-8', 'size': size})
+        cases[f'open_gbk_{label}'] = (open_file, {'encoding': 'gbk', 'size': size})
+    # 超过大文件阈值后为只读模式，保存、格式化只测可编辑的大小
+    for label, size in sizes[:3]:
+        if size > max_size:
+            continue
+        cases[f'save_{label}'] = (save_file, {'size': size})
+        cases[f'format_json_{label}'] = (format_json, {'size': size})
+        cases[f'change_encoding_{label}'] = (change_encoding, {'size': size})
+    for label, length in [('256k', 256 * KB), ('4m', 4 * MB)]:
+        if length > max_size:
+            continue
+        cases[f'cursor_storm_{label}_line'] = (cursor_storm, {'line_length': length, 'moves': 2000})
+    return cases
\ No newline at end of file
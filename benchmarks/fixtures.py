@@ -0,0 +1,97 @@
+import json
+import math
+import os
+
+# 生成测试文件用的行内容，中英文混合
+UTF8_LINE = "def handle(request, 参数=None):  # 处理请求并返回结果 0123456789\n"
+GBK_LINE = "这是一行用于测试 GBK 编码读取性能的中文文本，包含数字 0123456789。\n"
+# 每次写入的块大小
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def write_atomically(path, chunks):
+    # 先写临时文件，生成中断时不会留下不完整的测试文件
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, path)
+
+
+def text_file(directory, encoding, size):
+    path = os.path.join(directory, f"text-{encoding}-{size}.txt")
+    line = (UTF8_LINE if encoding == 'utf-8' else GBK_LINE).encode(encoding)
+    # 按整行截断，避免在多字节字符中间结束
+    lines = max(1, size // len(line))
+    if os.path.exists(path) and os.path.getsize(path) == lines * len(line):
+        return path
+
+    def chunks():
+        per_block = max(1, BLOCK_SIZE // len(line))
+        block = line * per_block
+        remaining = lines
+        while remaining > 0:
+            count = min(per_block, remaining)
+            yield block if count == per_block else line * count
+            remaining -= count
+
+    write_atomically(path, chunks())
+    return path
+
+
+def long_line_file(directory, length, short_lines=1000):
+    # 一个超长行加若干普通行，模拟压缩后的单行文件
+    path = os.path.join(directory, f"long-line-{length}.txt")
+    if not os.path.exists(path):
+        write_atomically(path, [b'x' * length + b'\n', b'short line\n' * short_lines])
+    return path
+
+
+def json_payload(directory, size):
+    # 压缩格式的 JSON 数组，格式化测试用
+    path = os.path.join(directory, f"payload-{size}.json")
+    if os.path.exists(path):
+        return path
+
+    def chunks():
+        written = 1
+        yield b'['
+        index = 0
+        while written < size:
+            record = json.dumps({
+                "id": index,
+                "name": f"item-{index}",
+                "tags": ["alpha", "beta", "gamma"],
+                "value": index * 0.5,
+                "nested": {"ok": True, "text": "说明文字", "items": [1, 2, 3]},
+            }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            if index:
+                record = b',' + record
+            written += len(record)
+            index += 1
+            yield record
+        yield b']\n'
+
+    write_atomically(path, chunks())
+    return path
+
+
+def tree(directory, entries):
+    # 约 sqrt(entries) 个子目录，每个目录中放相同数量的空文件
+    root = os.path.join(directory, f"tree-{entries}")
+    marker = os.path.join(root, '.complete')
+    if os.path.exists(marker):
+        return root
+    per_dir = max(1, int(math.sqrt(entries)))
+    created = 0
+    index = 0
+    while created < entries:
+        sub = os.path.join(root, f"dir{index:05d}")
+        os.makedirs(sub, exist_ok=True)
+        created += 1
+        for i in range(min(per_dir, entries - created)):
+            open(os.path.join(sub, f"file{i:05d}.txt"), 'wb').close()
+            created += 1
+        index += 1
+    open(marker, 'wb').close()
+    return root
\ No newline at end of file
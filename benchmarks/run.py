@@ -0,0 +1,167 @@
+# 无界面运行的性能基准测试：
+#   python -m benchmarks.run --output results.json
+#   python -m benchmarks.run --baseline baseline.json --threshold 0.15
+# 每个用例在独立的子进程中运行，记录耗时和内存峰值
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows 上没有 resource 模块，不统计内存峰值
+    resource = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 默认允许的性能退化比例
+DEFAULT_THRESHOLD = 0.15
+SIZE_UNITS = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def peak_rss(who):
+    if resource is None:
+        return None
+    usage = resource.getrusage(who).ru_maxrss
+    # Linux 上单位为 KB，macOS 上为字节
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def run_case(name, workdir, repeat, max_size):
+    # 在子进程中执行：每个用例独占一个进程，内存峰值互不影响
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    from . import cases
+
+    app = QApplication(sys.argv[:1])
+    function, params = cases.all_cases(max_size)[name]
+    context = cases.Context(workdir)
+    times = [function(context, **params) for _ in range(repeat)]
+    result = {
+        'name': name,
+        'params': params,
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'peak_rss': peak_rss(resource.RUSAGE_SELF) if resource else None,
+        'peak_rss_children': peak_rss(resource.RUSAGE_CHILDREN) if resource else None,
+    }
+    app.quit()
+    return result
+
+
+def spawn_case(name, args):
+    # 配置和缓存目录指向测试目录，不影响用户的会话和索引
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env['XDG_CONFIG_HOME'] = os.path.join(args.workdir, 'config')
+    env['XDG_CACHE_HOME'] = os.path.join(args.workdir, 'cache')
+    command = [sys.executable, '-m', 'benchmarks.run', '--case', name,
+               '--workdir', args.workdir, '--repeat', str(args.repeat),
+               '--max-size', str(args.max_size)]
+    process = subprocess.run(command, cwd=PROJECT_ROOT, env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if process.returncode != 0:
+        return {'name': name, 'error': process.stderr.strip().splitlines()[-1:] or ['failed']}
+    # 最后一行输出为结果
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    # 返回超过阈值的退化项：(用例, 指标, 基准值, 当前值)
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or 'error' in result or 'error' in base:
+            continue
+        for metric in ('median', 'peak_rss'):
+            old, new = base.get(metric), result.get(metric)
+            if old and new and new > old * (1 + threshold):
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def format_value(metric, value):
+    if value is None:
+        return '-'
+    if metric == 'peak_rss':
+        return f"{value / 1024 / 1024:.1f} MB"
+    return f"{value * 1000:.1f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="编辑器性能基准测试")
+    parser.add_argument('--output', help="结果写入的 JSON 文件")
+    parser.add_argument('--baseline', help="用于比较的基准结果 JSON 文件")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="允许的退化比例，超过时返回非零退出码")
+    parser.add_argument('--filter', default='*', help="只运行名称匹配的用例，支持通配符")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-size', type=parse_size, default=parse_size('1g'),
+                        help="生成的测试文件的最大大小，如 32m")
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'editordemo-bench'),
+                        help="测试文件目录，生成的文件会被后续运行复用")
+    parser.add_argument('--list', action='store_true', help="列出所有用例")
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.workdir = os.path.abspath(args.workdir)
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.workdir, args.repeat, args.max_size)))
+        return 0
+
+    from .cases import all_cases
+    names = [name for name in all_cases(args.max_size) if fnmatch.fnmatch(name, args.filter)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    results = {}
+    for name in names:
+        result = spawn_case(name, args)
+        results[name] = result
+        if 'error' in result:
+            print(f"{name:28} 失败: {result['error'][0]}")
+        else:
+            print(f"{name:28} {format_value('median', result['median']):>12} "
+                  f"{format_value('peak_rss', result['peak_rss']):>12}")
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    failed = any('error' in result for result in results.values())
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, old, new in regressions:
+            print(f"退化: {name} {metric} {format_value(metric, old)} -> "
+                  f"{format_value(metric, new)} (+{new / old - 1:.0%})")
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -1,17 +1,47 @@
 import sys
 import os
+import argparse
 
 # 添加项目根目录到 Python 路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from src.editor.text_editor import TextEditor
-from PyQt6.QtWidgets import QApplication
+# 只导入转发所需的模块，QtWidgets 和 QScintilla 等到确实需要启动窗口时再导入
+from src.editor.single_instance import parse_target, send_to_running_instance, InstanceServer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="文本编辑器")
+    parser.add_argument('files', nargs='*', help="要打开的文件，可以用 路径:行号 指定跳转的行")
+    parser.add_argument('-n', '--new-instance', action='store_true',
+                        help="启动新的实例，不交给已运行的编辑器")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    targets = [parse_target(arg) for arg in args.files]
+    if not args.new_instance and send_to_running_instance(targets):
+        return
+
+    from src.editor.text_editor import TextEditor
+    from PyQt6.QtWidgets import QApplication
+    
     app = QApplication(sys.argv)
+    server = None
+    if not args.new_instance:
+        # 在创建窗口之前占用名字，缩短与同时启动的实例竞争的时间
+        server = InstanceServer()
+        if not server.listen():
+            # 另一个实例抢先开始监听，把文件交给它
+            if send_to_running_instance(targets):
+                return
+            server = None
     editor = TextEditor()
+    if server:
+        # 后续启动的实例把文件交给这个窗口打开
+        server.setParent(editor)
+        server.files_requested.connect(editor.open_targets)
     editor.show()
+    editor.open_targets(targets)
     sys.exit(app.exec())
 
 if __name__ == '__main__':
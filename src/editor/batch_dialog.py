@@ -0,0 +1,146 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QHBoxLayout, QComboBox, QLineEdit,
+                             QCheckBox, QPushButton, QProgressBar, QPlainTextEdit, QLabel)
+import os
+from .workers import Worker, start_worker
+from ..utils.batch_ops import run_batch, summarize, CHANGED, UNCHANGED, SKIPPED, FAILED
+
+# 操作名称 -> (显示名称, 默认文件通配符)
+OPERATIONS = [
+    ('format_json', '格式化JSON', '*.json'),
+    ('minify_json', '压缩JSON', '*.json'),
+    ('validate_json', '校验JSON', '*.json'),
+    ('reencode', '转换编码', '*.txt'),
+    ('line_endings', '统一换行符', '*.txt'),
+]
+ENCODINGS = ['UTF-8', 'GBK', 'ISO-8859-1']
+NEWLINES = [('LF (\\n)', '\n'), ('CRLF (\\r\\n)', '\r\n')]
+STATUS_TEXT = {CHANGED: '已修改', UNCHANGED: '无需修改', SKIPPED: '已跳过', FAILED: '失败'}
+
+
+class BatchDialog(QDialog):
+    # 对目录下所有匹配的文件批量执行操作，文件不会在标签页中打开
+    def __init__(self, parent, directory):
+        super().__init__(parent)
+        self.directory = directory
+        self.worker = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle(f"批量处理 - {os.path.basename(self.directory) or self.directory}")
+        self.resize(640, 480)
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.operation_box = QComboBox()
+        for operation, label, pattern in OPERATIONS:
+            self.operation_box.addItem(label, operation)
+        self.operation_box.currentIndexChanged.connect(self.operation_changed)
+        self.pattern_edit = QLineEdit()
+        self.pattern_edit.setToolTip("多个通配符用逗号分隔")
+        self.encoding_box = QComboBox()
+        self.encoding_box.addItems(ENCODINGS)
+        self.newline_box = QComboBox()
+        for label, newline in NEWLINES:
+            self.newline_box.addItem(label, newline)
+        self.dry_run_box = QCheckBox("只检查，不写入文件")
+        self.dry_run_box.setChecked(True)
+
+        form.addRow("操作", self.operation_box)
+        form.addRow("文件", self.pattern_edit)
+        form.addRow("目标编码", self.encoding_box)
+        form.addRow("换行符", self.newline_box)
+        form.addRow("", self.dry_run_box)
+        layout.addLayout(form)
+
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.report = QPlainTextEdit()
+        self.report.setReadOnly(True)
+
+        buttons = QHBoxLayout()
+        self.start_button = QPushButton("开始")
+        self.start_button.clicked.connect(self.start)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(self.cancel)
+        self.cancel_button.setEnabled(False)
+        buttons.addStretch()
+        buttons.addWidget(self.start_button)
+        buttons.addWidget(self.cancel_button)
+
+        layout.addWidget(self.progress_label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.report)
+        layout.addLayout(buttons)
+        self.operation_changed()
+
+    def operation_changed(self):
+        operation = self.operation_box.currentData()
+        self.pattern_edit.setText(next(p for o, l, p in OPERATIONS if o == operation))
+        self.encoding_box.setEnabled(operation == 'reencode')
+        self.newline_box.setEnabled(operation == 'line_endings')
+        self.dry_run_box.setEnabled(operation != 'validate_json')
+
+    def start(self):
+        operation = self.operation_box.currentData()
+        patterns = [p.strip() for p in self.pattern_edit.text().split(',') if p.strip()]
+        options = {'encoding': self.encoding_box.currentText().lower(),
+                   'newline': self.newline_box.currentData()}
+        dry_run = self.dry_run_box.isChecked()
+
+        worker = Worker(run_batch, self.directory, patterns, operation, options, dry_run,
+                        reports_progress=True)
+        worker.signals.progress.connect(self.batch_progress)
+        worker.signals.finished.connect(lambda result: self.batch_finished(worker, dry_run, *result))
+        worker.signals.error.connect(lambda message: self.batch_failed(worker, message))
+        self.worker = worker
+        self.report.clear()
+        self.progress_label.setText("正在查找文件...")
+        self.progress_bar.setValue(0)
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        start_worker(worker)
+
+    def batch_progress(self, done, total):
+        self.progress_label.setText(f"已处理 {done}/{total} 个文件")
+        self.progress_bar.setValue(int(done * 100 / total) if total else 100)
+
+    def cancel(self):
+        if self.worker:
+            self.worker.cancel()
+            self.progress_label.setText("正在取消，等待已开始的文件完成...")
+
+    def batch_finished(self, worker, dry_run, results, cancelled):
+        if worker is not self.worker:
+            return
+        self.worker = None
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+        counts = summarize(results)
+        summary = "，".join(f"{STATUS_TEXT[status]} {count}" for status, count in counts.items())
+        prefix = "已取消" if cancelled else ("检查完成（未写入）" if dry_run else "完成")
+        self.progress_label.setText(f"{prefix}：{summary}")
+        # 列出有变化、失败和跳过的文件
+        lines = []
+        for path, status, message in sorted(results):
+            if status == UNCHANGED:
+                continue
+            if status == CHANGED and dry_run:
+                status_text = "需要修改"
+            else:
+                status_text = STATUS_TEXT[status]
+            rel_path = os.path.relpath(path, self.directory)
+            lines.append(f"[{status_text}] {rel_path}" + (f"  {message}" if message else ""))
+        self.report.setPlainText("\n".join(lines) or "没有文件需要修改")
+
+    def batch_failed(self, worker, message):
+        if worker is not self.worker:
+            return
+        self.worker = None
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_label.setText(f"批量处理失败：{message}")
+
+    def closeEvent(self, event):
+        self.cancel()
+        super().closeEvent(event)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from .workers import Worker, start_worker
+from ..utils.encoding import read_text_file
+
+
+class DocumentLoader(QObject):
+    loaded = pyqtSignal(object, str, object)
+    failed = pyqtSignal(object, str)
+    cancelled = pyqtSignal(object)
+    progress = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 标签页 -> 正在执行的加载任务
+        self.workers = {}
+
+    def load(self, tab, path, encoding=None):
+        # 同一标签页只保留最新的一次加载
+        self.cancel(tab)
+
+        worker = Worker(read_text_file, path, encoding, reports_progress=True)
+        worker.signals.progress.connect(
+            lambda done, total: self.progress.emit(tab, done, total))
+        worker.signals.finished.connect(
+            lambda result: self.finish(tab, worker, result))
+        worker.signals.error.connect(
+            lambda message: self.fail(tab, worker, message))
+        worker.signals.cancelled.connect(
+            lambda: self.finish_cancelled(tab, worker))
+        self.workers[tab] = worker
+        start_worker(worker)
+
+    def cancel(self, tab):
+        worker = self.workers.pop(tab, None)
+        if worker:
+            worker.cancel()
+            self.cancelled.emit(tab)
+
+    def cancel_all(self):
+        for tab in list(self.workers):
+            self.cancel(tab)
+
+    def shutdown(self):
+        # 退出时取消加载但不发出信号，窗口已在关闭
+        workers, self.workers = self.workers, {}
+        for worker in workers.values():
+            worker.cancel()
+
+    def is_loading(self, tab=None):
+        if tab is None:
+            return bool(self.workers)
+        return tab in self.workers
+
+    def is_current(self, tab, worker):
+        # 已被取消或被新的加载替换的任务结果直接丢弃
+        if self.workers.get(tab) is not worker:
+            return False
+        del self.workers[tab]
+        return True
+
+    def finish(self, tab, worker, result):
+        if self.is_current(tab, worker):
+            text, detection = result
+            self.loaded.emit(tab, text, detection)
+
+    def fail(self, tab, worker, message):
+        if self.is_current(tab, worker):
+            self.failed.emit(tab, message)
+
+    def finish_cancelled(self, tab, worker):
+        if self.is_current(tab, worker):
+            self.cancelled.emit(tab)
\ No newline at end of file
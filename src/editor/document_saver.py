@@ -0,0 +1,67 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from .workers import Worker, start_worker
+from ..utils.file_io import atomic_write, transcode_chunks
+
+# 从编辑器缓冲区复制内容时每块的字节数
+SNAPSHOT_CHUNK_SIZE = 1024 * 1024
+
+
+def snapshot_chunks(editor, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    # Scintilla 不是线程安全的，必须在界面线程按块复制缓冲区中的 UTF-8 字节，
+    # 这里只做内存复制，不构造 Python 字符串
+    length = editor.length()
+    chunks = []
+    for start in range(0, length, chunk_size):
+        end = min(start + chunk_size, length)
+        # bytes() 返回的数据末尾带有 NUL 结束符
+        chunks.append(bytes(editor.bytes(start, end))[:end - start])
+    return chunks
+
+
+def write_document(path, chunks, encoding, progress=None, is_cancelled=None):
+    total = sum(len(chunk) for chunk in chunks)
+    return atomic_write(path, transcode_chunks(chunks, 'utf-8', encoding),
+                        total, progress, is_cancelled)
+
+
+class DocumentSaver(QObject):
+    saved = pyqtSignal(object, str, int)
+    failed = pyqtSignal(object, str)
+    progress = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 标签页 -> 正在执行的保存任务
+        self.workers = {}
+        # 同一标签页的保存按顺序执行，等待中的只保留最新一次
+        self.pending = {}
+
+    def save(self, tab, path, chunks, encoding, version):
+        if tab in self.workers:
+            self.pending[tab] = (path, chunks, encoding, version)
+            return
+
+        worker = Worker(write_document, path, chunks, encoding, reports_progress=True)
+        worker.signals.progress.connect(
+            lambda done, total: self.progress.emit(tab, done, total))
+        worker.signals.error.connect(
+            lambda message: setattr(worker, 'error_message', message))
+        worker.signals.done.connect(lambda: self.finish(tab, worker, path, version))
+        worker.error_message = None
+        self.workers[tab] = worker
+        start_worker(worker)
+
+    def finish(self, tab, worker, path, version):
+        # 先移除任务再通知，使接收方看到的 is_saving() 是最新状态
+        del self.workers[tab]
+        if worker.error_message is None:
+            self.saved.emit(tab, path, version)
+        else:
+            self.failed.emit(tab, worker.error_message)
+        if tab in self.pending:
+            self.save(tab, *self.pending.pop(tab))
+
+    def is_saving(self, tab=None):
+        if tab is None:
+            return bool(self.workers)
+        return tab in self.workers
\ No newline at end of file
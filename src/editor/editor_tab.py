@@ -1,22 +1,39 @@
 from PyQt6.QtWidgets import QTabWidget, QMessageBox
+from PyQt6.QtCore import pyqtSignal
 from .tab_widget import TabWidget
 import os
 
 class EditorTab(QTabWidget):
+    tab_created = pyqtSignal(object)
+    tab_closed = pyqtSignal(object)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setTabsClosable(True)
         self.tabCloseRequested.connect(self.close_tab)
+        self.currentChanged.connect(self.tab_activated)
         
-    def new_tab(self):
-        tab = TabWidget(self)
-        index = self.addTab(tab, "未命名")
-        self.setCurrentIndex(index)
+    def new_tab(self, title="未命名", lazy=False, index=None, activate=True):
+        tab = TabWidget(self, lazy=lazy)
+        self.tab_created.emit(tab)
+        if index is None:
+            index = self.addTab(tab, title)
+        else:
+            index = self.insertTab(index, tab, title)
+        if activate:
+            self.setCurrentIndex(index)
         return tab
         
+    def tab_activated(self, index):
+        # 延迟创建的标签页在首次激活时才创建编辑器
+        tab = self.widget(index)
+        if tab is not None:
+            tab.materialize()
+        
     def close_tab(self, index):
         tab = self.widget(index)
-        if tab.is_modified:
+        # 加载中的占位标签页没有可保存的内容，直接关闭
+        if tab.is_modified and not (tab.is_loading or tab.is_placeholder):
             reply = QMessageBox.question(
                 self, 
                 '保存修改', 
@@ -28,7 +45,9 @@ class EditorTab(QTabWidget):
             
             if reply == QMessageBox.StandardButton.Save:
                 self.setCurrentIndex(index)
-                tab.save_file()
+                # 保存在后台完成，用户取消另存为时不关闭
+                if not self.window().save_file():
+                    return
             elif reply == QMessageBox.StandardButton.Cancel:
                 return
         
@@ -36,4 +55,5 @@ class EditorTab(QTabWidget):
             self.removeTab(index)
         else:
             self.new_tab()
-            self.removeTab(index) 
\ No newline at end of file
+            self.removeTab(index)
+        self.tab_closed.emit(tab) 
\ No newline at end of file
@@ -0,0 +1,140 @@
+from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer
+import os
+from .workers import Worker, start_worker
+from .document_saver import snapshot_chunks
+from ..utils.encoding import read_text_file
+from ..utils.text_diff import line_edits
+from ..utils import perf
+
+# 合并同一文件短时间内多次变化的等待时间（毫秒）
+CHANGE_DELAY = 300
+
+
+def disk_state(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def diff_with_file(path, encoding, chunks):
+    # 在后台线程中读取磁盘上的新内容，与编辑器中的内容逐行比较
+    state = disk_state(path)
+    try:
+        text, detection = read_text_file(path, encoding)
+    except UnicodeDecodeError:
+        text, detection = read_text_file(path)
+    old = b''.join(chunks).decode('utf-8')
+    return line_edits(old, text), detection, state
+
+
+class FileMonitor(QObject):
+    # 监视已打开的文件，外部修改后只把变化的部分应用到编辑器，作为一次撤销操作
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor_window = parent
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.file_changed)
+        self.changed = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(CHANGE_DELAY)
+        self.timer.timeout.connect(self.process_changes)
+        # 标签页 -> 正在执行的重新加载任务
+        self.workers = {}
+
+    def watch(self, tab):
+        # 记录磁盘上文件的状态，用于区分自己的保存和外部修改
+        path = tab.current_file
+        if not path or tab.large_file:
+            return
+        try:
+            tab.disk_state = disk_state(path)
+        except OSError:
+            return
+        if path not in self.watcher.files():
+            self.watcher.addPath(path)
+
+    def unwatch(self, tab):
+        path = tab.current_file
+        self.workers.pop(tab, None)
+        if path and path in self.watcher.files() and self.editor_window.find_tab(path) in (None, tab):
+            self.watcher.removePath(path)
+
+    def file_changed(self, path):
+        self.changed.add(path)
+        self.timer.start()
+
+    def process_changes(self):
+        changed, self.changed = self.changed, set()
+        for path in changed:
+            # 原子保存会替换文件，替换后需要重新监视
+            if os.path.exists(path) and path not in self.watcher.files():
+                self.watcher.addPath(path)
+            tab = self.editor_window.find_tab(path)
+            if tab:
+                self.check(tab)
+
+    def check(self, tab):
+        if (tab.editor is None or tab.large_file or tab.is_loading or tab.is_placeholder
+                or tab in self.workers or self.editor_window.saver.is_saving(tab)
+                or self.editor_window.tail_follower.is_following(tab)
+                or self.editor_window.find_bar.is_busy(tab)):
+            return
+        name = os.path.basename(tab.current_file)
+        try:
+            state = disk_state(tab.current_file)
+        except OSError:
+            self.editor_window.statusBar().showMessage(f"{name} 已在磁盘上被删除", 10000)
+            return
+        if state == tab.disk_state:
+            # 自己保存的结果或内容没有变化
+            return
+        if tab.is_modified:
+            reply = QMessageBox.question(
+                self.editor_window, "文件已在外部修改",
+                f"{name} 已在外部修改，当前也有未保存的修改。\n"
+                "是否重新加载？重新加载可以用撤销恢复当前内容。")
+            if reply != QMessageBox.StandardButton.Yes:
+                # 保留当前内容，同一次外部修改不再询问
+                tab.disk_state = state
+                return
+        self.reload(tab)
+
+    def reload(self, tab):
+        chunks = snapshot_chunks(tab.editor)
+        version = tab.edit_version
+        worker = Worker(diff_with_file, tab.current_file, tab.current_encoding, chunks)
+        worker.signals.finished.connect(lambda result: self.reloaded(tab, worker, version, *result))
+        worker.signals.error.connect(lambda message: self.reload_failed(tab, worker, message))
+        self.workers[tab] = worker
+        perf.begin('reload', tab, path=tab.current_file)
+        start_worker(worker)
+
+    def reloaded(self, tab, worker, version, edits, detection, state):
+        if self.workers.get(tab) is not worker:
+            return
+        del self.workers[tab]
+        if tab.editor is None or self.editor_window.tabs.indexOf(tab) == -1:
+            perf.discard('reload', tab)
+            return
+        if tab.edit_version != version or self.editor_window.find_bar.is_busy(tab):
+            # 比较期间又有编辑，差异已不适用，重新检查
+            perf.discard('reload', tab)
+            self.check(tab)
+            return
+        if edits:
+            tab.apply_edits(edits)
+        tab.current_encoding = detection.encoding
+        tab.disk_state = state
+        tab.mark_saved(tab.edit_version)
+        self.editor_window.journals.track(tab)
+        self.editor_window.schedule_status_update(tab)
+        perf.end('reload', tab, edits=len(edits))
+        self.editor_window.statusBar().showMessage(
+            f"已重新加载 {os.path.basename(tab.current_file)}", 5000)
+
+    def reload_failed(self, tab, worker, message):
+        if self.workers.get(tab) is worker:
+            del self.workers[tab]
+            perf.discard('reload', tab)
+            self.editor_window.statusBar().showMessage(f"无法重新加载：{message}", 10000)
\ No newline at end of file
@@ -1,44 +1,326 @@
 from PyQt6.QtWidgets import QTreeView, QMenu
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
-from PyQt6.QtCore import Qt, QDir
+from PyQt6.QtCore import (Qt, QDir, QModelIndex, QPersistentModelIndex, QFileSystemWatcher,
+                          QTimer, pyqtSignal)
+import os
+from .workers import Worker, start_worker
+from .settings import cache_directory
+from ..utils.fs_scan import scan_directory_state
+from ..utils.dir_snapshot import DirectorySnapshot, load_snapshot, revalidate
+from ..utils.file_io import cache_file_name
+from ..utils import perf
+
+PATH_ROLE = Qt.ItemDataRole.UserRole
+IS_DIR_ROLE = Qt.ItemDataRole.UserRole + 1
+LOAD_STATE_ROLE = Qt.ItemDataRole.UserRole + 2
+
+# 目录子项的加载状态
+NOT_LOADED = 0
+LOADING = 1
+LOADED = 2
+
+# 合并文件系统事件的等待时间（毫秒），如 git checkout 会在短时间内产生大量事件
+REFRESH_DELAY = 300
+# 目录列表有变化后多久写入快照（毫秒）
+SAVE_DELAY = 2000
+
+
+class FileTreeModel(QStandardItemModel):
+    directory_loaded = pyqtSignal(str)
+    root_changed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setHorizontalHeaderLabels(['文件'])
+        self.root_path = None
+        # 每次切换根目录递增，用于丢弃过期的扫描结果
+        self.generation = 0
+        # 已加载的目录路径 -> 对应节点（根目录为无效索引）
+        self.directories = {}
+
+        # 监视根目录和展开的目录，变化合并后增量更新
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.directory_changed)
+        self.dirty = set()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.flush_changes)
+
+        # 每个根目录在磁盘上的目录列表快照，启动时立即显示，再在后台按修改时间检查
+        self.snapshot = None
+        self.snapshot_path = None
+        self.snapshot_dirty = False
+        self.revalidate_worker = None
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY)
+        self.save_timer.timeout.connect(self.save_snapshot)
+
+    def set_root_path(self, path):
+        self.save_snapshot()
+        self.generation += 1
+        self.clear()
+        self.setHorizontalHeaderLabels(['文件'])
+        self.root_path = path
+        self.directories = {}
+        self.dirty.clear()
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.watcher.addPath(path)
+        self.snapshot_path = os.path.join(cache_directory('tree'), cache_file_name(path))
+        with perf.span('tree.snapshot_load', path=path):
+            self.snapshot = load_snapshot(path, self.snapshot_path) or DirectorySnapshot(path)
+        self.request_children(QModelIndex())
+        self.revalidate_snapshot()
+        self.root_changed.emit(path)
+
+    def create_item(self, parent_path, name, is_dir):
+        item = QStandardItem(name)
+        item.setEditable(False)
+        item.setData(os.path.join(parent_path, name), PATH_ROLE)
+        item.setData(is_dir, IS_DIR_ROLE)
+        item.setData(NOT_LOADED if is_dir else LOADED, LOAD_STATE_ROLE)
+        return item
+
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.isValid():
+            item = self.itemFromIndex(parent)
+            # 未加载的目录也显示展开箭头
+            if item.data(IS_DIR_ROLE) and item.data(LOAD_STATE_ROLE) != LOADED:
+                return True
+        return super().hasChildren(parent)
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return False
+        item = self.itemFromIndex(parent)
+        return bool(item.data(IS_DIR_ROLE)) and item.data(LOAD_STATE_ROLE) == NOT_LOADED
+
+    def fetchMore(self, parent):
+        if self.canFetchMore(parent):
+            self.request_children(parent)
+
+    def request_children(self, parent):
+        is_root = not parent.isValid()
+        if is_root:
+            path = self.root_path
+        else:
+            item = self.itemFromIndex(parent)
+            item.setData(LOADING, LOAD_STATE_ROLE)
+            path = item.data(PATH_ROLE)
+
+        target = QPersistentModelIndex(parent)
+        generation = self.generation
+        perf.begin('tree.populate', path)
+        state = self.snapshot.listing(self.snapshot.relative(path))
+        if state is not None:
+            # 快照中已有该目录的列表，直接显示，变化由后台检查发现
+            self.children_loaded(generation, is_root, target, path, state[1])
+            return
+        self.scan(path, lambda entries: self.children_loaded(generation, is_root, target, path, entries))
+
+    def scan(self, path, callback):
+        # 在后台线程中扫描目录，避免阻塞界面；无法读取的目录视为空目录
+        generation = self.generation
+        worker = Worker(scan_directory_state, path)
+        worker.signals.finished.connect(lambda state: self.scanned(generation, path, state, callback))
+        worker.signals.error.connect(lambda message: callback([]))
+        start_worker(worker)
+
+    def scanned(self, generation, path, state, callback):
+        if generation == self.generation:
+            self.snapshot.record(self.snapshot.relative(path), *state)
+            self.snapshot_changed()
+        callback(state[1])
+
+    def snapshot_changed(self):
+        self.snapshot_dirty = True
+        self.save_timer.start()
+
+    def revalidate_snapshot(self):
+        # 只重新读取修改时间变化的目录，已显示的目录按差异增删行
+        if self.revalidate_worker:
+            self.revalidate_worker.cancel()
+        generation = self.generation
+        worker = Worker(revalidate, self.snapshot.copy(), reports_progress=True)
+        worker.signals.finished.connect(
+            lambda changes: self.snapshot_revalidated(generation, worker, changes))
+        self.revalidate_worker = worker
+        perf.begin('tree.revalidate', generation, path=self.root_path)
+        start_worker(worker)
+
+    def snapshot_revalidated(self, generation, worker, changes):
+        if worker is self.revalidate_worker:
+            self.revalidate_worker = None
+        if generation != self.generation:
+            perf.discard('tree.revalidate', generation)
+            return
+        for rel, (mtime, entries) in changes.items():
+            self.snapshot.record(rel, mtime, entries)
+            path = os.path.join(self.root_path, rel) if rel else self.root_path
+            if path in self.directories:
+                self.apply_changes(generation, path, entries)
+        if changes:
+            self.snapshot_changed()
+        perf.end('tree.revalidate', generation, changed=len(changes))
+
+    def save_snapshot(self, wait=False):
+        # 在后台线程中序列化并写入副本；退出时同步写入
+        self.save_timer.stop()
+        if self.snapshot is None or not self.snapshot_dirty:
+            return
+        self.snapshot_dirty = False
+        snapshot = self.snapshot.copy()
+        if wait:
+            try:
+                snapshot.save(self.snapshot_path)
+            except OSError:
+                pass
+            return
+        start_worker(Worker(snapshot.save, self.snapshot_path))
+
+    def children_loaded(self, generation, is_root, target, path, entries):
+        if generation != self.generation:
+            return
+        if is_root:
+            parent_item = self.invisibleRootItem()
+        elif target.isValid():
+            parent_item = self.itemFromIndex(QModelIndex(target))
+            parent_item.setData(LOADED, LOAD_STATE_ROLE)
+        else:
+            # 扫描期间节点已被移除
+            return
+
+        items = [self.create_item(path, name, is_dir) for name, is_dir in entries]
+        if items:
+            parent_item.appendRows(items)
+        self.directories[path] = target
+        perf.end('tree.populate', path, entries=len(items))
+        self.directory_loaded.emit(path)
+
+    def item_for_path(self, path):
+        if path == self.root_path:
+            return self.invisibleRootItem()
+        target = self.directories.get(path)
+        if target is None or not target.isValid():
+            return None
+        return self.itemFromIndex(QModelIndex(target))
+
+    def watch(self, index):
+        path = self.data(index, PATH_ROLE)
+        if path and path not in self.watcher.directories():
+            self.watcher.addPath(path)
+            if path in self.directories:
+                # 折叠期间没有监视，已加载的子项可能已过时，重新展开时检查一次
+                self.dirty.add(path)
+                self.refresh_timer.start()
+
+    def unwatch(self, index):
+        path = self.data(index, PATH_ROLE)
+        if path and path != self.root_path and path in self.watcher.directories():
+            self.watcher.removePath(path)
+
+    def directory_changed(self, path):
+        self.dirty.add(path)
+        self.refresh_timer.start()
+
+    def refresh(self):
+        # 重新检查所有已加载的目录
+        self.dirty.update(self.directories)
+        self.flush_changes()
+
+    def flush_changes(self):
+        generation = self.generation
+        dirty, self.dirty = self.dirty, set()
+        for path in dirty:
+            if path in self.directories:
+                self.scan(path, lambda entries, path=path: self.apply_changes(generation, path, entries))
+
+    def apply_changes(self, generation, path, entries):
+        # 只对新增和删除的条目做最少的行插入与删除，保留展开和选中状态
+        if generation != self.generation:
+            return
+        parent_item = self.item_for_path(path)
+        if parent_item is None:
+            return
+
+        old = [(parent_item.child(row).text(), parent_item.child(row).data(IS_DIR_ROLE))
+               for row in range(parent_item.rowCount())]
+        new = set(entries)
+        old_set = set(old)
+
+        # 从下往上删除，连续的行一次删除
+        row = len(old) - 1
+        while row >= 0:
+            if old[row] in new:
+                row -= 1
+                continue
+            end = row
+            while row >= 0 and old[row] not in new:
+                self.forget(os.path.join(path, old[row][0]))
+                row -= 1
+            parent_item.removeRows(row + 1, end - row)
+
+        # 剩余的旧条目与新列表顺序一致，按顺序合并插入
+        row = 0
+        pending = []
+        for entry in entries:
+            if entry in old_set:
+                if pending:
+                    parent_item.insertRows(row, pending)
+                    row += len(pending)
+                    pending = []
+                row += 1
+            else:
+                pending.append(self.create_item(path, *entry))
+        if pending:
+            parent_item.insertRows(row, pending)
+
+    def forget(self, path):
+        # 移除的目录及其子目录不再监视
+        prefix = path + os.sep
+        for directory in [d for d in self.directories if d == path or d.startswith(prefix)]:
+            del self.directories[directory]
+        watched = [d for d in self.watcher.directories() if d == path or d.startswith(prefix)]
+        if watched:
+            self.watcher.removePaths(watched)
+
 
 class FileTreeView(QTreeView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setup_ui()
-        
+
     def setup_ui(self):
         self.setMinimumWidth(200)
-        
-        # 创建标准项模型
-        self.file_model = QStandardItemModel()
-        self.file_model.setHorizontalHeaderLabels(['文件'])
-        
+
+        # 创建按需加载的文件模型
+        self.file_model = FileTreeModel(self)
+
         # 设置模型到树视图
         self.setModel(self.file_model)
+
+        # 添加根目录，只加载第一层
+        self.file_model.set_root_path(QDir.currentPath())
         
-        # 添加根目录
-        self.populate_tree(QDir.currentPath(), self.file_model.invisibleRootItem())
-        
+        # 只监视展开的目录
+        self.expanded.connect(self.file_model.watch)
+        self.collapsed.connect(self.file_model.unwatch)
+
         # 创建上下文菜单
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
 
-    def populate_tree(self, path, parent_item):
-        directory = QDir(path)
-        directory.setFilter(QDir.Filter.NoDotAndDotDot | 
-                          QDir.Filter.AllDirs | 
-                          QDir.Filter.Files)
-        
-        for entry in directory.entryInfoList():
-            item = QStandardItem(entry.fileName())
-            item.setData(entry.filePath(), Qt.ItemDataRole.UserRole)
-            
-            if entry.isDir():
-                self.populate_tree(entry.filePath(), item)
-            
-            parent_item.appendRow(item)
+    def file_path(self, index):
+        return self.file_model.data(index, PATH_ROLE)
 
     def set_root_directory(self, path):
-        self.file_model.clear()
-        self.file_model.setHorizontalHeaderLabels(['文件'])
-        self.populate_tree(path, self.file_model.invisibleRootItem()) 
\ No newline at end of file
+        # 根目录不变时只做增量刷新
+        current = self.file_model.root_path
+        if current and os.path.normcase(os.path.abspath(path)) == os.path.normcase(os.path.abspath(current)):
+            self.file_model.refresh()
+        else:
+            self.file_model.set_root_path(path)
+
+    def refresh(self):
+        self.file_model.refresh()
\ No newline at end of file
@@ -0,0 +1,433 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QCheckBox, QPushButton, QLabel
+from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.Qsci import QsciScintilla
+from array import array
+from bisect import bisect_left, bisect_right
+import os
+import re
+import time
+from .workers import Worker, start_worker
+from .ui_scheduler import ui_scheduler
+from ..utils.text_search import (compile_search, replacement_template, search_chunk,
+                                 CHUNK_SIZE, LOOKBEHIND, OVERLAP)
+from ..utils import perf
+
+# 输入停止或文档修改后多久重新查找（毫秒）
+SEARCH_DELAY = 200
+# 全部替换时每个时间片的预算（秒），其间让出事件循环保持界面响应
+REPLACE_SLICE = 0.015
+# 匹配项使用的指示器编号
+MATCH_INDICATOR = 9
+
+
+class FindBar(QWidget):
+    # 查找替换栏：后台按块查找当前文档，只为可见区域内的匹配绘制指示器
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor_window = parent
+        self.tab = None
+        self.editor = None
+        self.pattern = None
+        self.worker = None
+        self.version = None
+        self.starts = array('q')
+        self.ends = array('q')
+        self.finished = False
+        # 全部替换：需要逐个展开的替换内容、待替换的位置和进度
+        self.expand = None
+        self.replacements = None
+        self.pending_replace = False
+        self.replace_index = 0
+        self.painted = None
+        self.setup_ui()
+        self.hide()
+
+    def setup_ui(self):
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(4, 2, 4, 2)
+
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText("查找")
+        self.find_edit.textChanged.connect(self.schedule_search)
+        self.find_edit.returnPressed.connect(self.find_next)
+        self.replace_edit = QLineEdit()
+        self.replace_edit.setPlaceholderText("替换为")
+
+        self.regex_check = QCheckBox("正则")
+        self.case_check = QCheckBox("区分大小写")
+        self.word_check = QCheckBox("全字匹配")
+        for check in (self.regex_check, self.case_check, self.word_check):
+            check.toggled.connect(self.schedule_search)
+
+        self.count_label = QLabel()
+        previous_button = QPushButton("上一个")
+        previous_button.clicked.connect(lambda: self.find_next(backward=True))
+        next_button = QPushButton("下一个")
+        next_button.clicked.connect(lambda: self.find_next())
+        self.replace_button = QPushButton("替换")
+        self.replace_button.clicked.connect(self.replace_current)
+        self.replace_all_button = QPushButton("全部替换")
+        self.replace_all_button.clicked.connect(self.replace_all)
+        close_button = QPushButton("×")
+        close_button.setFixedWidth(24)
+        close_button.clicked.connect(self.close_bar)
+
+        for widget in (self.find_edit, self.replace_edit, self.regex_check, self.case_check,
+                       self.word_check, previous_button, next_button, self.replace_button,
+                       self.replace_all_button, self.count_label):
+            layout.addWidget(widget)
+        layout.addStretch()
+        layout.addWidget(close_button)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.start_search)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Escape:
+            self.close_bar()
+        else:
+            super().keyPressEvent(event)
+
+    def show_bar(self, replace=False):
+        tab = self.editor_window.current_tab()
+        if tab is None or tab.editor is None:
+            return
+        # 用选中的单行文本作为查找内容
+        selected = tab.editor.selectedText()
+        if selected and '\n' not in selected:
+            self.find_edit.setText(selected)
+        self.replace_edit.setVisible(True)
+        self.show()
+        self.set_tab(tab)
+        (self.replace_edit if replace and self.find_edit.text() else self.find_edit).setFocus()
+        self.find_edit.selectAll()
+
+    def close_bar(self):
+        self.set_tab(None)
+        self.hide()
+        tab = self.editor_window.current_tab()
+        if tab is not None and tab.editor is not None:
+            tab.editor.setFocus()
+
+    def is_busy(self, tab):
+        return tab is self.tab and self.replace_index > 0
+
+    def forget(self, tab):
+        # 标签页关闭时调用，正在进行的全部替换随之中止
+        if tab is self.tab:
+            self.replace_index = 0
+            self.pending_replace = False
+            self.set_tab(None)
+
+    def set_tab(self, tab):
+        # 切换标签页时调用，只跟踪当前标签页
+        if self.replace_index > 0 or (tab is self.tab and tab is not None and tab.editor is self.editor):
+            return
+        self.cancel_search()
+        if self.editor is not None:
+            try:
+                self.editor.textChanged.disconnect(self.schedule_search)
+                self.editor.verticalScrollBar().valueChanged.disconnect(self.schedule_paint)
+            except (TypeError, RuntimeError):
+                pass
+            self.clear_indicators()
+        self.tab = tab if self.isVisible() else None
+        self.editor = None
+        if self.tab is not None and tab.large_file:
+            # 大文件模式只映射文件、不载入编辑器，查找替换只对编辑器中的文档进行
+            self.count_label.setText("大文件模式不支持查找替换")
+            return
+        if self.tab is None or tab.editor is None:
+            self.count_label.clear()
+            return
+        self.editor = tab.editor
+        self.editor.SendScintilla(QsciScintilla.SCI_INDICSETSTYLE, MATCH_INDICATOR,
+                                  QsciScintilla.INDIC_ROUNDBOX)
+        self.editor.SendScintilla(QsciScintilla.SCI_INDICSETFORE, MATCH_INDICATOR, QColor(255, 160, 0))
+        self.editor.SendScintilla(QsciScintilla.SCI_INDICSETALPHA, MATCH_INDICATOR, 100)
+        self.editor.textChanged.connect(self.schedule_search)
+        self.editor.verticalScrollBar().valueChanged.connect(self.schedule_paint)
+        self.start_search()
+
+    def schedule_search(self):
+        if self.replace_index == 0:
+            self.search_timer.start()
+
+    def cancel_search(self):
+        self.search_timer.stop()
+        if self.worker:
+            self.worker.cancel()
+            self.worker = None
+
+    def start_search(self):
+        self.cancel_search()
+        self.clear_indicators()
+        self.starts, self.ends = array('q'), array('q')
+        self.finished = False
+        self.pattern = None
+        query = self.find_edit.text()
+        if self.editor is None or self.tab.editor is not self.editor or not query:
+            self.pending_replace = False
+            if self.tab is None or not self.tab.large_file:
+                self.count_label.clear()
+            return
+        try:
+            self.pattern = compile_search(query, self.regex_check.isChecked(),
+                                          self.case_check.isChecked(), self.word_check.isChecked())
+        except re.error as e:
+            self.pending_replace = False
+            self.count_label.setText(f"正则表达式错误：{e}")
+            return
+        self.replacements = [] if self.pending_replace and self.expand is not None else None
+        self.version = self.tab.edit_version
+        perf.begin('find', self.tab, query=query)
+        self.search_from(0)
+
+    def search_from(self, pos):
+        # 界面线程每次只复制一块（加上前后少量上下文），查找在后台线程中进行
+        editor = self.editor
+        length = editor.length()
+        limit = min(length, pos + CHUNK_SIZE)
+        start = max(0, pos - LOOKBEHIND)
+        end = min(length, limit + OVERLAP)
+        data = bytes(editor.bytes(start, end))[:end - start]
+        expand = self.expand if self.replacements is not None else None
+        worker = Worker(search_chunk, self.pattern, data, pos - start, start, limit, expand)
+        worker.signals.finished.connect(
+            lambda result: self.chunk_searched(worker, limit == length, *result))
+        worker.signals.error.connect(lambda message: self.search_failed(worker, message))
+        self.worker = worker
+        start_worker(worker)
+
+    def chunk_searched(self, worker, final, starts, ends, replacements, next_pos):
+        if worker is not self.worker:
+            return
+        self.worker = None
+        if self.tab.edit_version != self.version:
+            # 查找期间文档被修改，结果作废，稍后重新查找
+            perf.discard('find', self.tab)
+            self.schedule_search()
+            return
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        if self.replacements is not None:
+            self.replacements.extend(replacements)
+        self.schedule_paint()
+        if not final:
+            self.count_label.setText(f"{len(self.starts)} 个匹配…")
+            self.search_from(next_pos)
+            return
+        self.finished = True
+        perf.end('find', self.tab, matches=len(self.starts))
+        self.count_label.setText(f"{len(self.starts)} 个匹配")
+        if self.pending_replace:
+            self.pending_replace = False
+            self.apply_replacements()
+
+    def search_failed(self, worker, message):
+        if worker is self.worker:
+            self.worker = None
+            self.pending_replace = False
+            perf.discard('find', self.tab)
+            self.count_label.setText(f"查找失败：{message}")
+
+    def schedule_paint(self):
+        ui_scheduler().schedule(('find', self), self.paint_visible)
+
+    def visible_range(self):
+        editor = self.editor
+        first = editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, editor.firstVisibleLine())
+        last = editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE,
+                                    editor.firstVisibleLine()
+                                    + editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN))
+        return (editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, first),
+                editor.SendScintilla(QsciScintilla.SCI_GETLINEENDPOSITION, last))
+
+    def paint_visible(self):
+        # 只为可见区域内的匹配绘制指示器，匹配再多也只处理一屏
+        if self.editor is None or self.tab.editor is not self.editor:
+            return
+        self.clear_indicators()
+        start, end = self.visible_range()
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        self.editor.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, MATCH_INDICATOR)
+        for i in range(first, last):
+            self.editor.SendScintilla(QsciScintilla.SCI_INDICATORFILLRANGE,
+                                      self.starts[i], self.ends[i] - self.starts[i])
+        self.painted = (start, end)
+
+    def clear_indicators(self):
+        if self.painted and self.editor is not None and self.tab.editor is self.editor:
+            self.editor.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, MATCH_INDICATOR)
+            # 绘制后文本可能有增删，位置已经移动，清除整个文档范围
+            self.editor.SendScintilla(QsciScintilla.SCI_INDICATORCLEARRANGE, 0, self.editor.length())
+        self.painted = None
+
+    def find_next(self, backward=False):
+        editor = self.editor
+        if editor is None or not self.starts:
+            return
+        if backward:
+            i = bisect_left(self.starts, editor.SendScintilla(QsciScintilla.SCI_GETSELECTIONSTART)) - 1
+            if i < 0:
+                i = len(self.starts) - 1
+        else:
+            i = bisect_left(self.starts, editor.SendScintilla(QsciScintilla.SCI_GETSELECTIONEND))
+            if i == len(self.starts):
+                i = 0
+        self.select_match(i)
+
+    def select_match(self, i):
+        # SCI_SETSEL 会滚动到插入符所在位置
+        self.editor.SendScintilla(QsciScintilla.SCI_SETSEL, self.starts[i], self.ends[i])
+        total = f"{len(self.starts)}" + ("" if self.finished else "…")
+        self.count_label.setText(f"第 {i + 1} 个，共 {total} 个匹配")
+
+    def current_match(self):
+        # 当前选区恰好是某个匹配时返回其序号
+        start = self.editor.SendScintilla(QsciScintilla.SCI_GETSELECTIONSTART)
+        end = self.editor.SendScintilla(QsciScintilla.SCI_GETSELECTIONEND)
+        i = bisect_left(self.starts, start)
+        if i < len(self.starts) and self.starts[i] == start and self.ends[i] == end:
+            return i
+        return None
+
+    def replacement_for(self, start, end):
+        template, per_match = replacement_template(self.replace_edit.text(), self.regex_check.isChecked())
+        if not per_match:
+            return template
+        # 按与查找相同的上下文重新匹配，以展开分组引用
+        context = max(0, start - LOOKBEHIND)
+        limit = min(self.editor.length(), end + OVERLAP)
+        data = bytes(self.editor.bytes(context, limit))[:limit - context]
+        match = self.pattern.match(data, start - context)
+        return match.expand(template) if match else template
+
+    def replace_current(self):
+        if self.editor is None or self.replace_index > 0 or self.tab.edit_version != self.version:
+            return
+        i = self.current_match()
+        if i is None:
+            self.find_next()
+            return
+        try:
+            data = self.replacement_for(self.starts[i], self.ends[i])
+        except re.error as e:
+            self.count_label.setText(f"替换内容错误：{e}")
+            return
+        start, end = self.starts[i], self.ends[i]
+        self.editor.textChanged.disconnect(self.schedule_search)
+        self.editor.SendScintilla(QsciScintilla.SCI_SETTARGETRANGE, start, end)
+        self.editor.SendScintilla(QsciScintilla.SCI_REPLACETARGET, len(data), data)
+        self.editor.textChanged.connect(self.schedule_search)
+        # 只移动后面的匹配位置，不重新查找整个文档
+        delta = len(data) - (end - start)
+        del self.starts[i]
+        del self.ends[i]
+        self.starts[i:] = array('q', (p + delta for p in self.starts[i:]))
+        self.ends[i:] = array('q', (p + delta for p in self.ends[i:]))
+        if self.worker or not self.finished:
+            self.start_search()
+            return
+        self.version = self.tab.edit_version
+        self.schedule_paint()
+        if self.starts:
+            self.select_match(i % len(self.starts))
+        else:
+            self.count_label.setText("0 个匹配")
+
+    def replace_all(self):
+        if self.editor is None or self.replace_index > 0 or not self.find_edit.text():
+            return
+        try:
+            template, per_match = replacement_template(self.replace_edit.text(),
+                                                       self.regex_check.isChecked())
+        except re.error as e:
+            self.count_label.setText(f"替换内容错误：{e}")
+            return
+        self.template = template
+        self.expand = template if per_match else None
+        if self.finished and not per_match and self.tab.edit_version == self.version:
+            self.replacements = None
+            self.apply_replacements()
+            return
+        # 需要完整的匹配列表（以及逐个展开的替换内容），查找完成后再替换
+        self.pending_replace = True
+        self.start_search()
+
+    def apply_replacements(self):
+        # 从后往前替换，前面的位置不受影响；整个过程是一次撤销操作，分时间片执行
+        if not self.starts:
+            self.expand = None
+            return
+        tab, editor = self.tab, self.editor
+        window = self.editor_window
+        window.journals.detach(tab)
+        window.json_validator.untrack(tab)
+        # 替换期间不发送修改通知，结束后统一更新修改标记、日志和检查状态
+        self.event_mask = editor.SendScintilla(QsciScintilla.SCI_GETMODEVENTMASK)
+        editor.SendScintilla(QsciScintilla.SCI_SETMODEVENTMASK, 0)
+        # 屏蔽通知后版本号不会变化，先递增一次，让基于旧内容的保存和重新加载结果失效
+        tab.edit_version += 1
+        # 拆分视图共用同一文档，也要禁止输入，否则排队中的替换位置会错位
+        editor.setEnabled(False)
+        if tab.split_editor:
+            tab.split_editor.setEnabled(False)
+        self.replace_all_button.setEnabled(False)
+        self.replace_button.setEnabled(False)
+        editor.beginUndoAction()
+        self.replace_index = len(self.starts)
+        perf.begin('replace_all', tab, matches=len(self.starts))
+        self.replace_slice()
+
+    def replace_slice(self):
+        tab, editor = self.tab, self.editor
+        if self.editor_window.tabs.indexOf(tab) == -1:
+            self.replace_index = 0
+            perf.discard('replace_all', tab)
+            return
+        deadline = time.perf_counter() + REPLACE_SLICE
+        starts, ends, replacements = self.starts, self.ends, self.replacements
+        template = self.template
+        index = self.replace_index
+        while index > 0:
+            index -= 1
+            data = replacements[index] if replacements is not None else template
+            editor.SendScintilla(QsciScintilla.SCI_SETTARGETRANGE, starts[index], ends[index])
+            editor.SendScintilla(QsciScintilla.SCI_REPLACETARGET, len(data), data)
+            if index % 256 == 0 and time.perf_counter() > deadline:
+                break
+        self.replace_index = index
+        if index > 0:
+            done = len(starts) - index
+            self.count_label.setText(f"正在替换 {done}/{len(starts)}…")
+            QTimer.singleShot(0, self.replace_slice)
+            return
+        self.finish_replace()
+
+    def finish_replace(self):
+        tab, editor = self.tab, self.editor
+        window = self.editor_window
+        editor.endUndoAction()
+        editor.SendScintilla(QsciScintilla.SCI_SETMODEVENTMASK, self.event_mask)
+        editor.setEnabled(True)
+        if tab.split_editor:
+            tab.split_editor.setEnabled(True)
+        self.replace_all_button.setEnabled(True)
+        self.replace_button.setEnabled(True)
+        count = len(self.starts)
+        self.expand = None
+        self.replacements = None
+        # 补发一次修改信号：更新修改标记、视口着色，并按新内容重新查找
+        editor.textChanged.emit()
+        window.journals.track(tab, snapshot=True)
+        window.json_validator.track(tab, os.path.splitext(tab.current_file or '')[1])
+        if tab is window.current_tab():
+            window.outline_panel.set_tab(tab)
+        perf.end('replace_all', tab, matches=count)
+        self.start_search()
+        self.count_label.setText(f"已替换 {count} 处")
\ No newline at end of file
@@ -0,0 +1,155 @@
+from PyQt6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QLineEdit, QLabel,
+                             QTreeWidget, QTreeWidgetItem)
+from PyQt6.QtCore import Qt, QTimer
+import os
+from .settings import cache_directory
+from .workers import Worker, start_worker
+from ..utils.trigram_index import load_index, MIN_QUERY_BYTES
+from ..utils.file_io import cache_file_name
+
+# 输入停止多久后开始搜索（毫秒）
+SEARCH_DELAY = 300
+RESULT_ROLE = Qt.ItemDataRole.UserRole
+
+
+class FindInFilesPanel(QDockWidget):
+    def __init__(self, parent):
+        super().__init__("在文件中查找", parent)
+        self.editor_window = parent
+        self.root = None
+        self.index = None
+        self.index_worker = None
+        self.search_worker = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("输入要查找的文本")
+        self.query_edit.textChanged.connect(self.schedule_search)
+        self.query_edit.returnPressed.connect(self.search)
+
+        self.status_label = QLabel()
+
+        self.results = QTreeWidget()
+        self.results.setHeaderHidden(True)
+        self.results.itemActivated.connect(self.open_result)
+
+        layout.addWidget(self.query_edit)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.results)
+        self.setWidget(widget)
+
+        # 输入时延迟搜索，避免每个按键都查询一次
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY)
+        self.search_timer.timeout.connect(self.search)
+
+    def set_root(self, root):
+        if root != self.root:
+            self.root = root
+            self.index = None
+            if self.index_worker:
+                self.index_worker.cancel()
+                self.index_worker = None
+        # 同一根目录再次打开时也增量更新，之后保存或新建的文件才能被搜索到
+        self.update_index()
+
+    def update_index(self):
+        if self.index_worker or self.root is None:
+            return
+        # 在后台读取磁盘上的索引并增量更新，已有索引时在原索引上更新，期间仍可搜索
+        cache_path = os.path.join(cache_directory('search'), cache_file_name(self.root))
+        if self.index is None:
+            worker = Worker(load_index, self.root, cache_path, reports_progress=True)
+            self.status_label.setText("正在建立索引...")
+        else:
+            worker = Worker(self.refresh_index, self.index, cache_path, reports_progress=True)
+        worker.signals.progress.connect(self.index_progress)
+        worker.signals.finished.connect(lambda index: self.index_ready(worker, index))
+        worker.signals.error.connect(lambda message: self.index_failed(worker, message))
+        self.index_worker = worker
+        start_worker(worker)
+
+    @staticmethod
+    def refresh_index(index, cache_path, progress=None, is_cancelled=None):
+        changed, removed = index.update(progress, is_cancelled)
+        if changed or removed:
+            index.save(cache_path)
+        return index
+
+    def index_progress(self, done, total):
+        self.status_label.setText(f"正在建立索引 {done}/{total}")
+
+    def index_ready(self, worker, index):
+        if worker is not self.index_worker:
+            return
+        self.index_worker = None
+        self.index = index
+        self.status_label.setText(f"已索引 {len(index.stats)} 个文件")
+        if self.query_edit.text():
+            self.search()
+
+    def index_failed(self, worker, message):
+        if worker is self.index_worker:
+            self.index_worker = None
+            self.status_label.setText(f"建立索引失败：{message}")
+
+    def focus_query(self):
+        self.show()
+        self.raise_()
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def schedule_search(self):
+        self.search_timer.start()
+
+    def search(self):
+        self.search_timer.stop()
+        query = self.query_edit.text()
+        if self.search_worker:
+            self.search_worker.cancel()
+            self.search_worker = None
+        if not query or not self.index:
+            self.results.clear()
+            return
+        if len(query.encode('utf-8')) < MIN_QUERY_BYTES:
+            self.results.clear()
+            self.status_label.setText(f"请至少输入 {MIN_QUERY_BYTES} 个字节的查询内容")
+            return
+
+        worker = Worker(self.index.search, query, reports_progress=True)
+        worker.signals.finished.connect(lambda results: self.show_results(worker, results))
+        worker.signals.error.connect(lambda message: self.search_failed(worker, message))
+        self.search_worker = worker
+        start_worker(worker)
+
+    def show_results(self, worker, results):
+        if worker is not self.search_worker:
+            return
+        self.search_worker = None
+        self.results.clear()
+        total = 0
+        for path, count, lines in results:
+            total += count
+            file_item = QTreeWidgetItem([f"{os.path.relpath(path, self.root)} ({count})"])
+            file_item.setData(0, RESULT_ROLE, (path, lines[0][0] if lines else 0))
+            for line, preview in lines:
+                line_item = QTreeWidgetItem([f"{line + 1}: {preview}"])
+                line_item.setData(0, RESULT_ROLE, (path, line))
+                file_item.addChild(line_item)
+            self.results.addTopLevelItem(file_item)
+        self.results.expandAll()
+        self.status_label.setText(f"{len(results)} 个文件中共 {total} 处匹配")
+
+    def search_failed(self, worker, message):
+        if worker is self.search_worker:
+            self.search_worker = None
+            self.status_label.setText(f"搜索失败：{message}")
+
+    def open_result(self, item, column):
+        path, line = item.data(0, RESULT_ROLE)
+        self.editor_window.open_specific_file(path, line=line)
\ No newline at end of file
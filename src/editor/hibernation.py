@@ -0,0 +1,139 @@
+import os
+import time
+import zlib
+from PyQt6.QtCore import QObject, QTimer
+from .settings import get_setting
+from .workers import Worker, start_worker
+from .document_saver import snapshot_chunks
+
+# 检查内存预算的间隔（毫秒）
+CHECK_INTERVAL = 10000
+# 每个字符在 Scintilla 中大约占用文本和样式各一个字节
+BYTES_PER_CHAR = 2
+
+
+class TabHibernator(QObject):
+    # 编辑器内存超出预算时，把长时间未使用的标签页休眠：
+    # 未修改的文件只记录路径和修改时间，已修改的内容压缩保存，然后销毁编辑器控件
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor_window = parent
+        self.tabs = parent.tabs
+        self.current = None
+        # 标签页 -> 正在压缩快照的任务
+        self.workers = {}
+        self.tabs.currentChanged.connect(self.tab_activated)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(CHECK_INTERVAL)
+        self.timer.timeout.connect(self.check)
+        self.timer.start()
+        QTimer.singleShot(0, self.check)
+
+    def tab_activated(self, index):
+        # 离开的标签页从此刻开始计算空闲时间
+        if self.current is not None:
+            self.current.last_active = time.monotonic()
+        self.current = self.tabs.widget(index)
+
+    def memory_use(self, tab):
+        if tab.snapshot is not None:
+            return len(tab.snapshot)
+        if tab.editor is None:
+            return 0
+        return tab.editor.length() * BYTES_PER_CHAR
+
+    def total_memory(self):
+        return sum(self.memory_use(self.tabs.widget(i)) for i in range(self.tabs.count()))
+
+    def can_hibernate(self, tab):
+        window = self.editor_window
+        return (tab is not self.tabs.currentWidget() and tab.editor is not None
+                and not tab.is_loading and not tab.is_placeholder
+                and tab not in self.workers
+                and not window.saver.is_saving(tab)
+                and not window.json_formatter.is_running(tab)
+                and not window.tail_follower.is_following(tab)
+                and not window.find_bar.is_busy(tab))
+
+    def check(self):
+        total = self.total_memory()
+        budget = get_setting('editor_memory_budget')
+        idle_after = get_setting('hibernate_idle_seconds')
+        now = time.monotonic()
+        if total > budget:
+            # 从空闲最久的标签页开始休眠，直到回到预算以内
+            candidates = [self.tabs.widget(i) for i in range(self.tabs.count())]
+            candidates = [tab for tab in candidates
+                          if self.can_hibernate(tab) and now - tab.last_active >= idle_after]
+            candidates.sort(key=lambda tab: tab.last_active)
+            for tab in candidates:
+                if total <= budget:
+                    break
+                total -= self.memory_use(tab)
+                self.hibernate(tab)
+        self.editor_window.status_bar.update_memory_label(total, self.hibernated_count())
+
+    def hibernated_count(self):
+        return sum(1 for i in range(self.tabs.count()) if self.tabs.widget(i).hibernated)
+
+    def hibernate(self, tab):
+        if tab.current_file and not tab.is_modified:
+            try:
+                tab.hibernated_mtime = os.stat(tab.current_file).st_mtime_ns
+            except OSError:
+                tab.hibernated_mtime = None
+            else:
+                self.teardown(tab)
+                tab.is_placeholder = True
+                return
+
+        # 已修改或未保存的内容先复制缓冲区，压缩在后台完成
+        data = b''.join(snapshot_chunks(tab.editor))
+        version = tab.edit_version
+        worker = Worker(zlib.compress, data, 1)
+        worker.signals.finished.connect(lambda snapshot: self.compressed(tab, worker, version, snapshot))
+        worker.signals.done.connect(lambda: self.workers.pop(tab, None))
+        self.workers[tab] = worker
+        start_worker(worker)
+
+    def compressed(self, tab, worker, version, snapshot):
+        # 压缩期间标签页被激活或修改时放弃休眠
+        if (self.workers.get(tab) is not worker or self.tabs.indexOf(tab) == -1
+                or tab.edit_version != version or tab is self.tabs.currentWidget()
+                or tab.editor is None):
+            return
+        tab.snapshot = snapshot
+        self.teardown(tab)
+
+    def teardown(self, tab):
+        # 记录光标和滚动位置，恢复时按会话恢复的方式应用
+        line, column = tab.editor.getCursorPosition()
+        offset = tab.line_offset()
+        tab.restore_position = (line + offset, column, tab.editor.firstVisibleLine() + offset)
+        self.editor_window.journals.detach(tab)
+        tab.dehydrate()
+
+    def rehydrate(self, tab):
+        # 在标签页重新创建编辑器后调用，返回 True 表示已从快照恢复
+        tab.hibernated = False
+        if tab.snapshot is None:
+            if tab.current_file and tab.hibernated_mtime is not None:
+                try:
+                    changed = os.stat(tab.current_file).st_mtime_ns != tab.hibernated_mtime
+                except OSError:
+                    changed = True
+                if changed:
+                    self.editor_window.statusBar().showMessage(
+                        f"{os.path.basename(tab.current_file)} 已在外部修改，已重新加载", 5000)
+            tab.hibernated_mtime = None
+            return False
+
+        text = zlib.decompress(tab.snapshot).decode('utf-8')
+        tab.snapshot = None
+        self.editor_window.show_text(tab, text)
+        # 快照保存的是未保存的修改，恢复后仍为已修改状态，编辑日志接着记录
+        tab.is_modified = True
+        self.editor_window.journals.attach(tab)
+        self.editor_window.restore_tab_position(tab)
+        return True
\ No newline at end of file
@@ -0,0 +1,79 @@
+import time
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.Qsci import QsciScintilla
+
+# 视口上下额外着色的行数
+VIEWPORT_MARGIN = 200
+# 每次空闲着色的时间预算（秒）
+SLICE_BUDGET = 0.008
+INITIAL_CHUNK = 64 * 1024
+MIN_CHUNK = 4 * 1024
+
+
+class ViewportHighlighter(QObject):
+    # 大文档只立即为可见区域着色，其余部分在空闲时按时间片逐步完成
+    def __init__(self, tab):
+        super().__init__(tab)
+        self.editor = tab.editor
+        # [0, clean_to) 已按顺序正确着色
+        self.clean_to = 0
+        self.chunk = INITIAL_CHUNK
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setInterval(0)
+        self.idle_timer.timeout.connect(self.style_slice)
+
+        # 滚动条在重绘之前发出信号，先给新视口着色，避免 Scintilla 从头顺序着色
+        self.editor.verticalScrollBar().valueChanged.connect(self.style_viewport)
+        self.editor.textChanged.connect(self.text_changed)
+        self.style_viewport()
+        self.idle_timer.start()
+
+    def stop(self):
+        self.idle_timer.stop()
+        self.editor.verticalScrollBar().valueChanged.disconnect(self.style_viewport)
+        self.editor.textChanged.disconnect(self.text_changed)
+        self.deleteLater()
+
+    def send(self, message, wparam=0, lparam=0):
+        return self.editor.SendScintilla(message, wparam, lparam)
+
+    def colourise(self, start, end):
+        self.send(QsciScintilla.SCI_COLOURISE, start, end)
+
+    def style_viewport(self):
+        first = max(0, self.editor.firstVisibleLine() - VIEWPORT_MARGIN)
+        last = (self.editor.firstVisibleLine()
+                + self.send(QsciScintilla.SCI_LINESONSCREEN) + VIEWPORT_MARGIN)
+        start = self.send(QsciScintilla.SCI_POSITIONFROMLINE, first)
+        end = self.send(QsciScintilla.SCI_GETLINEENDPOSITION,
+                        min(last, self.editor.lines() - 1))
+        self.colourise(start, end)
+        if start <= self.clean_to < end:
+            self.clean_to = end
+
+    def text_changed(self):
+        # 编辑后 Scintilla 会把已着色位置回退到修改处
+        self.clean_to = min(self.clean_to, self.send(QsciScintilla.SCI_GETENDSTYLED))
+        self.style_viewport()
+        self.idle_timer.start()
+
+    def style_slice(self):
+        length = self.editor.length()
+        deadline = time.perf_counter() + SLICE_BUDGET
+        while self.clean_to < length:
+            started = time.perf_counter()
+            end = min(self.clean_to + self.chunk, length)
+            self.colourise(self.clean_to, end)
+            self.clean_to = end
+            # 根据实际耗时调整每块大小
+            elapsed = time.perf_counter() - started
+            if elapsed < SLICE_BUDGET / 4:
+                self.chunk *= 2
+            elif elapsed > SLICE_BUDGET:
+                self.chunk = max(MIN_CHUNK, self.chunk // 2)
+            if time.perf_counter() >= deadline:
+                return
+        self.idle_timer.stop()
+        # 后台补全后，最后着色的位置可能在视口之后，重新对齐到视口
+        self.style_viewport()
\ No newline at end of file
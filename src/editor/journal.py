@@ -0,0 +1,216 @@
+from PyQt6.QtCore import QObject, QTimer, QThreadPool, QLockFile
+import os
+import shutil
+import time
+from .settings import cache_directory
+from .workers import Worker, start_worker
+from .document_saver import snapshot_chunks
+from ..utils.edit_journal import (encode_insert, encode_delete, write_meta, append_ops,
+                                  write_snapshot, replay, has_edits, META_FILE)
+
+# Scintilla 修改通知的类型标志
+SC_MOD_INSERTTEXT = 0x1
+SC_MOD_DELETETEXT = 0x2
+# 编辑记录写入磁盘的间隔（毫秒）
+FLUSH_INTERVAL = 2000
+# 记录累计超过该大小且超过文档大小时整理为快照
+COMPACT_MIN_BYTES = 1024 * 1024
+LOCK_FILE = 'session.lock'
+
+
+class EditJournal:
+    # 单个标签页的编辑日志：起点（磁盘文件、空文档或快照）加上按顺序追加的插入和删除记录
+    def __init__(self, manager, tab, directory):
+        self.manager = manager
+        self.tab = tab
+        self.directory = directory
+        self.generation = 0
+        self.pending = []
+        # 当前这一代已记录的字节数
+        self.recorded = 0
+        self.editor = None
+
+    def attach(self):
+        if self.editor is None and self.tab.editor is not None:
+            self.editor = self.tab.editor
+            self.editor.SCN_MODIFIED.connect(self.modified)
+
+    def detach(self):
+        if self.editor is not None:
+            self.flush()
+            self.editor.SCN_MODIFIED.disconnect(self.modified)
+            self.editor = None
+
+    def reset(self, meta):
+        # 以新的起点重新开始，删除旧的记录
+        self.pending = []
+        self.recorded = 0
+        self.generation = 0
+        self.manager.submit(reset_journal, self.directory, meta)
+
+    def modified(self, position, modification_type, text, length, *args):
+        if modification_type & SC_MOD_INSERTTEXT:
+            # 通知发出时文本已插入，直接从缓冲区复制这一段
+            data = bytes(self.editor.bytes(position, position + length))[:length]
+            self.append(encode_insert(position, data))
+        elif modification_type & SC_MOD_DELETETEXT:
+            self.append(encode_delete(position, length))
+
+    def append(self, record):
+        self.pending.append(record)
+        self.recorded += len(record)
+        self.manager.schedule_flush()
+        if self.recorded > max(COMPACT_MIN_BYTES, self.editor.length()):
+            self.compact()
+
+    def flush(self):
+        if self.pending:
+            data = b''.join(self.pending)
+            self.pending = []
+            self.manager.submit(append_ops, self.directory, self.generation, data)
+
+    def compact(self):
+        # 先写完当前一代的记录，再以当前内容作为新一代的快照
+        self.flush()
+        self.generation += 1
+        self.recorded = 0
+        self.manager.submit(write_snapshot, self.directory, self.generation,
+                            snapshot_chunks(self.editor))
+
+
+def reset_journal(directory, meta):
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    write_meta(directory, meta)
+
+
+class JournalManager(QObject):
+    # 每次运行使用单独的会话目录，并用锁文件标记进程仍在运行；
+    # 启动时能获得锁的其他会话目录就是异常退出时留下的
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.root = cache_directory('journal')
+        self.session_dir = os.path.join(self.root, f"{os.getpid()}-{int(time.time() * 1000)}")
+        os.makedirs(self.session_dir, exist_ok=True)
+        self.lock = QLockFile(os.path.join(self.session_dir, LOCK_FILE))
+        self.lock.setStaleLockTime(0)
+        self.lock.tryLock(0)
+        self.journals = {}
+        self.next_id = 0
+        self.write_failed = False
+
+        # 单线程写入，保证同一日志的操作按提交顺序执行
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_INTERVAL)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def submit(self, fn, *args):
+        worker = Worker(fn, *args)
+        worker.signals.error.connect(self.journal_error)
+        start_worker(worker, self.pool)
+
+    def journal_error(self, message):
+        # 日志只是保护措施，写入失败时提示一次，不影响编辑
+        if not self.write_failed:
+            self.write_failed = True
+            self.parent().statusBar().showMessage(f"无法写入编辑日志：{message}", 10000)
+
+    def schedule_flush(self):
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        for journal in self.journals.values():
+            journal.flush()
+
+    def journal_for(self, tab):
+        journal = self.journals.get(tab)
+        if journal is None:
+            self.next_id += 1
+            directory = os.path.join(self.session_dir, f"tab-{self.next_id}")
+            journal = self.journals[tab] = EditJournal(self, tab, directory)
+        return journal
+
+    def track(self, tab, snapshot=False):
+        # 在文档内容被整体替换（打开、保存、新建、恢复）后调用，以当前状态作为新起点
+        if tab.large_file or tab.editor is None:
+            return
+        journal = self.journal_for(tab)
+        journal.detach()
+        meta = {'base': 'empty', 'file': tab.current_file, 'encoding': tab.current_encoding}
+        if tab.current_file and not snapshot:
+            try:
+                st = os.stat(tab.current_file)
+            except OSError:
+                snapshot = True
+            else:
+                meta.update(base='file', mtime=st.st_mtime_ns, size=st.st_size)
+        journal.reset(meta)
+        journal.attach()
+        if snapshot:
+            journal.compact()
+
+    def detach(self, tab):
+        journal = self.journals.get(tab)
+        if journal:
+            journal.detach()
+
+    def attach(self, tab):
+        journal = self.journals.get(tab)
+        if journal:
+            journal.attach()
+
+    def compact(self, tab):
+        journal = self.journals.get(tab)
+        if journal and journal.editor is not None:
+            journal.compact()
+
+    def discard(self, tab):
+        journal = self.journals.pop(tab, None)
+        if journal:
+            journal.detach()
+            self.submit(shutil.rmtree, journal.directory, True)
+
+    def shutdown(self):
+        # 正常退出时不需要恢复，删除本次会话的日志
+        for tab in list(self.journals):
+            self.discard(tab)
+        self.pool.waitForDone()
+        self.lock.unlock()
+        shutil.rmtree(self.session_dir, ignore_errors=True)
+
+    def crashed_sessions(self):
+        sessions = []
+        for name in os.listdir(self.root):
+            directory = os.path.join(self.root, name)
+            if directory == self.session_dir or not os.path.isdir(directory):
+                continue
+            lock = QLockFile(os.path.join(directory, LOCK_FILE))
+            lock.setStaleLockTime(0)
+            if lock.tryLock(0):
+                # 持有锁的进程已经退出
+                lock.unlock()
+                sessions.append(directory)
+        return sessions
+
+    def recoverable_journals(self, sessions):
+        return [os.path.join(session, name) for session in sessions
+                for name in sorted(os.listdir(session))
+                if os.path.isfile(os.path.join(session, name, META_FILE))
+                and has_edits(os.path.join(session, name))]
+
+
+def replay_journals(directories):
+    # 在后台线程中重放，返回 [(元数据, 内容)] 和失败信息
+    recovered = []
+    errors = []
+    for directory in directories:
+        try:
+            recovered.append(replay(directory))
+        except (OSError, ValueError, LookupError) as e:
+            errors.append(str(e))
+    return recovered, errors
\ No newline at end of file
@@ -0,0 +1,49 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from .workers import Worker, start_worker
+from ..utils.json_format import json_format_edits
+from ..utils.process_task import run_in_process
+
+
+class JsonFormatter(QObject):
+    finished = pyqtSignal(object, object, int, int)
+    failed = pyqtSignal(object, str)
+    cancelled = pyqtSignal(object)
+    progress = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 标签页 -> 正在执行的格式化任务
+        self.workers = {}
+
+    def format(self, tab, text, base, version, minify=False):
+        # 格式化和差异计算都在独立进程中完成，界面线程只负责应用编辑
+        self.cancel(tab)
+        worker = Worker(run_in_process, json_format_edits, text, minify=minify,
+                        reports_progress=True)
+        worker.signals.progress.connect(
+            lambda done, total: self.progress.emit(tab, done, total))
+        worker.signals.finished.connect(
+            lambda edits: self.finish(tab, worker, lambda: self.finished.emit(tab, edits, base, version)))
+        worker.signals.error.connect(
+            lambda message: self.finish(tab, worker, lambda: self.failed.emit(tab, message)))
+        worker.signals.cancelled.connect(
+            lambda: self.finish(tab, worker, lambda: self.cancelled.emit(tab)))
+        self.workers[tab] = worker
+        start_worker(worker)
+
+    def finish(self, tab, worker, notify):
+        # 已被取消或替换的任务结果直接丢弃
+        if self.workers.get(tab) is worker:
+            del self.workers[tab]
+            notify()
+
+    def cancel(self, tab):
+        worker = self.workers.pop(tab, None)
+        if worker:
+            worker.cancel()
+            self.cancelled.emit(tab)
+
+    def is_running(self, tab=None):
+        if tab is None:
+            return bool(self.workers)
+        return tab in self.workers
\ No newline at end of file
@@ -0,0 +1,160 @@
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.Qsci import QsciScintilla
+from .workers import Worker, start_worker
+from ..utils.json_validate import scan_json, ValidationState
+from ..utils import perf
+
+# 停止输入这么久（毫秒）后才开始检查
+VALIDATE_DELAY = 500
+# 每次交给后台检查的字节数，界面线程每次只复制这么多
+CHUNK_SIZE = 1024 * 1024
+# Scintilla 修改通知的类型标志
+SC_MOD_INSERTTEXT = 0x1
+SC_MOD_DELETETEXT = 0x2
+# 错误标记使用的指示器和页边标记编号
+ERROR_INDICATOR = 8
+ERROR_MARKER = 8
+
+
+class TabValidation:
+    def __init__(self, editor):
+        self.editor = editor
+        self.state = ValidationState()
+        self.worker = None
+        self.shown_error = None
+
+
+class JsonValidator(QObject):
+    # 输入停顿后在后台检查 JSON 结构，从编辑位置之前的检查点继续，而不是每次从头解析
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor_window = parent
+        # 标签页 -> TabValidation
+        self.tabs = {}
+        self.pending = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(VALIDATE_DELAY)
+        self.timer.timeout.connect(self.validate_pending)
+
+    def track(self, tab, file_extension):
+        # 文档内容被整体替换后调用，只检查 .json 文件
+        self.untrack(tab)
+        if file_extension.lower() != '.json' or tab.editor is None or tab.large_file:
+            return
+        editor = tab.editor
+        editor.SendScintilla(QsciScintilla.SCI_INDICSETSTYLE, ERROR_INDICATOR, QsciScintilla.INDIC_SQUIGGLE)
+        editor.SendScintilla(QsciScintilla.SCI_INDICSETFORE, ERROR_INDICATOR, QColor(220, 0, 0))
+        editor.markerDefine(QsciScintilla.MarkerSymbol.Circle, ERROR_MARKER)
+        editor.setMarkerBackgroundColor(QColor(220, 0, 0), ERROR_MARKER)
+        validation = TabValidation(editor)
+        validation.modified = lambda *args: self.modified(tab, validation, *args)
+        editor.SCN_MODIFIED.connect(validation.modified)
+        self.tabs[tab] = validation
+        self.schedule(tab)
+
+    def untrack(self, tab):
+        validation = self.tabs.pop(tab, None)
+        self.pending.discard(tab)
+        if validation and validation.editor is tab.editor:
+            validation.editor.SCN_MODIFIED.disconnect(validation.modified)
+            self.clear_markers(validation)
+
+    def shutdown(self):
+        # 退出前取消所有检查，之后的结果和后续分块都会被丢弃
+        self.timer.stop()
+        self.pending.clear()
+        for tab, validation in self.tabs.items():
+            if validation.worker:
+                validation.worker.cancel()
+                validation.worker = None
+                perf.discard('json.validate', tab)
+
+    def modified(self, tab, validation, position, modification_type, text, length, *args):
+        # 每次输入只移动检查点，解析留到停顿之后
+        if modification_type & SC_MOD_INSERTTEXT:
+            validation.state.edited(position, length, 0)
+        elif modification_type & SC_MOD_DELETETEXT:
+            validation.state.edited(position, 0, length)
+        else:
+            return
+        # 正在执行的检查基于旧内容，结果会被丢弃
+        validation.worker = None
+        self.schedule(tab)
+
+    def schedule(self, tab):
+        self.pending.add(tab)
+        self.timer.start()
+
+    def validate_pending(self):
+        pending, self.pending = self.pending, set()
+        for tab in pending:
+            validation = self.tabs.get(tab)
+            if validation is None or validation.editor is not tab.editor:
+                continue
+            if validation.state.is_clean():
+                self.show_result(validation)
+                continue
+            start, stack, expect = validation.state.resume_point()
+            perf.begin('json.validate', tab, start=start)
+            self.step(tab, validation, start, stack, expect, CHUNK_SIZE)
+
+    def step(self, tab, validation, start, stack, expect, size):
+        editor = validation.editor
+        length = editor.length()
+        end = min(length, start + size)
+        data = bytes(editor.bytes(start, end))[:end - start]
+        converge = validation.state.convergence_points(start, end)
+        worker = Worker(scan_json, data, start, stack, expect, end == length, converge)
+        worker.signals.finished.connect(
+            lambda result: self.scanned(tab, validation, worker, start, size, result))
+        worker.signals.error.connect(lambda message: self.failed(tab, validation, worker))
+        validation.worker = worker
+        start_worker(worker)
+
+    def scanned(self, tab, validation, worker, start, size, result):
+        # 检查期间文本又有变化的结果直接丢弃，停顿后会重新检查
+        if (validation.worker is not worker or self.tabs.get(tab) is not validation
+                or validation.editor is not tab.editor):
+            perf.discard('json.validate', tab)
+            return
+        validation.worker = None
+        validation.state.apply(start, result)
+        if result.status == 'incomplete':
+            # 单个记号超过一块时扩大下一块
+            size = size * 2 if result.pos == start else CHUNK_SIZE
+            self.step(tab, validation, result.pos, result.stack, result.expect, size)
+            return
+        perf.end('json.validate', tab, status=result.status)
+        self.show_result(validation)
+
+    def failed(self, tab, validation, worker):
+        if validation.worker is worker:
+            validation.worker = None
+            perf.discard('json.validate', tab)
+
+    def show_result(self, validation):
+        error = validation.state.error
+        if error == validation.shown_error:
+            return
+        self.clear_markers(validation)
+        validation.shown_error = error
+        if error is None:
+            return
+        editor = validation.editor
+        pos, message = error
+        line = editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, pos)
+        line_end = editor.SendScintilla(QsciScintilla.SCI_GETLINEENDPOSITION, line)
+        editor.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, ERROR_INDICATOR)
+        editor.SendScintilla(QsciScintilla.SCI_INDICATORFILLRANGE, pos, max(line_end - pos, 1))
+        editor.markerAdd(line, ERROR_MARKER)
+        if editor is self.editor_window.current_editor():
+            self.editor_window.statusBar().showMessage(f"JSON 错误：第 {line + 1} 行：{message}", 10000)
+
+    def clear_markers(self, validation):
+        editor = validation.editor
+        editor.SendScintilla(QsciScintilla.SCI_SETINDICATORCURRENT, ERROR_INDICATOR)
+        editor.SendScintilla(QsciScintilla.SCI_INDICATORCLEARRANGE, 0, editor.length())
+        editor.markerDeleteAll(ERROR_MARKER)
+        validation.shown_error = None
\ No newline at end of file
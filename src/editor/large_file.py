@@ -0,0 +1,167 @@
+from PyQt6.QtWidgets import QScrollBar
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.Qsci import QsciScintilla
+from .workers import Worker, start_worker
+from ..utils.encoding import detect_encoding
+from ..utils.line_index import MappedFile
+
+# 编辑器中最多保留的行数和字节数
+WINDOW_LINES = 20000
+WINDOW_BYTES = 16 * 1024 * 1024
+# 视口距离窗口边缘小于该行数时重新取窗口
+WINDOW_MARGIN = 2000
+
+# Scintilla 的 UPDATEUI 通知中表示垂直滚动的标志
+SC_UPDATE_V_SCROLL = 0x4
+
+
+class LargeFileView(QObject):
+    progress = pyqtSignal(object, object)
+    indexed = pyqtSignal()
+
+    def __init__(self, tab, path, encoding=None):
+        super().__init__(tab)
+        self.tab = tab
+        self.editor = tab.editor
+        self.document = MappedFile(path)
+
+        if encoding is None:
+            detection = detect_encoding(self.document.data)
+            encoding, self.confidence = detection.encoding, detection.confidence
+        else:
+            self.confidence = 1.0
+        if encoding.startswith(('utf-16', 'utf-32')):
+            # 按 b'\n' 切分行只适用于兼容 ASCII 的编码
+            self.document.close()
+            raise ValueError("大文件模式不支持 UTF-16/UTF-32 编码")
+        self.encoding = encoding
+
+        self.window_start = 0
+        self.window_end = 0
+        self.updating = False
+        self.worker = None
+        self.closed = False
+
+        # 外部滚动条代表整个文件，编辑器自身只显示窗口内的行
+        self.scroll_bar = QScrollBar(Qt.Orientation.Vertical)
+        self.scroll_bar.valueChanged.connect(self.scroll_to)
+        tab.editor_layout.addWidget(self.scroll_bar)
+
+        self.editor.setReadOnly(True)
+        self.editor.SendScintilla(QsciScintilla.SCI_SETVSCROLLBAR, False)
+        self.editor.setMarginType(0, QsciScintilla.MarginType.TextMargin)
+        self.editor.SCN_UPDATEUI.connect(self.editor_updated)
+
+        # 先同步索引第一块，保证立即有内容可显示，其余部分在后台建立
+        self.document.index_chunk()
+        self.load_window(0)
+        self.update_scroll_range()
+        if not self.document.complete:
+            self.start_indexing()
+
+    def start_indexing(self):
+        self.worker = Worker(self.document.build_index, reports_progress=True)
+        self.worker.signals.progress.connect(self.index_progress)
+        self.worker.signals.finished.connect(self.index_finished)
+        self.worker.signals.done.connect(self.indexing_done)
+        start_worker(self.worker)
+
+    def index_progress(self, done, total):
+        self.update_scroll_range()
+        self.progress.emit(done, total)
+
+    def index_finished(self, line_count):
+        if self.closed:
+            return
+        self.update_scroll_range()
+        self.indexed.emit()
+
+    def indexing_done(self):
+        # 任务结束的信号总会送达，视图已关闭时在这里解除映射
+        self.worker = None
+        if self.closed:
+            self.document.close()
+
+    def cancel_indexing(self):
+        if self.worker:
+            self.worker.cancel()
+
+    def line_count(self):
+        return self.document.line_count()
+
+    def update_scroll_range(self):
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setRange(0, max(0, self.line_count() - 1))
+        self.scroll_bar.setPageStep(max(1, self.lines_on_screen()))
+        self.scroll_bar.blockSignals(False)
+        self.editor.setMarginWidth(0, "0" * (len(str(self.line_count())) + 1))
+
+    def lines_on_screen(self):
+        return self.editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN)
+
+    def load_window(self, first):
+        # 记住光标所在的全局行，换窗口后恢复
+        line, column = self.editor.getCursorPosition()
+        cursor_line = self.window_start + line
+
+        first, last, data = self.document.line_range(first, WINDOW_LINES, WINDOW_BYTES)
+        self.updating = True
+        self.tab.load_text(data.decode(self.encoding, errors='replace'))
+        self.window_start, self.window_end = first, last
+
+        # 行号边栏显示文件中的真实行号
+        self.editor.clearMarginText()
+        for i in range(last - first):
+            self.editor.setMarginText(i, str(first + i + 1), QsciScintilla.STYLE_LINENUMBER)
+
+        if first <= cursor_line < last:
+            self.editor.setCursorPosition(cursor_line - first, column)
+        self.updating = False
+
+    def needs_reload(self, line):
+        screen = self.lines_on_screen()
+        if not self.window_start <= line or line + screen > self.window_end:
+            return True
+        near_top = self.window_start > 0 and line - self.window_start < WINDOW_MARGIN
+        near_bottom = (self.window_end < self.line_count()
+                       and self.window_end - (line + screen) < WINDOW_MARGIN)
+        return near_top or near_bottom
+
+    def show_line(self, line):
+        if self.needs_reload(line):
+            self.load_window(max(0, line - WINDOW_LINES // 2))
+        self.updating = True
+        self.editor.setFirstVisibleLine(line - self.window_start)
+        self.updating = False
+
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setValue(line)
+        self.scroll_bar.blockSignals(False)
+
+    def scroll_to(self, line):
+        if not self.updating:
+            self.show_line(line)
+
+    def editor_updated(self, updated):
+        # 编辑器内部滚动（滚轮、键盘）时同步外部滚动条，必要时翻页
+        if self.updating or not updated & SC_UPDATE_V_SCROLL:
+            return
+        self.show_line(self.window_start + self.editor.firstVisibleLine())
+
+    def goto_line(self, line):
+        self.show_line(max(0, line - self.lines_on_screen() // 2))
+        self.editor.setCursorPosition(line - self.window_start, 0)
+        self.editor.ensureLineVisible(line - self.window_start)
+
+    def set_encoding(self, encoding):
+        self.encoding = encoding
+        self.confidence = 1.0
+        self.load_window(self.window_start)
+
+    def close(self):
+        # 后台索引结束后再解除映射，由 indexing_done 完成
+        self.closed = True
+        if self.worker:
+            self.worker.cancel()
+        else:
+            self.document.close()
\ No newline at end of file
@@ -0,0 +1,28 @@
+from PyQt6 import Qsci
+
+# 扩展名 -> 创建词法分析器的函数，只在真正需要时才创建
+_registry = {}
+
+
+def register_lexer(extensions, factory):
+    for extension in extensions:
+        _registry[extension.lower()] = factory
+
+
+def create_lexer(file_extension):
+    factory = _registry.get(file_extension.lower())
+    return factory() if factory else None
+
+
+def qsci_lexer(class_name):
+    # 按类名延迟查找 QScintilla 自带的词法分析器
+    def factory():
+        return getattr(Qsci, class_name)()
+    return factory
+
+
+register_lexer(['.py'], qsci_lexer('QsciLexerPython'))
+register_lexer(['.sql'], qsci_lexer('QsciLexerSQL'))
+register_lexer(['.md'], qsci_lexer('QsciLexerMarkdown'))
+register_lexer(['.html', '.htm'], qsci_lexer('QsciLexerHTML'))
+register_lexer(['.json'], qsci_lexer('QsciLexerJSON'))
\ No newline at end of file
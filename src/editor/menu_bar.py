@@ -1,5 +1,6 @@
 from PyQt6.QtWidgets import QMenuBar, QMenu
 from PyQt6.QtGui import QAction, QKeySequence
+from .settings import get_setting
 
 class MenuBarManager:
     def __init__(self, parent):
@@ -20,6 +21,10 @@ class MenuBarManager:
         # 格式化菜单
         format_menu = menubar.addMenu('格式化')
         self.add_format_actions(format_menu)
+        
+        # 工具菜单
+        tools_menu = menubar.addMenu('工具')
+        self.add_tools_actions(tools_menu)
 
     def add_file_actions(self, menu):
         new_action = QAction('新建', self.parent)
@@ -32,19 +37,71 @@ class MenuBarManager:
         open_action.triggered.connect(self.parent.open_file)
         menu.addAction(open_action)
         
+        quick_open_action = QAction('快速打开', self.parent)
+        quick_open_action.setShortcut('Ctrl+P')
+        quick_open_action.triggered.connect(self.parent.show_quick_open)
+        menu.addAction(quick_open_action)
+        
         save_action = QAction('保存', self.parent)
         save_action.setShortcut(QKeySequence.StandardKey.Save)
         save_action.triggered.connect(self.parent.save_file)
         menu.addAction(save_action)
 
     def add_edit_actions(self, menu):
+        find_action = QAction('查找', self.parent)
+        find_action.setShortcut(QKeySequence.StandardKey.Find)
+        find_action.triggered.connect(lambda: self.parent.show_find_bar())
+        menu.addAction(find_action)
+        
+        replace_action = QAction('替换', self.parent)
+        replace_action.setShortcut('Ctrl+H')
+        replace_action.triggered.connect(lambda: self.parent.show_find_bar(replace=True))
+        menu.addAction(replace_action)
+        
         goto_action = QAction('跳转到行', self.parent)
         goto_action.setShortcut('Ctrl+G')
         goto_action.triggered.connect(self.parent.goto_line)
         menu.addAction(goto_action)
+        
+        find_in_files_action = QAction('在文件中查找', self.parent)
+        find_in_files_action.setShortcut('Ctrl+Shift+F')
+        find_in_files_action.triggered.connect(self.parent.show_find_in_files)
+        menu.addAction(find_in_files_action)
+        
+        split_action = QAction('拆分视图', self.parent)
+        split_action.setShortcut('Ctrl+\\')
+        split_action.triggered.connect(self.parent.toggle_split)
+        menu.addAction(split_action)
 
     def add_format_actions(self, menu):
         format_json_action = QAction('格式化JSON', self.parent)
         format_json_action.setShortcut('Ctrl+Shift+J')
-        format_json_action.triggered.connect(self.parent.format_json)
-        menu.addAction(format_json_action) 
\ No newline at end of file
+        format_json_action.triggered.connect(lambda: self.parent.format_json())
+        menu.addAction(format_json_action)
+        
+        format_selection_action = QAction('格式化选中JSON', self.parent)
+        format_selection_action.triggered.connect(lambda: self.parent.format_json(selection_only=True))
+        menu.addAction(format_selection_action)
+        
+        minify_json_action = QAction('压缩JSON', self.parent)
+        minify_json_action.setShortcut('Ctrl+Alt+J')
+        minify_json_action.triggered.connect(lambda: self.parent.format_json(minify=True))
+        menu.addAction(minify_json_action)
+
+    def add_tools_actions(self, menu):
+        self.perf_action = QAction('性能监控', self.parent)
+        self.perf_action.setCheckable(True)
+        self.perf_action.setChecked(get_setting('perf_enabled'))
+        self.perf_action.toggled.connect(self.parent.set_perf_enabled)
+        menu.addAction(self.perf_action)
+        
+        # 只在用户点击时切换，切换标签页时同步勾选状态不会触发
+        self.follow_action = QAction('跟踪文件末尾', self.parent)
+        self.follow_action.setCheckable(True)
+        self.follow_action.triggered.connect(self.parent.toggle_follow)
+        menu.addAction(self.follow_action)
+        
+        outline_action = QAction('大纲', self.parent)
+        outline_action.setShortcut('Ctrl+Shift+O')
+        outline_action.triggered.connect(self.parent.show_outline)
+        menu.addAction(outline_action) 
\ No newline at end of file
@@ -0,0 +1,219 @@
+from PyQt6.QtWidgets import QDockWidget, QTreeWidget, QTreeWidgetItem
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.Qsci import QsciScintilla
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+from .workers import Worker, start_worker
+from .document_saver import snapshot_chunks
+from ..utils.outline import extract_outline, has_outline, LINE_LOCAL
+from ..utils.process_task import run_in_process
+from ..utils import perf
+
+# 停止输入多久后更新大纲（毫秒）
+OUTLINE_DELAY = 500
+# 修改的行数超过该值时整体重新提取
+INCREMENTAL_LINES = 2000
+# 按内容哈希缓存的大纲数量
+CACHE_SIZE = 32
+LINE_ROLE = Qt.ItemDataRole.UserRole
+# Scintilla 修改通知的类型标志
+SC_MOD_INSERTTEXT = 0x1
+SC_MOD_DELETETEXT = 0x2
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def outline_for_chunks(chunks, file_extension, progress=None, is_cancelled=None):
+    # 内容相同（如切换回未修改的标签页）时直接使用缓存，否则在独立进程中提取
+    data = b''.join(chunks)
+    key = (file_extension.lower(), hashlib.sha1(data).digest())
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    entries = run_in_process(extract_outline, data.decode('utf-8', 'replace'), file_extension,
+                             is_cancelled=is_cancelled)
+    with _cache_lock:
+        _cache[key] = entries
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entries
+
+
+class TabOutline:
+    # 单个标签页的大纲：条目按行号排序，记录上次提取后被修改过的行范围
+    def __init__(self, editor):
+        self.editor = editor
+        self.entries = []
+        self.dirty = None
+        self.full = True
+        # 条目对应的文档版本
+        self.version = None
+
+    def edited(self, line, lines_added):
+        # 修改位置之后的条目随行号移动，被删除行上的条目丢弃
+        if lines_added:
+            removed_end = line - lines_added
+            self.entries = [(l + lines_added if l > line else l, indent, kind, name)
+                            for l, indent, kind, name in self.entries
+                            if not line < l <= removed_end]
+        first, last = line, line + max(lines_added, 0)
+        if self.dirty:
+            old_first, old_last = self.dirty
+            if old_last > line:
+                old_last = max(old_last + lines_added, line)
+            first, last = min(first, old_first), max(last, old_last)
+        self.dirty = (first, last)
+
+    def replace(self, region, entries):
+        if region is None:
+            self.entries = entries
+            return
+        first, last = region
+        kept = [entry for entry in self.entries if not first <= entry[0] <= last]
+        self.entries = sorted(kept + entries)
+
+
+class OutlinePanel(QDockWidget):
+    def __init__(self, parent):
+        super().__init__("大纲", parent)
+        self.editor_window = parent
+        self.tab = None
+        self.editor = None
+        # 标签页 -> TabOutline
+        self.outlines = {}
+        self.worker = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.itemClicked.connect(self.jump_to_item)
+        self.tree.itemActivated.connect(self.jump_to_item)
+        self.setWidget(self.tree)
+
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(OUTLINE_DELAY)
+        self.update_timer.timeout.connect(self.update_outline)
+        self.visibilityChanged.connect(
+            lambda visible: visible and self.set_tab(self.editor_window.current_tab()))
+
+    def file_extension(self, tab):
+        return os.path.splitext(tab.current_file or '')[1].lower()
+
+    def set_tab(self, tab):
+        # 切换标签页或文档内容被整体替换后调用，只跟踪当前标签页的修改
+        if self.editor is not None:
+            try:
+                self.editor.SCN_MODIFIED.disconnect(self.modified)
+            except (TypeError, RuntimeError):
+                pass
+            self.editor = None
+        self.tab = tab
+        self.update_timer.stop()
+        if (tab is None or not self.isVisible() or tab.editor is None or tab.large_file
+                or not has_outline(self.file_extension(tab))):
+            self.tree.clear()
+            return
+        self.editor = tab.editor
+        self.editor.SCN_MODIFIED.connect(self.modified)
+        outline = self.outlines.get(tab)
+        if outline is None or outline.editor is not tab.editor or outline.version != tab.edit_version:
+            # 不在当前时的修改没有跟踪，整体重新提取（内容未变时命中缓存）
+            outline = TabOutline(tab.editor)
+            self.outlines[tab] = outline
+            self.update_outline()
+        self.show_entries(outline.entries)
+
+    def forget(self, tab):
+        self.outlines.pop(tab, None)
+        if tab is self.tab:
+            self.set_tab(None)
+
+    def modified(self, position, modification_type, text, length, lines_added, *args):
+        if not modification_type & (SC_MOD_INSERTTEXT | SC_MOD_DELETETEXT):
+            return
+        outline = self.outlines.get(self.tab)
+        if outline is None:
+            return
+        line = self.editor.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, position)
+        outline.edited(line, lines_added)
+        self.update_timer.start()
+
+    def update_outline(self):
+        tab = self.tab
+        outline = self.outlines.get(tab)
+        if outline is None or tab.editor is not outline.editor:
+            return
+        if self.worker:
+            self.worker.cancel()
+        editor = tab.editor
+        file_extension = self.file_extension(tab)
+        region = None
+        if (not outline.full and outline.dirty and file_extension in LINE_LOCAL
+                and outline.dirty[1] - outline.dirty[0] <= INCREMENTAL_LINES):
+            # 只重新提取修改过的行，文本量很小，在线程中处理
+            first, last = outline.dirty
+            last = min(last, editor.lines() - 1)
+            start = editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, first)
+            end = editor.SendScintilla(QsciScintilla.SCI_GETLINEENDPOSITION, last)
+            text = bytes(editor.bytes(start, end))[:end - start].decode('utf-8', 'replace')
+            region = (first, last)
+            worker = Worker(extract_outline, text, file_extension, first)
+        else:
+            worker = Worker(outline_for_chunks, snapshot_chunks(editor), file_extension,
+                            reports_progress=True)
+        outline.dirty = None
+        outline.full = False
+        version = tab.edit_version
+        worker.signals.finished.connect(
+            lambda entries: self.outline_ready(tab, outline, worker, version, region, entries))
+        worker.signals.error.connect(lambda message: self.outline_failed(worker))
+        self.worker = worker
+        perf.begin('outline', tab, incremental=region is not None)
+        start_worker(worker)
+
+    def outline_ready(self, tab, outline, worker, version, region, entries):
+        if self.worker is not worker:
+            return
+        self.worker = None
+        if tab.edit_version != version or self.outlines.get(tab) is not outline:
+            # 提取期间又有修改，已记录的修改范围不包含这次提取的区域，整体重新提取
+            perf.discard('outline', tab)
+            outline.full = True
+            if tab is self.tab:
+                self.update_timer.start()
+            return
+        outline.replace(region, entries)
+        outline.version = version
+        perf.end('outline', tab, entries=len(entries))
+        if tab is self.tab:
+            self.show_entries(outline.entries)
+
+    def outline_failed(self, worker):
+        if self.worker is worker:
+            self.worker = None
+
+    def show_entries(self, entries):
+        # 按缩进把平铺的条目组织成树
+        self.tree.clear()
+        stack = []
+        for line, indent, kind, name in entries:
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            parent = stack[-1][1] if stack else self.tree
+            label = name if kind in ('heading', 'key', 'statement') else f"{kind} {name}"
+            item = QTreeWidgetItem(parent, [label])
+            item.setData(0, LINE_ROLE, line)
+            item.setToolTip(0, f"第 {line + 1} 行")
+            stack.append((indent, item))
+        self.tree.expandAll()
+
+    def jump_to_item(self, item):
+        tab = self.tab
+        if tab is not None and tab.editor is not None:
+            self.editor_window.jump_to_line(tab, item.data(0, LINE_ROLE))
\ No newline at end of file
@@ -0,0 +1,81 @@
+from PyQt6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
+                             QListWidget, QListWidgetItem, QLabel, QHeaderView)
+from PyQt6.QtCore import QTimer
+import time
+from ..utils import perf
+
+# 刷新间隔（毫秒）
+REFRESH_INTERVAL = 1000
+# 列表中显示的最近记录数
+RECENT_ROWS = 200
+COLUMNS = ['操作', '次数', '最近', 'P50', 'P90', 'P99', '最大']
+
+
+def format_ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.1f} ms"
+
+
+class PerfPanel(QDockWidget):
+    def __init__(self, parent):
+        super().__init__("性能监控", parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        self.summary = QTableWidget(0, len(COLUMNS))
+        self.summary.setHorizontalHeaderLabels(COLUMNS)
+        self.summary.verticalHeader().setVisible(False)
+        self.summary.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.summary.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+
+        self.recent_list = QListWidget()
+
+        layout.addWidget(self.summary)
+        layout.addWidget(QLabel("最近记录"))
+        layout.addWidget(self.recent_list)
+        self.setWidget(widget)
+
+        # 只在面板可见时刷新
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.visibility_changed)
+
+    def visibility_changed(self, visible):
+        if visible:
+            self.refresh()
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+
+    def refresh(self):
+        entries = perf.recent()
+        durations = {}
+        last = {}
+        for entry in entries:
+            durations.setdefault(entry['name'], []).append(entry['duration'])
+            last[entry['name']] = entry['duration']
+
+        self.summary.setRowCount(len(durations))
+        for row, name in enumerate(sorted(durations)):
+            values = sorted(durations[name])
+            cells = [name, str(len(values)), format_ms(last[name]),
+                     format_ms(perf.percentile(values, 0.5)),
+                     format_ms(perf.percentile(values, 0.9)),
+                     format_ms(perf.percentile(values, 0.99)),
+                     format_ms(values[-1])]
+            for column, text in enumerate(cells):
+                self.summary.setItem(row, column, QTableWidgetItem(text))
+
+        self.recent_list.clear()
+        for entry in reversed(entries[-RECENT_ROWS:]):
+            details = ' '.join(f"{key}={value}" for key, value in entry.items()
+                               if key not in ('time', 'name', 'duration', 'thread', 'stack'))
+            stamp = time.strftime('%H:%M:%S', time.localtime(entry['time']))
+            item = QListWidgetItem(f"{stamp} {entry['name']} {format_ms(entry['duration'])} {details}")
+            if entry.get('stack'):
+                # 卡顿记录附带界面线程的调用栈
+                item.setToolTip(''.join(entry['stack']))
+            self.recent_list.addItem(item)
\ No newline at end of file
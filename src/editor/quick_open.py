@@ -0,0 +1,130 @@
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+from PyQt6.QtCore import Qt
+import os
+from .settings import cache_directory
+from .session import recent_files
+from .workers import Worker, start_worker
+from ..utils.path_index import load_path_index
+from ..utils.file_io import cache_file_name
+
+# 最多显示的结果数
+RESULT_LIMIT = 50
+PATH_ROLE = Qt.ItemDataRole.UserRole
+
+
+class QuickOpenDialog(QDialog):
+    # Ctrl+P 快速打开：按文件名模糊匹配根目录下的所有文件
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor_window = parent
+        self.root = None
+        self.index = None
+        self.index_worker = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("快速打开")
+        self.resize(600, 400)
+        layout = QVBoxLayout(self)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("输入文件名")
+        self.query_edit.textChanged.connect(self.search)
+        self.query_edit.returnPressed.connect(self.open_selected)
+        # 在输入框中用方向键选择结果
+        self.query_edit.keyPressEvent = self.query_key_pressed
+
+        self.status_label = QLabel()
+
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.open_item)
+
+        layout.addWidget(self.query_edit)
+        layout.addWidget(self.results)
+        layout.addWidget(self.status_label)
+
+    def query_key_pressed(self, event):
+        key = event.key()
+        if key in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+            row = self.results.currentRow() + (1 if key == Qt.Key.Key_Down else -1)
+            if 0 <= row < self.results.count():
+                self.results.setCurrentRow(row)
+            return
+        QLineEdit.keyPressEvent(self.query_edit, event)
+
+    def open_for_root(self, root):
+        if root != self.root:
+            self.root = root
+            self.index = None
+        # 每次打开都在后台增量更新索引，先用已有的索引显示结果
+        self.update_index()
+        self.query_edit.selectAll()
+        self.query_edit.setFocus()
+        self.search()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def update_index(self):
+        if self.index_worker:
+            return
+        cache_path = os.path.join(cache_directory('paths'), cache_file_name(self.root))
+        if self.index is None:
+            worker = Worker(load_path_index, self.root, cache_path)
+            self.status_label.setText("正在建立文件索引...")
+        else:
+            worker = Worker(self.refresh_index, self.index, cache_path)
+        root = self.root
+        worker.signals.finished.connect(lambda index: self.index_ready(worker, root, index))
+        worker.signals.error.connect(lambda message: self.index_failed(worker, message))
+        self.index_worker = worker
+        start_worker(worker)
+
+    @staticmethod
+    def refresh_index(index, cache_path):
+        if index.update():
+            index.save(cache_path)
+        return index
+
+    def index_ready(self, worker, root, index):
+        if worker is not self.index_worker:
+            return
+        self.index_worker = None
+        if root != self.root:
+            # 索引期间根目录已改变
+            if self.isVisible():
+                self.update_index()
+            return
+        self.index = index
+        if self.isVisible():
+            self.search()
+
+    def index_failed(self, worker, message):
+        if worker is self.index_worker:
+            self.index_worker = None
+            self.status_label.setText(f"建立文件索引失败：{message}")
+
+    def search(self):
+        if self.index is None:
+            return
+        paths = self.index.search(self.query_edit.text(), RESULT_LIMIT, recent_files())
+        self.results.clear()
+        for path in paths:
+            rel_path = os.path.relpath(path, self.root)
+            item = QListWidgetItem(f"{os.path.basename(path)}    {os.path.dirname(rel_path)}")
+            item.setData(PATH_ROLE, path)
+            item.setToolTip(path)
+            self.results.addItem(item)
+        if paths:
+            self.results.setCurrentRow(0)
+        self.status_label.setText(f"共 {len(self.index)} 个文件")
+
+    def open_selected(self):
+        item = self.results.currentItem()
+        if item:
+            self.open_item(item)
+
+    def open_item(self, item):
+        self.hide()
+        # 与其他打开方式相同，已打开的文件直接切换标签页
+        self.editor_window.open_specific_file(item.data(PATH_ROLE))
\ No newline at end of file
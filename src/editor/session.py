@@ -0,0 +1,61 @@
+import json
+from .settings import settings
+
+SESSION_KEY = 'session'
+RECENT_FILES_KEY = 'recent_files'
+# 最多记录的最近打开文件数
+RECENT_FILES_LIMIT = 50
+
+
+def tab_state(tab):
+    # 未激活过的标签页沿用恢复时的位置
+    if tab.editor is None or tab.is_placeholder:
+        line, column, first_visible = tab.restore_position or (0, 0, 0)
+    else:
+        line, column = tab.editor.getCursorPosition()
+        first_visible = tab.editor.firstVisibleLine()
+        offset = tab.line_offset()
+        line, first_visible = line + offset, first_visible + offset
+    return {
+        'file': tab.current_file,
+        'encoding': tab.current_encoding,
+        'line': line,
+        'column': column,
+        'first_visible': first_visible,
+    }
+
+
+def save_session(tabs):
+    state = {'tabs': [], 'current': 0}
+    for i in range(tabs.count()):
+        tab = tabs.widget(i)
+        if not tab.current_file:
+            continue
+        if i == tabs.currentIndex():
+            state['current'] = len(state['tabs'])
+        state['tabs'].append(tab_state(tab))
+    settings().setValue(SESSION_KEY, json.dumps(state, ensure_ascii=False))
+
+
+def load_session():
+    try:
+        state = json.loads(settings().value(SESSION_KEY, '{}', type=str))
+    except ValueError:
+        return {'tabs': [], 'current': 0}
+    state.setdefault('tabs', [])
+    state.setdefault('current', 0)
+    return state
+
+
+def recent_files():
+    try:
+        files = json.loads(settings().value(RECENT_FILES_KEY, '[]', type=str))
+    except ValueError:
+        return []
+    return files if isinstance(files, list) else []
+
+
+def add_recent_file(path):
+    # 最近打开的排在最前
+    files = [path] + [f for f in recent_files() if f != path]
+    settings().setValue(RECENT_FILES_KEY, json.dumps(files[:RECENT_FILES_LIMIT], ensure_ascii=False))
\ No newline at end of file
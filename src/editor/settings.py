@@ -0,0 +1,43 @@
+from PyQt6.QtCore import QSettings, QStandardPaths
+import os
+
+# 可配置项及默认值
+DEFAULTS = {
+    # 超过该大小的文件以只读的大文件模式打开
+    'large_file_threshold': 64 * 1024 * 1024,
+    # 超过该大小的文档只为可见区域立即着色，其余部分空闲时逐步着色
+    'incremental_highlight_threshold': 1024 * 1024,
+    # 超过该大小的文档不做语法高亮，按纯文本显示
+    'plain_text_threshold': 32 * 1024 * 1024,
+    # 记录性能数据并检测界面卡顿
+    'perf_enabled': False,
+    # 界面线程阻塞超过该时间（毫秒）时记录为卡顿
+    'stall_threshold_ms': 200,
+    # 所有编辑器的内存预算，超出时休眠空闲的标签页
+    'editor_memory_budget': 512 * 1024 * 1024,
+    # 标签页至少空闲这么久（秒）才会被休眠
+    'hibernate_idle_seconds': 600,
+    # 跟踪文件末尾时最多保留的行数，0 表示不限制
+    'tail_max_lines': 0,
+}
+
+
+def settings():
+    return QSettings('editordemo', 'editordemo')
+
+
+def get_setting(key):
+    default = DEFAULTS[key]
+    return settings().value(key, default, type=type(default))
+
+
+def set_setting(key, value):
+    settings().setValue(key, value)
+
+
+def cache_directory(*parts):
+    # 索引、会话等本地缓存的存放目录
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    path = os.path.join(base or os.path.expanduser('~/.cache/editordemo'), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
\ No newline at end of file
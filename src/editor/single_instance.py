@@ -0,0 +1,97 @@
+# 客户端路径只依赖 QtCore 和 QtNetwork，转发文件后可以立即退出
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+import json
+import os
+import re
+
+# 按用户区分，避免不同用户的编辑器互相转发
+SERVER_NAME = 'editordemo-' + (os.environ.get('USER') or os.environ.get('USERNAME') or 'default')
+# 连接和发送的超时时间（毫秒）
+CONNECT_TIMEOUT = 500
+
+LINE_SUFFIX = re.compile(r'^(.+?):(\d+)$')
+
+
+def parse_target(arg):
+    # "路径:行号" 拆成 (绝对路径, 从 0 开始的行号)；不带行号或路径本身存在时行号为 None
+    match = LINE_SUFFIX.match(arg)
+    if match and not os.path.exists(arg):
+        path, line = match.group(1), max(int(match.group(2)) - 1, 0)
+    else:
+        path, line = arg, None
+    return os.path.abspath(path), line
+
+
+def send_to_running_instance(targets):
+    # 有正在运行的实例时把要打开的文件交给它，返回是否成功
+    socket = QLocalSocket()
+    socket.connectToServer(SERVER_NAME)
+    if not socket.waitForConnected(CONNECT_TIMEOUT):
+        return False
+    message = json.dumps({'files': targets}) + '\n'
+    socket.write(message.encode('utf-8'))
+    if not socket.waitForBytesWritten(CONNECT_TIMEOUT):
+        return False
+    socket.disconnectFromServer()
+    if socket.state() != QLocalSocket.LocalSocketState.UnconnectedState:
+        socket.waitForDisconnected(CONNECT_TIMEOUT)
+    return True
+
+
+def instance_running():
+    # 能连上说明名字属于正在运行的实例，而不是异常退出留下的套接字文件
+    socket = QLocalSocket()
+    socket.connectToServer(SERVER_NAME)
+    running = socket.waitForConnected(CONNECT_TIMEOUT)
+    socket.abort()
+    return running
+
+
+class InstanceServer(QObject):
+    # 参数为 [(路径, 行号)]，行号可能为 None；列表为空时只需激活窗口
+    files_requested = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.accept)
+        # 连接 -> 已收到的数据
+        self.buffers = {}
+
+    def listen(self):
+        if self.server.listen(SERVER_NAME):
+            return True
+        # 同时启动的另一个实例已经先开始监听，不能删除它的套接字
+        if instance_running():
+            return False
+        # 上次异常退出留下的套接字文件会导致监听失败，清理后重试
+        QLocalServer.removeServer(SERVER_NAME)
+        return self.server.listen(SERVER_NAME)
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b''
+            socket.readyRead.connect(lambda socket=socket: self.receive(socket))
+            socket.disconnected.connect(lambda socket=socket: self.closed(socket))
+
+    def receive(self, socket):
+        self.buffers[socket] += bytes(socket.readAll())
+        while b'\n' in self.buffers[socket]:
+            line, self.buffers[socket] = self.buffers[socket].split(b'\n', 1)
+            try:
+                files = json.loads(line.decode('utf-8'))['files']
+                targets = [(path, line) for path, line in files]
+            except (ValueError, KeyError, TypeError):
+                continue
+            self.files_requested.emit(targets)
+
+    def closed(self, socket):
+        if socket in self.buffers:
+            self.receive(socket)
+            del self.buffers[socket]
+        socket.deleteLater()
+
+    def close(self):
+        self.server.close()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import sys
+import threading
+import time
+import traceback
+from PyQt6.QtCore import QObject, QTimer
+from ..utils import perf
+
+# 界面线程心跳间隔（毫秒）
+HEARTBEAT_INTERVAL = 50
+
+
+class StallDetector(QObject):
+    # 界面线程定时心跳，后台线程发现心跳停止超过阈值时采样界面线程的 Python 调用栈
+    def __init__(self, parent=None, threshold=0.2):
+        super().__init__(parent)
+        self.threshold = threshold
+        self.thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        # (心跳时间, 调用栈)，只属于采样时的那次阻塞
+        self.sample = None
+        self.watchdog = None
+        self.stopping = threading.Event()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(HEARTBEAT_INTERVAL)
+        self.timer.timeout.connect(self.beat)
+
+    def start(self):
+        if self.watchdog:
+            return
+        self.last_beat = time.monotonic()
+        self.stopping.clear()
+        self.timer.start()
+        self.watchdog = threading.Thread(target=self.watch, name='stall-watchdog', daemon=True)
+        self.watchdog.start()
+
+    def stop(self):
+        if not self.watchdog:
+            return
+        self.timer.stop()
+        self.stopping.set()
+        self.watchdog.join()
+        self.watchdog = None
+
+    def beat(self):
+        now = time.monotonic()
+        # 两次心跳的间隔超出定时器间隔的部分即事件循环被阻塞的时间
+        blocked = now - self.last_beat - HEARTBEAT_INTERVAL / 1000
+        sample = self.sample
+        if blocked >= self.threshold:
+            stack = sample[1] if sample and sample[0] == self.last_beat else []
+            perf.record('event_loop.stall', blocked, stack=stack)
+        self.last_beat = now
+
+    def watch(self):
+        while not self.stopping.wait(self.threshold / 2):
+            beat = self.last_beat
+            if time.monotonic() - beat < self.threshold:
+                continue
+            if self.sample and self.sample[0] == beat:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.sample = (beat, traceback.format_stack(frame))
\ No newline at end of file
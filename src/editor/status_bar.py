@@ -1,6 +1,21 @@
-from PyQt6.QtWidgets import QLabel, QMenu
+from PyQt6.QtWidgets import QLabel, QMenu, QProgressBar, QPushButton
 from PyQt6.QtCore import Qt
 
+
+class StatusState:
+    # 每个标签页各自保存状态栏内容，切换标签页时直接显示
+    def __init__(self):
+        self.line = 0
+        self.column = 0
+        self.line_length = 0
+        self.selected = 0
+        self.encoding = 'UTF-8'
+        self.confidence = None
+        # 上次计算行长度和选中字符数时的条件，不变时不重新计算
+        self.measured_line = None
+        self.measured_selection = None
+
+
 class StatusBarManager:
     def __init__(self, parent):
         self.parent = parent
@@ -11,15 +26,32 @@ class StatusBarManager:
         
         self.cursor_position_label = QLabel("行: 1, 列: 1")
         self.line_length_label = QLabel("字符数: 0")
+        self.selection_label = QLabel()
+        self.selection_label.hide()
         self.encoding_label = QLabel("编码: UTF-8")
+        self.memory_label = QLabel()
         
         self.encoding_label.setStyleSheet("color: blue; text-decoration: underline;")
         self.encoding_label.setCursor(Qt.CursorShape.PointingHandCursor)
         self.encoding_label.mousePressEvent = self.show_encoding_menu
         
+        # 后台任务进度，默认隐藏
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(150)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(self.parent.cancel_loading)
+        self.hide_progress()
+        
+        self.status_bar.addWidget(self.progress_label)
+        self.status_bar.addWidget(self.progress_bar)
+        self.status_bar.addWidget(self.cancel_button)
         self.status_bar.addPermanentWidget(self.cursor_position_label)
+        self.status_bar.addPermanentWidget(self.selection_label)
         self.status_bar.addPermanentWidget(self.line_length_label)
         self.status_bar.addPermanentWidget(self.encoding_label)
+        self.status_bar.addPermanentWidget(self.memory_label)
 
     def show_encoding_menu(self, event):
         self.parent.show_encoding_menu(event)
@@ -30,5 +62,34 @@ class StatusBarManager:
     def update_line_length_label(self, text):
         self.line_length_label.setText(text)
 
-    def update_encoding_label(self, text):
-        self.encoding_label.setText(f"编码: {text}") 
\ No newline at end of file
+    def show_state(self, state):
+        self.update_cursor_position_label(f"行: {state.line + 1}, 列: {state.column + 1}")
+        self.update_line_length_label(f"字符数: {state.line_length}")
+        self.selection_label.setText(f"已选择: {state.selected}")
+        self.selection_label.setVisible(state.selected > 0)
+        self.update_encoding_label(state.encoding, state.confidence)
+
+    def update_encoding_label(self, text, confidence=None):
+        # 自动检测的编码不确定时附带置信度
+        if confidence is not None and confidence < 1.0:
+            self.encoding_label.setText(f"编码: {text} ({confidence:.0%})")
+            self.encoding_label.setToolTip(f"自动检测，置信度 {confidence:.0%}")
+        else:
+            self.encoding_label.setText(f"编码: {text}")
+            self.encoding_label.setToolTip("") 
+
+    def update_memory_label(self, total, hibernated):
+        self.memory_label.setText(f"内存: {total / 1024 / 1024:.0f} MB")
+        self.memory_label.setToolTip(f"编辑器估计占用的内存，{hibernated} 个标签页已休眠")
+
+    def show_progress(self, text, done, total, cancellable=True):
+        self.progress_label.setText(text)
+        self.progress_bar.setValue(int(done * 100 / total) if total else 0)
+        self.progress_label.show()
+        self.progress_bar.show()
+        self.cancel_button.setVisible(cancellable)
+
+    def hide_progress(self):
+        self.progress_label.hide()
+        self.progress_bar.hide()
+        self.cancel_button.hide()
\ No newline at end of file
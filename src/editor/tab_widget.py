@@ -1,49 +1,193 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTabWidget
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QSplitter
 from PyQt6.Qsci import QsciScintilla, QsciLexerPython, QsciLexerSQL
 from PyQt6.Qsci import QsciLexerHTML, QsciLexerMarkdown, QsciLexerJSON
 from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt, pyqtSignal
+import time
+from .large_file import LargeFileView
+from .status_bar import StatusState
 
 class TabWidget(QWidget):
-    def __init__(self, parent=None):
+    materialized = pyqtSignal()
+    
+    def __init__(self, parent=None, lazy=False):
         super().__init__(parent)
         self.initUI()
+        if not lazy:
+            self.materialize()
         
     def initUI(self):
-        self.editor = QsciScintilla()
-        self.setup_editor()
+        # 延迟创建的标签页在首次激活前没有编辑器
+        self.editor = None
         
         layout = QVBoxLayout()
-        layout.addWidget(self.editor)
+        # 编辑器所在的横向布局，大文件模式会在右侧加入滚动条
+        self.editor_layout = QHBoxLayout()
+        layout.addLayout(self.editor_layout)
         self.setLayout(layout)
         
         self.current_file = None
         self.current_lexer = None
+        # 大文档的视口增量着色
+        self.highlighter = None
         self.current_encoding = 'utf-8'
+        self.encoding_confidence = 1.0
         self.is_modified = False
+        # 每次编辑递增，用于判断保存期间是否又有修改
+        self.edit_version = 0
+        self.is_loading = False
+        self.is_placeholder = False
+        # 加载完成后要跳转到的行
+        self.pending_line = None
+        # 会话恢复的 (行, 列, 首个可见行)
+        self.restore_position = None
+        self.large_file = None
+        self.status = StatusState()
+        # 休眠相关：最后一次离开该标签页的时间、压缩的内容快照、休眠时文件的修改时间
+        self.last_active = time.monotonic()
+        self.hibernated = False
+        self.snapshot = None
+        self.hibernated_mtime = None
+        # 最近一次读取或保存时磁盘上文件的 (mtime_ns, 大小)
+        self.disk_state = None
+        # 拆分视图：第二个编辑器与主编辑器共享同一个文档
+        self.split_editor = None
+        self.splitter = None
         
+    def materialize(self):
+        # 创建编辑器控件，延迟创建的标签页在首次激活时调用
+        if self.editor is not None:
+            return
+        self.editor = QsciScintilla()
+        self.setup_editor()
+        self.editor_layout.insertWidget(0, self.editor)
         self.editor.textChanged.connect(self.handle_text_changed)
+        self.materialized.emit()
         
-    def setup_editor(self):
-        self.editor.setUtf8(True)
-        self.editor.setMarginType(0, QsciScintilla.MarginType.NumberMargin)
-        self.editor.setMarginWidth(0, "000")
-        self.editor.setIndentationsUseTabs(False)
-        self.editor.setAutoIndent(True)
-        self.editor.setIndentationGuides(True)
-        self.editor.setTabWidth(4)
+    def setup_editor(self, editor=None):
+        if editor is None:
+            editor = self.editor
+        editor.setUtf8(True)
+        editor.setMarginType(0, QsciScintilla.MarginType.NumberMargin)
+        editor.setMarginWidth(0, "000")
+        editor.setIndentationsUseTabs(False)
+        editor.setAutoIndent(True)
+        editor.setIndentationGuides(True)
+        editor.setTabWidth(4)
         margin_color = QColor(211, 211, 211)
-        self.editor.setMarginsForegroundColor(margin_color)
+        editor.setMarginsForegroundColor(margin_color)
+        
+    def set_loading(self, loading):
+        # 加载期间只读，避免用户的输入被加载结果覆盖
+        self.is_loading = loading
+        self.editor.setReadOnly(loading)
+        
+    def load_text(self, text):
+        # 设置文本前先断开信号连接，避免触发修改标记
+        self.editor.textChanged.disconnect(self.handle_text_changed)
+        self.editor.setText(text)
+        # 重新连接信号
+        self.editor.textChanged.connect(self.handle_text_changed)
+        self.is_modified = False
+        
+    def open_large_file(self, path, encoding=None):
+        # 只读的大文件模式：内存映射文件，编辑器只保留视口附近的行
+        self.large_file = LargeFileView(self, path, encoding)
+        self.current_file = path
+        self.current_encoding = self.large_file.encoding
+        self.encoding_confidence = self.large_file.confidence
+        return self.large_file
+        
+    def line_offset(self):
+        # 编辑器第 0 行在文件中的行号
+        return self.large_file.window_start if self.large_file else 0
+        
+    def toggle_split(self, lexer=None):
+        # 第二个视图挂到同一个 Scintilla 文档上，文本、样式和撤销历史只有一份
+        if self.split_editor:
+            self.close_split()
+            return False
+        if self.editor is None or self.large_file:
+            return False
+        self.split_editor = QsciScintilla()
+        self.setup_editor(self.split_editor)
+        # QsciDocument 通过文档指针共享并维护引用计数，视图销毁时自动释放
+        self.split_editor.setDocument(self.editor.document())
+        self.split_editor.setLexer(lexer)
+        self.splitter = QSplitter(Qt.Orientation.Vertical)
+        self.editor_layout.insertWidget(self.editor_layout.indexOf(self.editor), self.splitter)
+        self.splitter.addWidget(self.editor)
+        self.splitter.addWidget(self.split_editor)
+        self.split_editor.setFirstVisibleLine(self.editor.firstVisibleLine())
+        return True
+        
+    def close_split(self):
+        if self.split_editor is None:
+            return
+        self.editor_layout.insertWidget(self.editor_layout.indexOf(self.splitter), self.editor)
+        self.split_editor.deleteLater()
+        self.splitter.deleteLater()
+        self.split_editor = None
+        self.splitter = None
+        
+    def close_document(self):
+        self.close_split()
+        if self.large_file:
+            self.large_file.close()
+            self.large_file = None
+        
+    def dehydrate(self):
+        # 销毁编辑器控件释放文档、样式和撤销历史，再次激活时重新创建
+        if self.highlighter:
+            self.highlighter.stop()
+            self.highlighter = None
+        self.close_split()
+        if self.large_file:
+            self.large_file.scroll_bar.deleteLater()
+            self.large_file.deleteLater()
+            self.close_document()
+        self.editor_layout.removeWidget(self.editor)
+        self.editor.deleteLater()
+        self.editor = None
+        self.current_lexer = None
+        self.hibernated = True
+        
+    def apply_edits(self, edits, base=0):
+        # 按 [(起始字节, 结束字节, 替换文本)] 从后往前替换，合并为一次撤销操作
+        self.editor.beginUndoAction()
+        for start, end, replacement in reversed(edits):
+            data = replacement.encode('utf-8')
+            self.editor.SendScintilla(QsciScintilla.SCI_SETTARGETSTART, base + start)
+            self.editor.SendScintilla(QsciScintilla.SCI_SETTARGETEND, base + end)
+            self.editor.SendScintilla(QsciScintilla.SCI_REPLACETARGET, len(data), data)
+        self.editor.endUndoAction()
+        
+    def tab_container(self):
+        # 获取父标签页组件
+        parent = self.parent()
+        while parent and not isinstance(parent, QTabWidget):
+            parent = parent.parent()
+        return parent
         
     def handle_text_changed(self):
+        self.edit_version += 1
         if not self.is_modified:
             self.is_modified = True
-            # 获取父标签页组件并更新标签
-            parent = self.parent()
-            while parent and not isinstance(parent, QTabWidget):
-                parent = parent.parent()
-            
+            parent = self.tab_container()
             if parent:
                 index = parent.indexOf(self)
                 current_text = parent.tabText(index)
                 if not current_text.startswith('*'):
-                    parent.setTabText(index, f"*{current_text}") 
\ No newline at end of file
+                    parent.setTabText(index, f"*{current_text}")
+                    
+    def mark_saved(self, version):
+        # 只有写入的内容就是当前内容时才清除修改标记
+        if version != self.edit_version:
+            return
+        self.is_modified = False
+        parent = self.tab_container()
+        if parent:
+            index = parent.indexOf(self)
+            current_text = parent.tabText(index)
+            if current_text.startswith('*'):
+                parent.setTabText(index, current_text[1:]) 
\ No newline at end of file
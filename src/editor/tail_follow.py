@@ -0,0 +1,129 @@
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.Qsci import QsciScintilla
+import os
+from .workers import Worker, start_worker
+from .settings import get_setting
+from ..utils.log_tail import TailReader
+from ..utils import perf
+
+# 检查文件新增内容的间隔（毫秒）
+POLL_INTERVAL = 200
+
+
+class TailFollower(QObject):
+    # 跟踪不断增长的日志文件：只读取追加的字节，分批追加到编辑器末尾
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.editor_window = parent
+        # 标签页 -> TailReader
+        self.readers = {}
+        # 标签页 -> 正在执行的读取任务，每个标签页同时只有一个
+        self.workers = {}
+        self.timer = QTimer(self)
+        self.timer.setInterval(POLL_INTERVAL)
+        self.timer.timeout.connect(self.poll)
+
+    def is_following(self, tab):
+        return tab in self.readers
+
+    def start(self, tab):
+        window = self.editor_window
+        if tab.editor is None or not tab.current_file or tab.large_file or tab.is_loading:
+            window.statusBar().showMessage("当前标签页不能跟踪文件末尾", 5000)
+            return False
+        if window.find_bar.is_busy(tab):
+            window.statusBar().showMessage("正在全部替换，请稍后再跟踪文件末尾", 5000)
+            return False
+        if tab.is_modified:
+            window.statusBar().showMessage("请先保存当前修改再跟踪文件末尾", 5000)
+            return False
+        try:
+            # 编辑器内容对应读取或保存时的文件大小
+            offset = tab.disk_state[1] if tab.disk_state else os.path.getsize(tab.current_file)
+            reader = TailReader(tab.current_file, tab.current_encoding, offset)
+        except OSError as e:
+            window.statusBar().showMessage(f"无法跟踪文件：{e}", 5000)
+            return False
+        self.readers[tab] = reader
+        # 跟踪期间只读，追加的内容不进入撤销记录和编辑日志
+        tab.editor.setReadOnly(True)
+        tab.editor.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 0)
+        tab.editor.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        window.journals.detach(tab)
+        self.timer.start()
+        self.read(tab, reader)
+        return True
+
+    def stop(self, tab):
+        reader = self.readers.pop(tab, None)
+        self.workers.pop(tab, None)
+        if not self.readers:
+            self.timer.stop()
+        if reader is None or tab.editor is None:
+            return
+        tab.editor.setReadOnly(False)
+        tab.editor.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 1)
+        window = self.editor_window
+        if window.tabs.indexOf(tab) != -1:
+            window.file_monitor.watch(tab)
+            window.journals.track(tab)
+
+    def poll(self):
+        for tab, reader in list(self.readers.items()):
+            if tab not in self.workers:
+                self.read(tab, reader)
+
+    def read(self, tab, reader):
+        worker = Worker(reader.read)
+        worker.signals.finished.connect(lambda result: self.appended(tab, worker, *result))
+        worker.signals.error.connect(lambda message: self.read_failed(tab, worker, message))
+        self.workers[tab] = worker
+        start_worker(worker)
+
+    def appended(self, tab, worker, text, event, more):
+        if self.workers.get(tab) is not worker:
+            return
+        del self.workers[tab]
+        editor = tab.editor
+        if editor is None:
+            return
+        if text or event:
+            with perf.span('tail.append', size=len(text)):
+                at_bottom = self.at_bottom(editor)
+                editor.setReadOnly(False)
+                if event:
+                    editor.SendScintilla(QsciScintilla.SCI_CLEARALL)
+                    message = "文件已被截断" if event == 'truncated' else "文件已被轮转"
+                    self.editor_window.statusBar().showMessage(f"{message}，从头开始跟踪", 5000)
+                if text:
+                    data = text.encode('utf-8')
+                    editor.SendScintilla(QsciScintilla.SCI_APPENDTEXT, len(data), data)
+                self.trim(editor)
+                editor.setReadOnly(True)
+                # 追加的内容与磁盘一致，不算作修改
+                tab.mark_saved(tab.edit_version)
+                if at_bottom:
+                    editor.setFirstVisibleLine(
+                        max(0, editor.lines() - editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN)))
+            self.editor_window.schedule_status_update(tab)
+        if more:
+            # 还有积压的内容，立即读取下一批
+            self.read(tab, self.readers[tab])
+
+    def read_failed(self, tab, worker, message):
+        if self.workers.get(tab) is worker:
+            del self.workers[tab]
+            self.editor_window.statusBar().showMessage(f"跟踪文件失败：{message}", 5000)
+
+    def at_bottom(self, editor):
+        last_visible = editor.firstVisibleLine() + editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN)
+        return last_visible >= editor.lines() - 1
+
+    def trim(self, editor):
+        # 保留的行数有上限时丢弃最早的行；超出一成再裁剪，避免每批都删除
+        max_lines = get_setting('tail_max_lines')
+        lines = editor.lines()
+        if max_lines <= 0 or lines <= max_lines + max_lines // 10:
+            return
+        end = editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, lines - max_lines)
+        editor.SendScintilla(QsciScintilla.SCI_DELETERANGE, 0, end)
\ No newline at end of file
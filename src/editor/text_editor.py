@@ -3,15 +3,37 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QFileDialog,
                             QVBoxLayout, QWidget, QMessageBox, QToolBar,
                             QInputDialog, QLabel, QTabWidget,
                             QTreeView, QSplitter, QMenu)
-from PyQt6.QtGui import QAction, QIcon, QKeySequence, QColor, QStandardItemModel, QStandardItem
-from PyQt6.Qsci import QsciScintilla, QsciLexerPython, QsciLexerSQL, QsciLexerHTML, QsciLexerMarkdown, QsciLexerJSON
+from PyQt6.QtGui import QAction, QIcon, QKeySequence, QColor
+from PyQt6.Qsci import QsciScintilla
 import os
-import json
-from PyQt6.QtCore import Qt, QDir
+import shutil
+from PyQt6.QtCore import Qt, QDir, QTimer, QThreadPool
 from .editor_tab import EditorTab
 from .file_tree import FileTreeView
 from .menu_bar import MenuBarManager
 from .status_bar import StatusBarManager
+from .document_loader import DocumentLoader
+from .document_saver import DocumentSaver, snapshot_chunks
+from .json_formatter import JsonFormatter
+from .settings import get_setting, set_setting, cache_directory
+from .find_in_files import FindInFilesPanel
+from .session import load_session, save_session, add_recent_file
+from .lexers import create_lexer
+from .highlighter import ViewportHighlighter
+from .ui_scheduler import ui_scheduler
+from .perf_panel import PerfPanel
+from .stall_detector import StallDetector
+from .hibernation import TabHibernator
+from .quick_open import QuickOpenDialog
+from .batch_dialog import BatchDialog
+from .journal import JournalManager, replay_journals
+from .file_monitor import FileMonitor
+from .tail_follow import TailFollower
+from .json_validator import JsonValidator
+from .outline_panel import OutlinePanel
+from .find_bar import FindBar
+from .workers import Worker, start_worker
+from ..utils import perf
 
 class TextEditor(QMainWindow):
     def __init__(self):
@@ -32,10 +54,41 @@ class TextEditor(QMainWindow):
         
         # 创建标签页组件
         self.tabs = EditorTab(self)
+        self.tabs.tab_created.connect(self.setup_tab)
+        self.tabs.tab_closed.connect(self.tab_closed)
+        self.tabs.currentChanged.connect(self.current_tab_changed)
+        
+        # 所有打开文件的操作共用一个后台加载器
+        self.loader = DocumentLoader(self)
+        self.loader.progress.connect(self.document_load_progress)
+        self.loader.loaded.connect(self.document_loaded)
+        self.loader.failed.connect(self.document_load_failed)
+        self.loader.cancelled.connect(self.document_load_cancelled)
+        
+        # 保存同样在后台执行
+        self.saver = DocumentSaver(self)
+        self.saver.progress.connect(self.document_save_progress)
+        self.saver.saved.connect(self.document_saved)
+        self.saver.failed.connect(self.document_save_failed)
+        
+        # JSON 格式化在独立进程中执行
+        self.json_formatter = JsonFormatter(self)
+        self.json_formatter.progress.connect(self.json_format_progress)
+        self.json_formatter.finished.connect(self.json_formatted)
+        self.json_formatter.failed.connect(self.json_format_failed)
+        self.json_formatter.cancelled.connect(lambda tab: self.hide_progress_if_idle())
+        
+        # 查找替换栏位于标签页下方，默认隐藏
+        self.find_bar = FindBar(self)
+        editor_area = QWidget()
+        editor_layout = QVBoxLayout(editor_area)
+        editor_layout.setContentsMargins(0, 0, 0, 0)
+        editor_layout.addWidget(self.tabs)
+        editor_layout.addWidget(self.find_bar)
         
         # 添加组件到分割器
         splitter.addWidget(self.file_tree)
-        splitter.addWidget(self.tabs)
+        splitter.addWidget(editor_area)
         splitter.setStretchFactor(0, 1)
         splitter.setStretchFactor(1, 4)
         
@@ -50,8 +103,170 @@ class TextEditor(QMainWindow):
         # 创建状态栏
         self.status_bar = StatusBarManager(self)
         
-        # 创建新标签页
-        self.tabs.new_tab()
+        # 在文件中查找，默认隐藏
+        self.find_in_files = FindInFilesPanel(self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.find_in_files)
+        self.find_in_files.hide()
+        self.file_tree.file_model.root_changed.connect(self.tree_root_changed)
+        
+        # 大纲停靠在文件树一侧，默认隐藏
+        self.outline_panel = OutlinePanel(self)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.outline_panel)
+        self.outline_panel.hide()
+        
+        # 快速打开，首次使用时才建立路径索引
+        self.quick_open = QuickOpenDialog(self)
+        
+        # 性能监控默认关闭
+        self.perf_panel = PerfPanel(self)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.perf_panel)
+        self.perf_panel.hide()
+        self.stall_detector = None
+        if get_setting('perf_enabled'):
+            self.set_perf_enabled(True)
+        
+        # 记录未保存的编辑，异常退出后可以恢复
+        self.journals = JournalManager(self)
+        
+        # 监视已打开的文件，外部修改后按差异重新加载
+        self.file_monitor = FileMonitor(self)
+        self.tail_follower = TailFollower(self)
+        self.json_validator = JsonValidator(self)
+        
+        # 内存超出预算时休眠空闲的标签页
+        self.hibernator = TabHibernator(self)
+        
+        # 恢复上次的会话，没有则创建新标签页
+        if not self.restore_session():
+            self.new_file()
+        # 窗口显示后再检查上次是否异常退出
+        QTimer.singleShot(0, self.offer_recovery)
+
+    def restore_session(self):
+        state = load_session()
+        saved_tabs = [t for t in state['tabs'] if t.get('file')]
+        if not saved_tabs:
+            return False
+        current = min(state['current'], len(saved_tabs) - 1)
+        
+        # 先创建当前标签页，其余标签页只保留路径和位置，激活时才加载
+        order = [current] + [i for i in range(len(saved_tabs)) if i != current]
+        for i in order:
+            saved = saved_tabs[i]
+            tab = self.tabs.new_tab(os.path.basename(saved['file']), lazy=True,
+                                    index=min(i, self.tabs.count()), activate=False)
+            tab.current_file = saved['file']
+            tab.current_encoding = saved.get('encoding', 'utf-8')
+            tab.is_placeholder = True
+            tab.restore_position = (saved.get('line', 0), saved.get('column', 0),
+                                    saved.get('first_visible', 0))
+            if i == current:
+                # 第一个加入的标签页会自动成为当前页并已创建编辑器
+                self.tabs.setCurrentWidget(tab)
+                self.load_restored_tab(tab)
+        return True
+
+    def offer_recovery(self):
+        sessions = self.journals.crashed_sessions()
+        journals = self.journals.recoverable_journals(sessions)
+        if not journals:
+            for session in sessions:
+                shutil.rmtree(session, ignore_errors=True)
+            return
+        reply = QMessageBox.question(
+            self, "恢复未保存的修改",
+            f"上次编辑器异常退出，有 {len(journals)} 个标签页的修改未保存，是否恢复？")
+        if reply != QMessageBox.StandardButton.Yes:
+            for session in sessions:
+                shutil.rmtree(session, ignore_errors=True)
+            return
+        worker = Worker(replay_journals, journals)
+        worker.signals.finished.connect(lambda result: self.journals_replayed(sessions, *result))
+        worker.signals.error.connect(
+            lambda message: QMessageBox.warning(self, "错误", f"恢复失败：{message}"))
+        start_worker(worker)
+
+    def journals_replayed(self, sessions, recovered, errors):
+        for meta, data in recovered:
+            name = os.path.basename(meta['file']) if meta['file'] else "未命名"
+            # 会话恢复已打开同一文件且没有新的修改时，用恢复的内容取代它，避免出现两个标签页
+            existing = self.find_tab(meta['file']) if meta['file'] else None
+            if existing and existing.is_modified and not (existing.is_loading or existing.is_placeholder):
+                existing = None
+            index = self.tabs.indexOf(existing) if existing else None
+            tab = self.tabs.new_tab(f"*{name} (已恢复)", index=index)
+            if existing:
+                self.tabs.close_tab(self.tabs.indexOf(existing))
+            tab.current_file = meta['file']
+            tab.current_encoding = meta['encoding']
+            self.show_text(tab, data.decode('utf-8'))
+            tab.is_modified = True
+            # 恢复的内容与磁盘文件不同，以快照作为新日志的起点
+            self.journals.track(tab, snapshot=True)
+        for session in sessions:
+            shutil.rmtree(session, ignore_errors=True)
+        if errors:
+            QMessageBox.warning(self, "部分修改无法恢复", "\n".join(errors))
+
+    def closeEvent(self, event):
+        save_session(self.tabs)
+        self.file_tree.file_model.save_snapshot(wait=True)
+        self.journals.shutdown()
+        # 后台任务在窗口销毁后发出信号会导致崩溃，先取消并等待它们结束
+        self.json_validator.shutdown()
+        self.find_bar.cancel_search()
+        self.loader.shutdown()
+        QThreadPool.globalInstance().waitForDone()
+        if self.stall_detector:
+            self.stall_detector.stop()
+        perf.shutdown()
+        super().closeEvent(event)
+
+    def toggle_split(self):
+        tab = self.current_tab()
+        if tab is None or tab.editor is None:
+            return
+        if tab.large_file:
+            self.statusBar().showMessage("大文件模式不支持拆分视图", 5000)
+            return
+        if self.find_bar.is_busy(tab):
+            self.statusBar().showMessage("正在全部替换，请稍后再拆分视图", 5000)
+            return
+        lexer = None
+        if tab.current_lexer:
+            lexer = create_lexer(os.path.splitext(tab.current_file or '')[1])
+        tab.toggle_split(lexer)
+
+    def show_find_bar(self, replace=False):
+        self.find_bar.show_bar(replace)
+
+    def show_outline(self):
+        self.outline_panel.setVisible(not self.outline_panel.isVisible())
+
+    def toggle_follow(self, checked):
+        tab = self.current_tab()
+        if tab is None:
+            self.menu_bar.follow_action.setChecked(False)
+            return
+        if not checked:
+            self.tail_follower.stop(tab)
+        elif not self.tail_follower.start(tab):
+            self.menu_bar.follow_action.setChecked(False)
+
+    def set_perf_enabled(self, enabled):
+        set_setting('perf_enabled', enabled)
+        if enabled:
+            perf.enable(os.path.join(cache_directory('perf'), 'perf.jsonl'))
+            if self.stall_detector is None:
+                self.stall_detector = StallDetector(
+                    self, get_setting('stall_threshold_ms') / 1000)
+            self.stall_detector.start()
+            self.perf_panel.show()
+        else:
+            perf.disable()
+            if self.stall_detector:
+                self.stall_detector.stop()
+            self.perf_panel.hide()
 
     def current_tab(self):
         return self.tabs.currentWidget()
@@ -60,68 +275,50 @@ class TextEditor(QMainWindow):
         tab = self.current_tab()
         return tab.editor if tab else None
 
+    def setup_tab(self, tab):
+        tab.materialized.connect(lambda: self.tab_materialized(tab))
+        if tab.editor:
+            self.setup_editor_signals(tab)
+
+    def setup_editor_signals(self, tab):
+        tab.editor.cursorPositionChanged.connect(lambda: self.schedule_status_update(tab))
+        tab.editor.selectionChanged.connect(lambda: self.schedule_status_update(tab))
+
+    def tab_materialized(self, tab):
+        self.setup_editor_signals(tab)
+        self.load_restored_tab(tab)
+
+    def load_restored_tab(self, tab):
+        # 休眠的标签页优先从内存中的快照恢复
+        if tab.editor is not None and tab.hibernated and self.hibernator.rehydrate(tab):
+            return
+        # 会话恢复和休眠的标签页在激活时才读取文件
+        if (tab.editor is not None and tab.current_file and tab.is_placeholder
+                and not tab.is_loading):
+            self.load_into_tab(tab, tab.current_encoding)
+
+    def tab_closed(self, tab):
+        ui_scheduler().cancel(('status', tab))
+        self.tail_follower.stop(tab)
+        self.json_validator.untrack(tab)
+        self.outline_panel.forget(tab)
+        self.find_bar.forget(tab)
+        self.journals.discard(tab)
+        self.file_monitor.unwatch(tab)
+        self.loader.cancel(tab)
+        tab.close_document()
+
     def new_file(self):
         # 创建新的编辑器标签页
-        tab = EditorTab(self)
-        tab.editor.cursorPositionChanged.connect(self.update_status_bar)
-        index = self.tabs.addTab(tab, "未命名")
-        self.tabs.setCurrentIndex(index)
+        tab = self.tabs.new_tab()
+        self.journals.track(tab)
+        return tab
         
     def open_file(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "打开文件")
         if file_name:
-            # 检查文件是否已经打开
-            for i in range(self.tabs.count()):
-                tab = self.tabs.widget(i)
-                if tab.current_file == file_name:
-                    self.tabs.setCurrentIndex(i)
-                    return
-                    
-            try:
-                # 创建新标签页
-                tab = EditorTab(self)
-                tab.editor.cursorPositionChanged.connect(self.update_status_bar)
-                
-                # 尝试不同的编码方式打开文件
-                encodings = ['utf-8', 'gbk', 'gb2312', 'iso-8859-1']
-                text = None
-                used_encoding = None
-                
-                for encoding in encodings:
-                    try:
-                        with open(file_name, 'r', encoding=encoding) as f:
-                            text = f.read()
-                            used_encoding = encoding
-                            break
-                    except UnicodeDecodeError:
-                        continue
-                
-                if text is None:
-                    raise Exception("无法检测文件编码")
-                
-                # 设置文本前先断开信号连接，避免触发修改标记
-                tab.editor.textChanged.disconnect(tab.handle_text_changed)
-                tab.editor.setText(text)
-                # 重新连接信号
-                tab.editor.textChanged.connect(tab.handle_text_changed)
-                
-                tab.current_file = file_name
-                tab.current_encoding = used_encoding
-                tab.is_modified = False  # 重置修改标记
-                
-                # 设置语法高亮
-                _, file_extension = os.path.splitext(file_name)
-                self.set_lexer(tab, file_extension.lower())
-                
-                # 添加新标签页
-                index = self.tabs.addTab(tab, os.path.basename(file_name))
-                self.tabs.setCurrentIndex(index)
-                
-                # 更新编码显示
-                self.status_bar.update_encoding_label(used_encoding.upper())
-                
-            except Exception as e:
-                QMessageBox.warning(self, "错误", f"无法打开文件：{str(e)}")
+            # 读取、检测编码并创建标签页，已打开的文件直接切换
+            self.open_specific_file(file_name)
 
     def close_tab(self, index):
         tab = self.tabs.widget(index)
@@ -153,56 +350,141 @@ class TextEditor(QMainWindow):
     def save_file(self):
         tab = self.current_tab()
         if not tab:
-            return
+            return False
+            
+        if tab.large_file:
+            QMessageBox.information(self, "提示", "大文件模式为只读，无法保存")
+            return False
+            
+        if tab.is_loading or tab.is_placeholder:
+            # 编辑器中只有占位文本，保存会用它覆盖磁盘上的文件
+            self.statusBar().showMessage("文件尚未加载完成，无法保存", 5000)
+            return False
+            
+        if self.find_bar.is_busy(tab):
+            # 全部替换分多次执行，中途保存会写出只替换了一部分的内容
+            self.statusBar().showMessage("正在全部替换，请稍后保存", 5000)
+            return False
             
         if not tab.current_file:
             file_name, _ = QFileDialog.getSaveFileName(self, "保存文件")
             if file_name:
                 tab.current_file = file_name
-                self.tabs.setTabText(self.tabs.currentIndex(), os.path.basename(file_name))
+                modified = '*' if tab.is_modified else ''
+                self.tabs.setTabText(self.tabs.currentIndex(), modified + os.path.basename(file_name))
             else:
-                return
+                return False
                 
-        try:
-            with open(tab.current_file, 'w', encoding=tab.current_encoding) as f:
-                f.write(tab.editor.text())
-            # 保存成功后清除修改标记
-            tab.is_modified = False
-            current_index = self.tabs.currentIndex()
-            current_text = self.tabs.tabText(current_index)
-            if current_text.startswith('*'):
-                self.tabs.setTabText(current_index, current_text[1:])
-        except Exception as e:
-            QMessageBox.warning(self, "错误", f"无法保存文件：{str(e)}")
-
-    def set_lexer(self, tab, file_extension):
+        # 在界面线程复制缓冲区，编码和写入在后台完成
+        perf.begin('save', tab, path=tab.current_file)
+        with perf.span('save.snapshot', path=tab.current_file):
+            chunks = snapshot_chunks(tab.editor)
+        self.saver.save(tab, tab.current_file, chunks, tab.current_encoding, tab.edit_version)
+        return True
+
+    def document_save_progress(self, tab, done, total):
+        name = os.path.basename(tab.current_file or "")
+        self.status_bar.show_progress(f"正在保存 {name}", done, total, cancellable=False)
+
+    def document_saved(self, tab, path, version):
+        self.hide_progress_if_idle()
+        perf.end('save', tab)
+        # 写入确认后才清除修改标记
+        tab.mark_saved(version)
+        # 已建立的全文索引增量更新，保存的内容才能被搜索到
+        if self.find_in_files.index is not None:
+            self.find_in_files.update_index()
+        if self.tabs.indexOf(tab) == -1:
+            return
+        self.file_monitor.watch(tab)
+        if tab.edit_version == version:
+            # 磁盘上的文件成为日志的新起点
+            self.journals.track(tab)
+        else:
+            # 保存期间又有修改，日志不能再以旧文件为起点
+            self.journals.compact(tab)
+
+    def document_save_failed(self, tab, message):
+        self.hide_progress_if_idle()
+        perf.end('save', tab, error=message)
+        if self.tabs.indexOf(tab) == -1:
+            # 关闭时保存失败，恢复标签页以免丢失内容
+            index = self.tabs.addTab(tab, f"*{os.path.basename(tab.current_file)}")
+            self.tabs.setCurrentIndex(index)
+        QMessageBox.warning(self, "错误", f"无法保存文件：{message}\n原文件未被修改。")
+
+    def set_lexer(self, tab, file_extension, size=0):
+        if tab.highlighter:
+            tab.highlighter.stop()
+            tab.highlighter = None
+        # 超大文档按纯文本显示
         lexer = None
-        if file_extension == '.py':
-            lexer = QsciLexerPython()
-        elif file_extension == '.sql':
-            lexer = QsciLexerSQL()
-        elif file_extension == '.md':
-            lexer = QsciLexerMarkdown()
-        elif file_extension in ['.html', '.htm']:
-            lexer = QsciLexerHTML()
-        elif file_extension == '.json':
-            lexer = QsciLexerJSON()
-            
-        if lexer:
+        if size < get_setting('plain_text_threshold'):
+            lexer = create_lexer(file_extension)
+
+        if lexer or tab.current_lexer:
             tab.editor.setLexer(lexer)
-            tab.current_lexer = lexer
+            if tab.split_editor:
+                # 词法分析器对象不能共用，第二个视图使用同类的新实例
+                tab.split_editor.setLexer(create_lexer(file_extension) if lexer else None)
+        tab.current_lexer = lexer
 
-    def update_status_bar(self):
-        editor = self.current_editor()
-        if not editor:
+    def start_highlighting(self, tab, size):
+        # 大文档只立即为可见区域着色
+        if tab.current_lexer and size >= get_setting('incremental_highlight_threshold'):
+            tab.highlighter = ViewportHighlighter(tab)
+
+    def schedule_status_update(self, tab):
+        # 光标、选区和编码的变化合并为每帧最多刷新一次
+        ui_scheduler().schedule(('status', tab), lambda: self.update_status_bar(tab))
+
+    def current_tab_changed(self, index):
+        tab = self.tabs.widget(index)
+        if tab is None:
             return
-            
+        # 先显示该标签页保存的状态，再按需刷新
+        self.update_encoding_state(tab)
+        self.status_bar.show_state(tab.status)
+        self.schedule_status_update(tab)
+        self.menu_bar.follow_action.setChecked(self.tail_follower.is_following(tab))
+        self.outline_panel.set_tab(tab)
+        if self.find_bar.isVisible():
+            self.find_bar.set_tab(tab)
+
+    def update_encoding_state(self, tab):
+        tab.status.encoding = tab.current_encoding.upper()
+        tab.status.confidence = tab.encoding_confidence
+
+    def update_status_bar(self, tab=None):
+        tab = tab or self.current_tab()
+        # 只刷新当前标签页，后台标签页在切换时刷新
+        if tab is not self.current_tab() or tab.editor is None:
+            return
+        editor = tab.editor
+        state = tab.status
+        offset = tab.line_offset()
         line, column = editor.getCursorPosition()
-        self.status_bar.update_cursor_position_label(f"行: {line + 1}, 列: {column + 1}")
-        
-        current_line = editor.text(line)
-        line_length = len(current_line)
-        self.status_bar.update_line_length_label(f"字符数: {line_length}")
+        state.line = line + offset
+        state.column = column
+
+        # 通过 Scintilla 按位置计算字符数，不复制整行内容；光标在同一行内移动时直接复用
+        measured = (line, offset, tab.edit_version)
+        if state.measured_line != measured:
+            start = editor.SendScintilla(QsciScintilla.SCI_POSITIONFROMLINE, line)
+            end = editor.SendScintilla(QsciScintilla.SCI_GETLINEENDPOSITION, line)
+            state.line_length = editor.SendScintilla(QsciScintilla.SCI_COUNTCHARACTERS, start, end)
+            state.measured_line = measured
+
+        start = editor.SendScintilla(QsciScintilla.SCI_GETSELECTIONSTART)
+        end = editor.SendScintilla(QsciScintilla.SCI_GETSELECTIONEND)
+        measured = (start, end, offset, tab.edit_version)
+        if state.measured_selection != measured:
+            state.selected = (editor.SendScintilla(QsciScintilla.SCI_COUNTCHARACTERS, start, end)
+                              if end > start else 0)
+            state.measured_selection = measured
+
+        self.update_encoding_state(tab)
+        self.status_bar.show_state(state)
 
     def show_encoding_menu(self, event):
         # 创建编码选择菜单
@@ -221,22 +503,22 @@ class TextEditor(QMainWindow):
         if not tab:
             return
             
-        if tab.current_file and os.path.exists(tab.current_file):
-            try:
-                with open(tab.current_file, 'r', encoding=new_encoding.lower()) as f:
-                    text = f.read()
-                
-                tab.editor.setText(text)
-                tab.current_encoding = new_encoding.lower()
-                self.status_bar.update_encoding_label(new_encoding)
-                
-            except UnicodeDecodeError:
-                QMessageBox.warning(self, "错误", f"无法使用 {new_encoding} 编码读取文件")
-            except Exception as e:
-                QMessageBox.warning(self, "错误", f"更改编码时发生错误：{str(e)}")
+        if tab.large_file:
+            # 大文件模式只需按新编码重新解码当前窗口
+            with perf.span('encoding.change', encoding=new_encoding, large_file=True):
+                tab.large_file.set_encoding(new_encoding.lower())
+            tab.current_encoding = new_encoding.lower()
+            tab.encoding_confidence = 1.0
+            self.schedule_status_update(tab)
+        elif tab.current_file and os.path.exists(tab.current_file):
+            # 按指定编码在后台重新读取
+            perf.begin('encoding.change', tab, encoding=new_encoding, path=tab.current_file)
+            tab.set_loading(True)
+            self.loader.load(tab, tab.current_file, new_encoding.lower())
         else:
             tab.current_encoding = new_encoding.lower()
-            self.status_bar.update_encoding_label(new_encoding)
+            tab.encoding_confidence = 1.0
+            self.schedule_status_update(tab)
 
     def create_toolbar(self):
         toolbar = QToolBar()
@@ -304,7 +586,8 @@ class TextEditor(QMainWindow):
             return
             
         # 获取当前总行数
-        total_lines = editor.lines()
+        tab = self.current_tab()
+        total_lines = tab.large_file.line_count() if tab.large_file else editor.lines()
         
         # 弹出输入对话框
         line_number, ok = QInputDialog.getInt(
@@ -318,82 +601,85 @@ class TextEditor(QMainWindow):
         )
         
         if ok:
+            self.jump_to_line(tab, line_number - 1)
+
+    def jump_to_line(self, tab, line):
+        if tab.large_file:
+            # 大文件模式按需切换显示窗口
+            tab.large_file.goto_line(line)
+        else:
             # 跳转到指定行
-            editor.setCursorPosition(line_number - 1, 0)
+            tab.editor.setCursorPosition(line, 0)
             # 确保该行可见
-            editor.ensureLineVisible(line_number - 1)
-            # 设置焦点到编辑器
-            editor.setFocus()
+            tab.editor.ensureLineVisible(line)
+        # 设置焦点到编辑器
+        tab.editor.setFocus()
+
+    def tree_root_changed(self, path):
+        # 查找面板打开时才跟随根目录重建索引
+        if self.find_in_files.isVisible():
+            self.find_in_files.set_root(path)
 
-    def format_json(self):
+    def show_quick_open(self):
+        self.quick_open.open_for_root(self.file_tree.file_model.root_path)
+
+    def show_find_in_files(self):
+        # 首次打开时为当前根目录建立索引，之后每次打开增量更新
+        self.find_in_files.set_root(self.file_tree.file_model.root_path)
+        self.find_in_files.focus_query()
+
+    def format_json(self, minify=False, selection_only=False):
+        tab = self.current_tab()
         editor = self.current_editor()
         if not editor:
             return
             
-        try:
-            # 获取当前文本
-            text = editor.text()
-            # 解析JSON
-            parsed = json.loads(text)
-            # 格式化JSON
-            formatted = json.dumps(parsed, indent=4, ensure_ascii=False)
-            # 更新编辑器内容
-            editor.setText(formatted)
-        except json.JSONDecodeError as e:
-            QMessageBox.warning(self, "JSON格式错误", f"无法格式化JSON：{str(e)}")
-        except Exception as e:
-            QMessageBox.warning(self, "错误", f"格式化过程中发生错误：{str(e)}")
-
-    def setup_file_tree(self):
-        # 创建标准项模型
-        self.file_model = QStandardItemModel()
-        self.file_model.setHorizontalHeaderLabels(['文件'])
-        
-        # 设置模型到树视图
-        self.file_tree.setModel(self.file_model)
-        
-        # 添加根目录
-        self.populate_tree(QDir.currentPath(), self.file_model.invisibleRootItem())
-        
-        # 连接双击信号
-        self.file_tree.doubleClicked.connect(self.tree_item_double_clicked)
-        
-        # 创建上下文菜单
-        self.file_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.file_tree.customContextMenuRequested.connect(self.show_tree_context_menu)
-
-    def populate_tree(self, path, parent_item):
-        directory = QDir(path)
-        # 设置过滤器
-        directory.setFilter(QDir.Filter.NoDotAndDotDot | 
-                          QDir.Filter.AllDirs | 
-                          QDir.Filter.Files)
-        
-        # 获取目录和文件列表
-        for entry in directory.entryInfoList():
-            item = QStandardItem(entry.fileName())
-            item.setData(entry.filePath(), Qt.ItemDataRole.UserRole)
+        if tab.large_file:
+            QMessageBox.information(self, "提示", "大文件模式为只读，无法格式化")
+            return
             
-            if entry.isDir():
-                # 如果是目录，递归添加子项
-                self.populate_tree(entry.filePath(), item)
+        if selection_only:
+            if not editor.hasSelectedText():
+                QMessageBox.information(self, "提示", "请先选中要格式化的JSON")
+                return
+            # 选中文本的起始字节位置，编辑结果相对于它应用
+            line_from, index_from, _, _ = editor.getSelection()
+            base = editor.positionFromLineIndex(line_from, index_from)
+            text = editor.selectedText()
+        else:
+            base = 0
+            text = editor.text()
             
-            parent_item.appendRow(item)
+        # 在后台进程中格式化，完成后以最少的编辑应用，保留撤销历史
+        perf.begin('json.format', tab, size=len(text), minify=minify)
+        self.json_formatter.format(tab, text, base, tab.edit_version, minify)
+
+    def json_format_progress(self, tab, done, total):
+        self.status_bar.show_progress("正在格式化JSON", done, total)
+
+    def json_formatted(self, tab, edits, base, version):
+        self.hide_progress_if_idle()
+        if self.tabs.indexOf(tab) == -1:
+            return
+        if tab.edit_version != version:
+            QMessageBox.information(self, "提示", "格式化期间文档已被修改，结果已丢弃")
+            perf.discard('json.format', tab)
+            return
+        with perf.span('json.apply', edits=len(edits)):
+            tab.apply_edits(edits, base)
+        perf.end('json.format', tab, edits=len(edits))
+
+    def json_format_failed(self, tab, message):
+        self.hide_progress_if_idle()
+        perf.end('json.format', tab, error=message)
+        QMessageBox.warning(self, "JSON格式错误", f"无法格式化JSON：{message}")
 
     def tree_item_double_clicked(self, index):
         # 获取文件路径
-        item = self.file_model.itemFromIndex(index)
-        file_path = item.data(Qt.ItemDataRole.UserRole)
-        
-        if os.path.isfile(file_path):
-            # 检查文件是否已经打开
-            for i in range(self.tabs.count()):
-                tab = self.tabs.widget(i)
-                if tab.current_file == file_path:
-                    self.tabs.setCurrentIndex(i)
-                    return
-            
-            # 如果文件未打开，则打开它
+        file_path = self.file_tree.file_path(index)
+        
+        if file_path and os.path.isfile(file_path):
+            # 如果文件未打开则打开它，否则切换到对应标签页
             self.open_specific_file(file_path)
 
     def show_tree_context_menu(self, position):
@@ -403,13 +689,14 @@ class TextEditor(QMainWindow):
         # 获取当前选中的项
         index = self.file_tree.indexAt(position)
         if index.isValid():
-            item = self.file_model.itemFromIndex(index)
-            file_path = item.data(Qt.ItemDataRole.UserRole)
+            file_path = self.file_tree.file_path(index)
             
             if os.path.isdir(file_path):
                 # 目录菜单项
                 set_root_action = context_menu.addAction("设为根目录")
                 set_root_action.triggered.connect(lambda: self.set_root_directory(file_path))
+                batch_action = context_menu.addAction("批量处理...")
+                batch_action.triggered.connect(lambda: self.show_batch_dialog(file_path))
             else:
                 # 文件菜单项
                 open_action = context_menu.addAction("打开")
@@ -419,66 +706,199 @@ class TextEditor(QMainWindow):
         context_menu.addSeparator()
         change_root_action = context_menu.addAction("更改根目录...")
         change_root_action.triggered.connect(self.change_root_directory)
+        refresh_action = context_menu.addAction("刷新")
+        refresh_action.triggered.connect(self.file_tree.refresh)
         
         # 显示菜单
         context_menu.exec(self.file_tree.viewport().mapToGlobal(position))
 
     def set_root_directory(self, path):
-        self.file_model.clear()
-        self.file_model.setHorizontalHeaderLabels(['文件'])
-        self.populate_tree(path, self.file_model.invisibleRootItem())
+        self.file_tree.set_root_directory(path)
+
+    def show_batch_dialog(self, directory):
+        dialog = BatchDialog(self, directory)
+        dialog.show()
 
     def change_root_directory(self):
         new_root = QFileDialog.getExistingDirectory(self, "选择根目录", QDir.currentPath())
         if new_root:
             self.set_root_directory(new_root)
 
-    def open_specific_file(self, file_path):
-        try:
-            # 创建新标签页
-            tab = EditorTab(self)
-            tab.editor.cursorPositionChanged.connect(self.update_status_bar)
-            
-            # 尝试不同的编码方式打开文件
-            encodings = ['utf-8', 'gbk', 'gb2312', 'iso-8859-1']
-            text = None
-            used_encoding = None
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        text = f.read()
-                        used_encoding = encoding
-                        break
-                except UnicodeDecodeError:
-                    continue
-            
-            if text is None:
-                raise Exception("无法检测文件编码")
-            
-            # 设置文本前先断开信号连接，避免触发修改标记
-            tab.editor.textChanged.disconnect(tab.handle_text_changed)
-            tab.editor.setText(text)
-            # 重新连接信号
-            tab.editor.textChanged.connect(tab.handle_text_changed)
-            
-            tab.current_file = file_path
-            tab.current_encoding = used_encoding
-            tab.is_modified = False  # 重置修改标记
+    def find_tab(self, file_path):
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if tab.current_file and os.path.abspath(tab.current_file) == os.path.abspath(file_path):
+                return tab
+        return None
+
+    def open_targets(self, targets):
+        # 打开命令行或其他实例转发来的 [(路径, 行号)]
+        for file_path, line in targets:
+            if os.path.isfile(file_path):
+                self.open_specific_file(file_path, line=line)
+            else:
+                self.statusBar().showMessage(f"文件不存在：{file_path}", 5000)
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def open_specific_file(self, file_path, encoding=None, line=None):
+        # 检查文件是否已经打开
+        tab = self.find_tab(file_path)
+        if tab:
+            self.tabs.setCurrentWidget(tab)
+            if line is not None:
+                if tab.is_loading:
+                    tab.pending_line = line
+                else:
+                    self.jump_to_line(tab, line)
+            return tab
             
-            # 设置语法高亮
-            _, file_extension = os.path.splitext(file_path)
-            self.set_lexer(tab, file_extension.lower())
+        # 立即显示占位标签页，文件在后台读取和解码
+        tab = self.tabs.new_tab(os.path.basename(file_path))
+        tab.current_file = file_path
+        tab.pending_line = line
+        return self.load_into_tab(tab, encoding)
+
+    def load_into_tab(self, tab, encoding=None):
+        file_path = tab.current_file
+        tab.is_placeholder = True
+        try:
+            if os.path.getsize(file_path) >= get_setting('large_file_threshold'):
+                return self.open_large_file(tab, encoding)
+        except ValueError:
+            # 编码不适合大文件模式，按普通方式加载
+            pass
+        except OSError as e:
+            self.discard_placeholder(tab)
+            QMessageBox.warning(self, "错误", f"无法打开文件：{str(e)}")
+            return None
             
-            # 添加新标签页
-            index = self.tabs.addTab(tab, os.path.basename(file_path))
-            self.tabs.setCurrentIndex(index)
+        perf.begin('open', tab, path=file_path)
+        tab.set_loading(True)
+        tab.load_text("正在加载...")
+        self.loader.load(tab, file_path, encoding)
+        return tab
+
+    def open_large_file(self, tab, encoding=None):
+        with perf.span('open.large_file', path=tab.current_file):
+            large_file = tab.open_large_file(tab.current_file, encoding)
+        tab.is_placeholder = False
             
-            # 更新编码显示
-            self.status_bar.update_encoding_label(used_encoding.upper())
+        name = os.path.basename(tab.current_file)
+        large_file.progress.connect(
+            lambda done, total: self.status_bar.show_progress(f"正在建立行索引 {name}", done, total))
+        large_file.indexed.connect(self.status_bar.hide_progress)
+        self.schedule_status_update(tab)
+        self.restore_tab_position(tab)
+        add_recent_file(tab.current_file)
+        return tab
+
+    def restore_tab_position(self, tab):
+        # 应用打开时指定的行或会话中保存的光标和滚动位置
+        if tab.pending_line is not None:
+            self.jump_to_line(tab, tab.pending_line)
+        elif tab.restore_position:
+            line, column, first_visible = tab.restore_position
+            if tab.large_file:
+                tab.large_file.goto_line(line)
+            else:
+                tab.editor.setCursorPosition(line, column)
+                tab.editor.setFirstVisibleLine(first_visible)
+        tab.pending_line = None
+        tab.restore_position = None
+
+    def cancel_loading(self):
+        tab = self.current_tab()
+        if tab and self.json_formatter.is_running(tab):
+            self.json_formatter.cancel(tab)
+        elif tab and tab.large_file:
+            tab.large_file.cancel_indexing()
+            self.status_bar.hide_progress()
+        elif tab and self.loader.is_loading(tab):
+            self.loader.cancel(tab)
+        else:
+            self.loader.cancel_all()
+
+    def hide_progress_if_idle(self):
+        if not (self.loader.is_loading() or self.saver.is_saving()
+                or self.json_formatter.is_running()):
+            self.status_bar.hide_progress()
+
+    def document_load_progress(self, tab, done, total):
+        name = os.path.basename(tab.current_file or "")
+        self.status_bar.show_progress(f"正在加载 {name}", done, total)
+
+    def document_load_finished(self):
+        self.hide_progress_if_idle()
+
+    def document_loaded(self, tab, text, detection):
+        self.document_load_finished()
+        if self.tabs.indexOf(tab) == -1:
+            return
             
-        except Exception as e:
-            QMessageBox.warning(self, "错误", f"无法打开文件：{str(e)}")
+        self.show_text(tab, text)
+        tab.current_encoding = detection.encoding
+        tab.encoding_confidence = detection.confidence
+        tab.is_placeholder = False
+        tab.set_loading(False)
+        
+        self.restore_tab_position(tab)
+        add_recent_file(tab.current_file)
+        self.journals.track(tab)
+        self.file_monitor.watch(tab)
+        perf.end('open', tab, encoding=detection.encoding)
+        perf.end('encoding.change', tab)
+        
+        # 更新编码显示
+        self.schedule_status_update(tab)
+
+    def show_text(self, tab, text):
+        # 整体替换内容不记入编辑日志，由调用方重新设定日志起点
+        self.journals.detach(tab)
+        # 先清空旧内容再设置语法高亮，避免切换词法分析器时对整个文档着色
+        tab.load_text('')
+        _, file_extension = os.path.splitext(tab.current_file or '')
+        with perf.span('open.lexer', path=tab.current_file):
+            self.set_lexer(tab, file_extension, len(text))
+        with perf.span('open.set_text', path=tab.current_file, length=len(text)):
+            tab.load_text(text)
+        self.start_highlighting(tab, len(text))
+        self.json_validator.track(tab, file_extension)
+        if tab is self.current_tab():
+            self.outline_panel.set_tab(tab)
+
+    def document_load_failed(self, tab, message):
+        self.document_load_finished()
+        perf.end('open', tab, error=message)
+        perf.end('encoding.change', tab, error=message)
+        if self.tabs.indexOf(tab) == -1:
+            return
+        if tab.is_placeholder:
+            self.discard_placeholder(tab)
+            QMessageBox.warning(self, "错误", f"无法打开文件：{message}")
+        else:
+            tab.set_loading(False)
+            QMessageBox.warning(self, "错误", f"更改编码时发生错误：{message}")
+
+    def document_load_cancelled(self, tab):
+        self.document_load_finished()
+        perf.discard('open', tab)
+        perf.discard('encoding.change', tab)
+        if self.tabs.indexOf(tab) == -1:
+            return
+        if tab.is_placeholder:
+            self.discard_placeholder(tab)
+        else:
+            tab.set_loading(False)
+
+    def discard_placeholder(self, tab):
+        # 占位标签页未加载成功，直接移除，不询问保存
+        index = self.tabs.indexOf(tab)
+        if self.tabs.count() == 1:
+            self.new_file()
+        self.tabs.removeTab(index)
 
 def main():
     app = QApplication(sys.argv)
@@ -0,0 +1,40 @@
+from PyQt6.QtCore import QObject, QTimer, QCoreApplication
+
+# 一帧的时间（毫秒）
+FRAME_INTERVAL = 16
+
+
+class UiScheduler(QObject):
+    # 把高频信号触发的界面刷新合并为每帧最多执行一次，同一个键只保留最后一次回调
+    def __init__(self, parent=None, interval=FRAME_INTERVAL):
+        super().__init__(parent)
+        self.pending = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, key, callback):
+        self.pending[key] = callback
+        # 已在等待时不重新计时，持续的信号也能保证每帧刷新一次
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def cancel(self, key):
+        self.pending.pop(key, None)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+
+
+_scheduler = None
+
+
+def ui_scheduler():
+    # 全局共享的调度器，供需要响应编辑器高频信号的控件使用
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = UiScheduler(QCoreApplication.instance())
+    return _scheduler
\ No newline at end of file
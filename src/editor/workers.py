@@ -0,0 +1,57 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ..utils.errors import OperationCancelled
+
+# 正在运行的任务，防止 Python 对象在信号送达前被回收
+_active_workers = set()
+
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    # 使用 object 以支持超过 2GB 的字节数
+    progress = pyqtSignal(object, object)
+    done = pyqtSignal()
+
+
+class Worker(QRunnable):
+    def __init__(self, fn, *args, reports_progress=False, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.reports_progress = reports_progress
+        self.cancelled = False
+        self.signals = WorkerSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def is_cancelled(self):
+        return self.cancelled
+
+    def run(self):
+        kwargs = self.kwargs
+        if self.reports_progress:
+            # 需要进度和取消的任务通过关键字参数拿到回调
+            kwargs = dict(kwargs,
+                          progress=self.signals.progress.emit,
+                          is_cancelled=self.is_cancelled)
+        try:
+            result = self.fn(*self.args, **kwargs)
+        except OperationCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+        finally:
+            self.signals.done.emit()
+
+
+def start_worker(worker, pool=None):
+    _active_workers.add(worker)
+    worker.signals.done.connect(lambda: _active_workers.discard(worker))
+    (pool or QThreadPool.globalInstance()).start(worker)
+    return worker
\ No newline at end of file
@@ -0,0 +1,123 @@
+import codecs
+import fnmatch
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .encoding import decode_bytes
+from .file_io import atomic_write
+from .json_format import format_json_text
+from .trigram_index import SKIP_DIRS, is_binary
+
+# 每个子进程任务处理的文件数
+BATCH_SIZE = 16
+
+# 每个文件的处理结果
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+
+def collect_files(root, patterns):
+    # patterns 为文件名通配符列表，如 ['*.json']
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS)
+        for name in sorted(files):
+            if not name.startswith('.') and any(fnmatch.fnmatch(name, p) for p in patterns):
+                yield os.path.join(directory, name)
+
+
+def format_json_file(text, minify=False):
+    formatted = format_json_text(text, minify=minify)
+    # 保留文件末尾的换行
+    return formatted + '\n' if text.endswith('\n') else formatted
+
+
+def normalize_line_endings(text, newline='\n'):
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text if newline == '\n' else text.replace('\n', newline)
+
+
+def process_file(path, operation, options, dry_run):
+    # 返回 (路径, 结果, 说明)
+    with open(path, 'rb') as f:
+        data = f.read()
+    if is_binary(data) and not data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return path, SKIPPED, "二进制文件"
+    # 与打开文件时相同的编码检测
+    text, detection = decode_bytes(data)
+    encoding = detection.encoding
+
+    if operation == 'validate_json':
+        format_json_text(text, minify=True)
+        return path, UNCHANGED, ""
+    if operation in ('format_json', 'minify_json'):
+        new_text = format_json_file(text, minify=operation == 'minify_json')
+        message = ""
+    elif operation == 'reencode':
+        encoding = options['encoding']
+        new_text = text
+        message = f"{detection.encoding} -> {encoding}"
+    elif operation == 'line_endings':
+        new_text = normalize_line_endings(text, options['newline'])
+        message = ""
+    else:
+        raise ValueError(f"未知的操作：{operation}")
+
+    new_data = new_text.encode(encoding)
+    if new_data == data:
+        return path, UNCHANGED, ""
+    if not dry_run:
+        atomic_write(path, [new_data])
+    return path, CHANGED, message
+
+
+def process_files(paths, operation, options, dry_run):
+    # 在子进程中运行；单个文件出错不影响同一批的其他文件
+    results = []
+    for path in paths:
+        try:
+            results.append(process_file(path, operation, options, dry_run))
+        except (OSError, ValueError, LookupError) as e:
+            results.append((path, FAILED, str(e)))
+    return results
+
+
+def run_batch(root, patterns, operation, options=None, dry_run=False,
+              progress=None, is_cancelled=None, max_workers=None):
+    # 返回 (结果列表, 是否被取消)；取消时已在执行的批次会完成，每个文件都是原子写入
+    options = options or {}
+    paths = list(collect_files(root, patterns))
+    batches = [paths[i:i + BATCH_SIZE] for i in range(0, len(paths), BATCH_SIZE)]
+    results = []
+    if progress:
+        progress(0, len(paths))
+    if not batches:
+        return results, False
+
+    # 使用 spawn 启动子进程，避免在带有 Qt 线程的进程中 fork
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers, mp_context=context) as executor:
+        futures = [executor.submit(process_files, batch, operation, options, dry_run)
+                   for batch in batches]
+        finished = set()
+        for future in as_completed(futures):
+            finished.add(future)
+            results.extend(future.result())
+            if progress:
+                progress(len(results), len(paths))
+            if is_cancelled and is_cancelled():
+                # 等待已开始的批次完成并收集它们的结果
+                executor.shutdown(cancel_futures=True)
+                for other in futures:
+                    if other not in finished and not other.cancelled():
+                        results.extend(other.result())
+                return results, True
+    return results, False
+
+
+def summarize(results):
+    counts = {CHANGED: 0, UNCHANGED: 0, SKIPPED: 0, FAILED: 0}
+    for path, status, message in results:
+        counts[status] += 1
+    return counts
\ No newline at end of file
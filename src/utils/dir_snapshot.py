@@ -0,0 +1,179 @@
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from .errors import OperationCancelled
+from .file_io import atomic_write
+from .fs_scan import scan_directory_state
+
+# 文件头：标识、版本、节点数、名称表字节数、根目录路径字节数
+HEADER = struct.Struct('<4sIIII')
+MAGIC = b'EDTS'
+VERSION = 1
+# 节点标志
+IS_DIR = 0x1
+SCANNED = 0x2
+# 名称中不会出现 NUL，用作名称表的分隔符
+SEPARATOR = '\0'
+
+
+class DirectorySnapshot:
+    # 根目录下已扫描目录的列表。磁盘格式为名称表加按层序排列的节点数组
+    # （父节点索引、名称索引、标志、目录修改时间），同一目录的子节点连续且父节点索引不减，
+    # 加载时只需 frombytes；之后的变化记录在 changes 中，保存时再合并
+    def __init__(self, root, names=(), parents=None, name_ids=None, flags=None, mtimes=None):
+        self.root = os.path.abspath(root)
+        self.names = names
+        self.parents = parents if parents is not None else array('i', [-1])
+        self.name_ids = name_ids if name_ids is not None else array('I', [0])
+        self.flags = flags if flags is not None else array('B', [IS_DIR])
+        self.mtimes = mtimes if mtimes is not None else array('q', [0])
+        # 相对路径 -> (修改时间, [(名称, 是否目录)])
+        self.changes = {}
+        # 相对路径 -> 节点索引，以及节点索引 -> {子节点名称: 子节点索引}
+        self.node_cache = {'': 0}
+        self.children_cache = {}
+
+    def copy(self):
+        # 供后台线程使用的副本：共享不可变的节点数组，变化记录单独复制
+        snapshot = DirectorySnapshot(self.root, self.names, self.parents, self.name_ids,
+                                     self.flags, self.mtimes)
+        snapshot.changes = dict(self.changes)
+        return snapshot
+
+    def relative(self, path):
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        return '' if rel == os.curdir else rel
+
+    def child_nodes(self, node):
+        children = self.children_cache.get(node)
+        if children is None:
+            lo = bisect_left(self.parents, node, 1)
+            hi = bisect_right(self.parents, node, lo)
+            children = {self.names[self.name_ids[i]]: i for i in range(lo, hi)}
+            self.children_cache[node] = children
+        return children
+
+    def node_for(self, rel):
+        node = self.node_cache.get(rel)
+        if node is not None:
+            return node
+        parent, name = os.path.split(rel)
+        parent_node = self.node_for(parent)
+        if parent_node is None:
+            return None
+        node = self.child_nodes(parent_node).get(name)
+        if node is not None:
+            self.node_cache[rel] = node
+        return node
+
+    def listing(self, rel):
+        # 返回 (修改时间, 条目列表)，该目录未扫描过时返回 None
+        if rel in self.changes:
+            return self.changes[rel]
+        node = self.node_for(rel)
+        if node is None or not self.flags[node] & SCANNED:
+            return None
+        entries = [(name, bool(self.flags[child] & IS_DIR))
+                   for name, child in self.child_nodes(node).items()]
+        return self.mtimes[node], entries
+
+    def record(self, rel, mtime, entries):
+        self.changes[rel] = (mtime, entries)
+
+    def directories(self):
+        # 按层序遍历所有已扫描的目录，只经过当前列表中仍然存在的子目录
+        queue = deque([''])
+        while queue:
+            rel = queue.popleft()
+            state = self.listing(rel)
+            if state is None:
+                continue
+            mtime, entries = state
+            yield rel, mtime, entries
+            queue.extend(os.path.join(rel, name) for name, is_dir in entries if is_dir)
+
+    def serialize(self):
+        names = {}
+        parents, name_ids = array('i', [-1]), array('I', [self.name_id(names, '')])
+        flags, mtimes = array('B', [IS_DIR]), array('q', [0])
+        # 相对路径 -> 节点索引；层序遍历保证子节点在父节点之后且父节点索引不减
+        nodes = {'': 0}
+        for rel, mtime, entries in self.directories():
+            node = nodes[rel]
+            flags[node] |= SCANNED
+            mtimes[node] = mtime
+            for name, is_dir in entries:
+                if is_dir:
+                    nodes[os.path.join(rel, name)] = len(parents)
+                parents.append(node)
+                name_ids.append(self.name_id(names, name))
+                flags.append(IS_DIR if is_dir else 0)
+                mtimes.append(0)
+        name_table = SEPARATOR.join(names).encode('utf-8', 'surrogateescape')
+        root = self.root.encode('utf-8', 'surrogateescape')
+        header = HEADER.pack(MAGIC, VERSION, len(parents), len(name_table), len(root))
+        return b''.join([header, root, name_table, parents.tobytes(), name_ids.tobytes(),
+                         mtimes.tobytes(), flags.tobytes()])
+
+    @staticmethod
+    def name_id(names, name):
+        name_id = names.get(name)
+        if name_id is None:
+            name_id = names[name] = len(names)
+        return name_id
+
+    def save(self, path):
+        data = self.serialize()
+        atomic_write(path, [data], len(data))
+
+
+def load_snapshot(root, path):
+    # 文件不存在、格式不符或属于其他根目录时返回 None
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, count, names_size, root_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        offset = HEADER.size
+        stored_root = data[offset:offset + root_size].decode('utf-8', 'surrogateescape')
+        if stored_root != os.path.abspath(root):
+            return None
+        offset += root_size
+        names = data[offset:offset + names_size].decode('utf-8', 'surrogateescape').split(SEPARATOR)
+        offset += names_size
+        columns = []
+        for typecode in ('i', 'I', 'q', 'B'):
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+            columns.append(column)
+        parents, name_ids, mtimes, flags = columns
+        if len(flags) != count:
+            return None
+    except (OSError, ValueError, struct.error):
+        return None
+    return DirectorySnapshot(root, names, parents, name_ids, flags, mtimes)
+
+
+def revalidate(snapshot, progress=None, is_cancelled=None):
+    # 按修改时间检查快照中的每个目录，只重新读取发生变化的目录；
+    # 返回 {相对路径: (修改时间, 条目列表)}，已不存在的目录不在结果中
+    changes = {}
+    for rel, mtime, entries in snapshot.directories():
+        if is_cancelled and is_cancelled():
+            raise OperationCancelled()
+        path = os.path.join(snapshot.root, rel)
+        try:
+            if os.stat(path).st_mtime_ns == mtime:
+                continue
+            state = scan_directory_state(path)
+        except OSError:
+            continue
+        changes[rel] = state
+        # 后续遍历使用新的列表，新出现的子目录尚未扫描，不会被访问
+        snapshot.record(rel, *state)
+    return changes
\ No newline at end of file
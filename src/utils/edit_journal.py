@@ -0,0 +1,115 @@
+import glob
+import json
+import os
+import struct
+from .file_io import atomic_write
+
+# 每条记录：类型（i 插入 / d 删除）、UTF-8 字节位置、长度；插入记录后跟插入的字节
+RECORD_HEADER = struct.Struct('<cQI')
+INSERT = b'i'
+DELETE = b'd'
+META_FILE = 'meta.json'
+
+
+def encode_insert(position, data):
+    return RECORD_HEADER.pack(INSERT, position, len(data)) + data
+
+
+def encode_delete(position, length):
+    return RECORD_HEADER.pack(DELETE, position, length)
+
+
+def ops_path(directory, generation):
+    return os.path.join(directory, f'ops.{generation}')
+
+
+def snapshot_path(directory, generation):
+    return os.path.join(directory, f'snapshot.{generation}')
+
+
+def write_meta(directory, meta):
+    os.makedirs(directory, exist_ok=True)
+    atomic_write(os.path.join(directory, META_FILE), [json.dumps(meta, ensure_ascii=False).encode('utf-8')])
+
+
+def read_meta(directory):
+    with open(os.path.join(directory, META_FILE), 'rb') as f:
+        return json.loads(f.read().decode('utf-8'))
+
+
+def append_ops(directory, generation, data):
+    # 只追加新的编辑记录，写入量与编辑量成正比，和文档大小无关
+    with open(ops_path(directory, generation), 'ab') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_snapshot(directory, generation, chunks):
+    # 整理：写入当前完整内容作为新一代的起点，然后删除旧的记录
+    atomic_write(snapshot_path(directory, generation), chunks)
+    for path in glob.glob(os.path.join(directory, 'ops.*')) + glob.glob(os.path.join(directory, 'snapshot.*')):
+        if int(path.rsplit('.', 1)[1]) < generation:
+            os.unlink(path)
+
+
+def apply_ops(document, data):
+    # 依次重放记录；崩溃时最后一条记录可能不完整，直接忽略
+    pos = 0
+    size = RECORD_HEADER.size
+    while pos + size <= len(data):
+        kind, position, length = RECORD_HEADER.unpack_from(data, pos)
+        pos += size
+        if kind == INSERT:
+            if pos + length > len(data):
+                break
+            document[position:position] = data[pos:pos + length]
+            pos += length
+        elif kind == DELETE:
+            del document[position:position + length]
+        else:
+            raise ValueError("编辑日志已损坏")
+    return document
+
+
+def latest_generation(directory):
+    # 最新的一代：其快照已完整写入（快照为原子写入），或为没有快照的第 0 代
+    generations = [int(path.rsplit('.', 1)[1])
+                   for path in glob.glob(os.path.join(directory, 'snapshot.*'))
+                   if not path.endswith('.tmp')]
+    return max(generations, default=0)
+
+
+def has_edits(directory):
+    # 没有快照且没有编辑记录的日志与起点相同，无需恢复
+    if latest_generation(directory):
+        return True
+    try:
+        return os.path.getsize(ops_path(directory, 0)) > 0
+    except OSError:
+        return False
+
+
+def replay(directory):
+    # 返回 (元数据, 恢复后的 UTF-8 内容)
+    meta = read_meta(directory)
+    generation = latest_generation(directory)
+    if generation:
+        with open(snapshot_path(directory, generation), 'rb') as f:
+            document = bytearray(f.read())
+    elif meta.get('base') == 'file':
+        # 以磁盘上的文件为起点，文件在此期间被改动过则无法重放
+        path = meta['file']
+        st = os.stat(path)
+        if st.st_mtime_ns != meta['mtime'] or st.st_size != meta['size']:
+            raise ValueError(f"{path} 在异常退出后已被修改")
+        with open(path, 'rb') as f:
+            document = bytearray(f.read().decode(meta['encoding']).encode('utf-8'))
+    else:
+        document = bytearray()
+    try:
+        with open(ops_path(directory, generation), 'rb') as f:
+            apply_ops(document, f.read())
+    except FileNotFoundError:
+        pass
+    return meta, bytes(document)
\ No newline at end of file
@@ -0,0 +1,107 @@
+import codecs
+from collections import namedtuple
+from .file_io import read_file_bytes
+from . import perf
+
+# 检测结果：编码名称、置信度 (0-1)、BOM 长度
+DetectionResult = namedtuple('DetectionResult', ['encoding', 'confidence', 'bom_length'])
+
+# 先检查 UTF-32 再检查 UTF-16，因为 UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# GB2312 是 GBK 的子集，只需尝试 GBK；ISO-8859-1 可以解码任意字节，作为最后的兜底
+CANDIDATES = ['utf-8', 'gbk', 'iso-8859-1']
+FALLBACK_ENCODING = 'iso-8859-1'
+
+# 只对文件头尾各取这么多字节做检测
+SAMPLE_SIZE = 64 * 1024
+
+
+def _sample_decodes(sample, encoding, final):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        decoder.decode(sample, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _suffix_decodes(sample, encoding):
+    # 尾部采样可能从多字节字符中间开始，允许跳过开头的几个字节
+    for skip in range(4):
+        if _sample_decodes(sample[skip:], encoding, True):
+            return True
+    return False
+
+
+def _gbk_confidence(sample):
+    # 解码出的非 ASCII 字符中常用汉字所占比例越高，越可能确实是 GBK
+    text = codecs.getincrementaldecoder('gbk')(errors='ignore').decode(sample)
+    non_ascii = [ch for ch in text if ord(ch) > 0x7F]
+    if not non_ascii:
+        return 0.5
+    hanzi = sum(1 for ch in non_ascii
+                if '\u4e00' <= ch <= '\u9fff' or '\u3000' <= ch <= '\u303f'
+                or '\uff00' <= ch <= '\uffef')
+    return 0.5 + 0.45 * hanzi / len(non_ascii)
+
+
+def detect_encoding(data, sample_size=SAMPLE_SIZE):
+    # 只用切片访问数据，以便同样适用于 mmap
+    for bom, encoding in BOMS:
+        if data[:len(bom)] == bom:
+            return DetectionResult(encoding, 1.0, len(bom))
+
+    fully_sampled = len(data) <= sample_size * 2
+    if fully_sampled:
+        prefix, suffix = data[:], b''
+    else:
+        prefix, suffix = data[:sample_size], data[-sample_size:]
+
+    if prefix.isascii() and suffix.isascii():
+        return DetectionResult('utf-8', 1.0 if fully_sampled else 0.9, 0)
+
+    if (_sample_decodes(prefix, 'utf-8', fully_sampled)
+            and (fully_sampled or _suffix_decodes(suffix, 'utf-8'))):
+        return DetectionResult('utf-8', 0.99 if fully_sampled else 0.95, 0)
+
+    if (_sample_decodes(prefix, 'gbk', fully_sampled)
+            and (fully_sampled or _suffix_decodes(suffix, 'gbk'))):
+        return DetectionResult('gbk', _gbk_confidence(prefix + suffix), 0)
+
+    return DetectionResult(FALLBACK_ENCODING, 0.3, 0)
+
+
+def decode_bytes(data, encoding=None):
+    # 指定编码时严格按该编码解码，解码失败直接抛出 UnicodeDecodeError
+    if encoding:
+        return codecs.decode(data, encoding), DetectionResult(encoding, 1.0, 0)
+
+    result = detect_encoding(data)
+    candidates = [result.encoding] + [c for c in CANDIDATES if c != result.encoding]
+    for candidate in candidates:
+        try:
+            # 只对内存中的同一份数据解码，不再重新读取文件
+            text = codecs.decode(data, candidate)
+        except UnicodeDecodeError:
+            continue
+        if candidate != result.encoding:
+            # 采样判断失误，降低置信度
+            result = DetectionResult(candidate, min(result.confidence, 0.5), 0)
+        return text, result
+
+    # ISO-8859-1 不会解码失败，这里只是保险
+    return codecs.decode(data, FALLBACK_ENCODING), DetectionResult(FALLBACK_ENCODING, 0.1, 0)
+
+
+def read_text_file(path, encoding=None, progress=None, is_cancelled=None):
+    with perf.span('open.read', path=path):
+        data = read_file_bytes(path, progress, is_cancelled)
+    with perf.span('open.decode', path=path, size=len(data)):
+        return decode_bytes(data, encoding)
\ No newline at end of file
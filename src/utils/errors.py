@@ -0,0 +1,3 @@
+class OperationCancelled(Exception):
+    # 后台任务被用户取消
+    pass
\ No newline at end of file
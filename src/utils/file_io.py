@@ -0,0 +1,83 @@
+import codecs
+import hashlib
+import os
+import shutil
+import tempfile
+from .errors import OperationCancelled
+
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def read_file_bytes(path, progress=None, is_cancelled=None, chunk_size=READ_CHUNK_SIZE):
+    # 分块读取整个文件，期间汇报进度并响应取消
+    with open(path, 'rb') as f:
+        total = os.fstat(f.fileno()).st_size
+        data = bytearray()
+        while True:
+            if is_cancelled and is_cancelled():
+                raise OperationCancelled()
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            data += chunk
+            if progress:
+                progress(len(data), max(total, len(data)))
+    return data
+
+def transcode_chunks(chunks, source_encoding, target_encoding):
+    # 增量转码，避免把整个文档拼成一个字符串
+    if codecs.lookup(source_encoding).name == codecs.lookup(target_encoding).name:
+        yield from chunks
+        return
+    decoder = codecs.getincrementaldecoder(source_encoding)()
+    encoder = codecs.getincrementalencoder(target_encoding)()
+    for chunk in chunks:
+        yield encoder.encode(decoder.decode(chunk))
+    yield encoder.encode(decoder.decode(b'', final=True), final=True)
+
+
+def fsync_directory(directory):
+    # 确保重命名本身也落盘，Windows 不支持打开目录
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, chunks, total=None, progress=None, is_cancelled=None):
+    # 先写入同目录下的临时文件并 fsync，再原子地替换目标文件；
+    # 任何一步失败都不会改动原文件
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            written = 0
+            for chunk in chunks:
+                if is_cancelled and is_cancelled():
+                    raise OperationCancelled()
+                f.write(chunk)
+                written += len(chunk)
+                if progress:
+                    progress(written, max(total or 0, written))
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
+    return path
+
+
+def cache_file_name(root):
+    # 按目录的绝对路径生成缓存文件名，各种按根目录保存的缓存共用
+    return hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest() + '.idx'
\ No newline at end of file
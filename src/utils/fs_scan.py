@@ -0,0 +1,24 @@
+import os
+
+
+def scan_directory(path):
+    # 只读取一层目录，返回按名称排序的 (名称, 是否目录) 列表
+    entries = []
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            # 与 QDir 默认过滤保持一致，跳过隐藏文件
+            if entry.name.startswith('.'):
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append((entry.name, is_dir))
+    entries.sort(key=lambda entry: entry[0].lower())
+    return entries
+
+
+def scan_directory_state(path):
+    # 先取目录的修改时间再读取，读取期间发生的变化会在下次检查时发现
+    mtime = os.stat(path).st_mtime_ns
+    return mtime, scan_directory(path)
\ No newline at end of file
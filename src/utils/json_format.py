@@ -0,0 +1,133 @@
+import re
+from .errors import OperationCancelled
+from .text_diff import line_edits
+
+# 跳过空白后匹配一个 JSON 记号；字符串原样保留，不做转义处理
+TOKEN_PATTERN = re.compile(r'''
+    [ \t\n\r]*
+    (?:
+        (?P<string>"(?:[^"\\\x00-\x1f]|\\["\\/bfnrtu])*")
+      | (?P<punct>[{}\[\],:])
+      | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+      | (?P<literal>true|false|null)
+    )
+''', re.VERBOSE)
+TRAILING_SPACE = re.compile(r'[ \t\n\r]*')
+
+# 每处理这么多个记号汇报一次进度并检查取消
+PROGRESS_INTERVAL = 200000
+
+
+class JsonFormatError(ValueError):
+    def __init__(self, message, text, pos):
+        line = text.count('\n', 0, pos) + 1
+        column = pos - text.rfind('\n', 0, pos)
+        super().__init__(f"{message}: line {line} column {column} (char {pos})")
+        self.pos = pos
+
+
+def format_json_text(text, indent=4, minify=False, progress=None, is_cancelled=None):
+    # 基于记号流的格式化：不构建 Python 对象，字符串和数字保持原样
+    out = []
+    write = out.append
+    if minify:
+        newline, colon, indent = '', ':', 0
+    else:
+        newline, colon = '\n', ': '
+    # 栈中记录容器类型 '{' 或 '['
+    stack = []
+    # 期望的下一个记号：value、value_or_end、key、key_or_end、colon、comma_or_end
+    expect = 'value'
+    pos = 0
+    length = len(text)
+    count = 0
+    match_token = TOKEN_PATTERN.match
+
+    while True:
+        match = match_token(text, pos)
+        if match is None:
+            end = TRAILING_SPACE.match(text, pos).end()
+            if end == length:
+                raise JsonFormatError("Expecting value", text, end)
+            raise JsonFormatError("Invalid token", text, end)
+        pos = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        start = match.start(kind)
+
+        count += 1
+        if count % PROGRESS_INTERVAL == 0:
+            if is_cancelled and is_cancelled():
+                raise OperationCancelled()
+            if progress:
+                progress(pos, length)
+
+        depth = len(stack)
+        if expect == 'colon':
+            if token != ':':
+                raise JsonFormatError("Expecting ':' delimiter", text, start)
+            write(colon)
+            expect = 'value'
+            continue
+
+        if expect == 'comma_or_end':
+            if token == ',':
+                write(',')
+                expect = 'key' if stack[-1] == '{' else 'value'
+                continue
+            if token != ('}' if stack[-1] == '{' else ']'):
+                raise JsonFormatError("Expecting ',' delimiter", text, start)
+            stack.pop()
+            write(newline + ' ' * (indent * (depth - 1)))
+            write(token)
+        elif expect in ('key', 'key_or_end'):
+            if expect == 'key_or_end' and token == '}':
+                # 空对象
+                stack.pop()
+                write(token)
+            elif kind == 'string':
+                write(newline + ' ' * (indent * depth))
+                write(token)
+                expect = 'colon'
+                continue
+            else:
+                raise JsonFormatError("Expecting property name enclosed in double quotes",
+                                      text, start)
+        else:
+            if expect == 'value_or_end' and token == ']':
+                # 空数组
+                stack.pop()
+                write(token)
+            elif kind == 'punct' and token not in '{[':
+                raise JsonFormatError("Expecting value", text, start)
+            else:
+                # 数组元素各占一行，对象的值紧跟在冒号后面
+                if stack and stack[-1] == '[':
+                    write(newline + ' ' * (indent * depth))
+                write(token)
+                if token in ('{', '['):
+                    stack.append(token)
+                    expect = 'key_or_end' if token == '{' else 'value_or_end'
+                    continue
+
+        # 完成一个值之后
+        if stack:
+            expect = 'comma_or_end'
+        else:
+            break
+
+    end = TRAILING_SPACE.match(text, pos).end()
+    if end != length:
+        raise JsonFormatError("Extra data", text, end)
+    if progress:
+        progress(length, length)
+    return ''.join(out)
+
+
+def json_format_edits(text, minify=False, progress=None, is_cancelled=None):
+    # 格式化后只返回与原文不同的部分，便于编辑器按最少编辑应用
+    formatted = format_json_text(text, minify=minify, progress=progress, is_cancelled=is_cancelled)
+    if text.endswith('\n'):
+        # 保留文件末尾的换行
+        formatted += '\n'
+    return line_edits(text, formatted)
\ No newline at end of file
@@ -0,0 +1,169 @@
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from .json_format import TOKEN_PATTERN
+
+# 与格式化使用相同的记号规则，但直接在 UTF-8 字节上匹配，位置即编辑器的字节位置
+TOKEN = re.compile(TOKEN_PATTERN.pattern.encode('ascii'), re.VERBOSE)
+SPACE = re.compile(rb'[ \t\n\r]*')
+# 数据块末尾可能被截断的记号，需要读取后续数据才能判断
+PARTIAL = re.compile(rb'''
+    [ \t\n\r]*
+    (?:
+        "(?:[^"\\\x00-\x1f]|\\["\\/bfnrtu])*\\?
+      | -?(?:[0-9]+(?:\.[0-9]*)?(?:[eE][+-]?[0-9]*)?)?
+      | t(?:r(?:ue?)?)? | f(?:a(?:l(?:se?)?)?)? | n(?:u(?:ll?)?)?
+    )\Z
+''', re.VERBOSE)
+
+# 每隔这么多字节记录一个结构检查点（位置、容器栈、期望的下一个记号）
+CHECKPOINT_INTERVAL = 256 * 1024
+# 还没有检查过的区域延伸到文档末尾
+UNBOUNDED = sys.maxsize
+
+# status 为 valid、error、converged（与旧检查点状态一致，后面的结果不变）或 incomplete（需要后续数据）
+ScanResult = namedtuple('ScanResult', ['status', 'pos', 'stack', 'expect', 'checkpoints', 'message'])
+
+
+def scan_json(data, base, stack, expect, final, converge=None, interval=CHECKPOINT_INTERVAL):
+    # 从 base 处的结构状态开始检查 data；stack 是由 '{' 和 '[' 组成的字符串
+    checkpoints = []
+    converge = converge or {}
+    next_checkpoint = base + interval
+    length = len(data)
+    pos = 0
+
+    def result(status, at, message=None):
+        return ScanResult(status, base + at, stack, expect, checkpoints, message)
+
+    while True:
+        if expect == 'end':
+            end = SPACE.match(data, pos).end()
+            if end != length:
+                return result('error', end, "Extra data")
+            return result('valid' if final else 'incomplete', end)
+
+        match = TOKEN.match(data, pos)
+        # 数字在块末尾可能只匹配了一部分（如 "1." 只匹配到 "1"），末尾附近的记号都要检查
+        if match is None or (match.end() + 2 >= length and not final):
+            if not final and PARTIAL.match(data, pos):
+                return result('incomplete', pos)
+            if match is None:
+                end = SPACE.match(data, pos).end()
+                return result('error', end, "Expecting value" if end == length else "Invalid token")
+        pos = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        start = match.start(kind)
+
+        if expect == 'colon':
+            if token != b':':
+                return result('error', start, "Expecting ':' delimiter")
+            expect = 'value'
+            continue
+
+        if expect == 'comma_or_end':
+            if token == b',':
+                expect = 'key' if stack[-1] == '{' else 'value'
+                continue
+            if token != (b'}' if stack[-1] == '{' else b']'):
+                return result('error', start, "Expecting ',' delimiter")
+            stack = stack[:-1]
+        elif expect in ('key', 'key_or_end'):
+            if expect == 'key_or_end' and token == b'}':
+                stack = stack[:-1]
+            elif kind == 'string':
+                expect = 'colon'
+                continue
+            else:
+                return result('error', start, "Expecting property name enclosed in double quotes")
+        else:
+            if expect == 'value_or_end' and token == b']':
+                stack = stack[:-1]
+            elif kind == 'punct' and token not in (b'{', b'['):
+                return result('error', start, "Expecting value")
+            elif token in (b'{', b'['):
+                stack += token.decode('ascii')
+                expect = 'key_or_end' if token == b'{' else 'value_or_end'
+                continue
+
+        # 完成一个值之后是记号边界，可以记录检查点或与旧检查点比较
+        expect = 'comma_or_end' if stack else 'end'
+        at = base + pos
+        if converge.get(at) == (stack, expect):
+            return result('converged', pos)
+        if at >= next_checkpoint:
+            checkpoints.append((at, stack, expect))
+            next_checkpoint = at + interval
+
+
+class ValidationState:
+    # 单个文档的检查状态：按位置排序的检查点、已知的第一个错误和尚未检查的区域
+    def __init__(self):
+        self.positions = [0]
+        self.states = [('', 'value')]
+        self.error = None
+        self.dirty_from = 0
+        self.dirty_to = UNBOUNDED
+
+    def is_clean(self):
+        return self.dirty_from is None
+
+    def edited(self, position, added, removed):
+        # 编辑后检查点跟随文本移动，被删除区域内的检查点作废
+        i = bisect_right(self.positions, position)
+        if removed:
+            j = bisect_right(self.positions, position + removed)
+            del self.positions[i:j]
+            del self.states[i:j]
+        delta = added - removed
+        if delta:
+            self.positions[i:] = [p + delta for p in self.positions[i:]]
+        if self.error and self.error[0] > position:
+            self.error = (max(self.error[0] + delta, position), self.error[1])
+
+        if self.dirty_from is None:
+            self.dirty_from, self.dirty_to = position, position + added
+            return
+        self.dirty_from = min(self.dirty_from, position)
+        if self.dirty_to != UNBOUNDED and self.dirty_to > position:
+            self.dirty_to = max(self.dirty_to + delta, position)
+        self.dirty_to = max(self.dirty_to, position + added)
+
+    def resume_point(self):
+        # 编辑位置之前最近的检查点；恰好在编辑位置的检查点不能用，后面的字符可能与之前的记号相连
+        i = max(bisect_left(self.positions, self.dirty_from) - 1, 0)
+        stack, expect = self.states[i]
+        return self.positions[i], stack, expect
+
+    def convergence_points(self, start, end):
+        # 只有所有编辑之后的旧检查点，其后的内容才没有变化；恰好在编辑末尾的检查点
+        # 不能用，编辑可能改变了它之前的记号（例如删掉了其前面的逗号）
+        i = bisect_right(self.positions, max(start, self.dirty_to))
+        j = bisect_right(self.positions, end)
+        return dict(zip(self.positions[i:j], self.states[i:j]))
+
+    def apply(self, start, result):
+        # 用 [start, result.pos) 的检查结果替换这一段的旧检查点
+        i = bisect_right(self.positions, start)
+        if result.status == 'converged':
+            # 收敛点的旧检查点与新状态一致，保留
+            j = bisect_left(self.positions, result.pos)
+        elif result.status == 'incomplete':
+            # 恰好在 result.pos 的旧检查点记录的是编辑前的状态，一并丢弃
+            j = bisect_right(self.positions, result.pos)
+        else:
+            j = len(self.positions)
+        self.positions[i:j] = [p for p, _, _ in result.checkpoints]
+        self.states[i:j] = [(stack, expect) for _, stack, expect in result.checkpoints]
+        if result.status == 'incomplete':
+            # 新记录的检查点与旧的检查结果不属于同一次完整检查，不能用来衔接旧结果
+            self.dirty_from = max(self.dirty_from, result.pos)
+            self.dirty_to = max(self.dirty_to, result.pos)
+            return
+        if result.status == 'error':
+            self.error = (result.pos, result.message)
+        elif result.status == 'valid':
+            self.error = None
+        self.dirty_from = self.dirty_to = None
\ No newline at end of file
@@ -0,0 +1,71 @@
+import mmap
+import os
+from array import array
+from itertools import accumulate, islice, repeat
+from operator import add
+from .errors import OperationCancelled
+
+INDEX_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+class MappedFile:
+    # 以只读方式内存映射文件，并增量建立行首偏移索引
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        if self.size:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.data = b''
+        # offsets[i] 为第 i 行起始的字节偏移
+        self.offsets = array('Q', [0])
+        self.scanned = 0
+
+    @property
+    def complete(self):
+        return self.scanned >= self.size
+
+    def line_count(self):
+        return len(self.offsets)
+
+    def index_chunk(self, chunk_size=INDEX_CHUNK_SIZE):
+        start = self.scanned
+        end = min(start + chunk_size, self.size)
+        parts = self.data[start:end].split(b'\n')
+        # 最后一段之后没有换行符，不产生新的行首
+        parts.pop()
+        # 全部在 C 层完成累加，避免逐行的 Python 循环
+        line_starts = accumulate(map(add, map(len, parts), repeat(1)), initial=start)
+        self.offsets.extend(islice(line_starts, 1, None))
+        self.scanned = end
+
+    def build_index(self, progress=None, is_cancelled=None):
+        while not self.complete:
+            if is_cancelled and is_cancelled():
+                raise OperationCancelled()
+            self.index_chunk()
+            if progress:
+                progress(self.scanned, self.size)
+        return self.line_count()
+
+    def line_range(self, first, count, max_bytes):
+        # 返回 [first, first + count) 行的字节内容，总量不超过 max_bytes
+        total = self.line_count()
+        first = max(0, min(first, total - 1))
+        last = min(first + count, total)
+        start = self.offsets[first]
+        while last > first + 1 and self.line_end(last - 1) - start > max_bytes:
+            last = max(first + 1, first + (last - first) // 2)
+        end = min(self.line_end(last - 1), start + max_bytes)
+        return first, last, self.data[start:end]
+
+    def line_end(self, line):
+        if line + 1 < self.line_count():
+            return self.offsets[line + 1]
+        return self.scanned if not self.complete else self.size
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import codecs
+import os
+
+# 每次最多读取的字节数，积压较多时分批追加
+READ_SIZE = 4 * 1024 * 1024
+
+
+def stream_encoding(path, encoding):
+    # 从文件中间开始解码时看不到 BOM，需要按文件开头的 BOM 确定字节序
+    if encoding not in ('utf-16', 'utf-32'):
+        return encoding
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if encoding == 'utf-32':
+        return 'utf-32-be' if head.startswith(codecs.BOM_UTF32_BE) else 'utf-32-le'
+    return 'utf-16-be' if head.startswith(codecs.BOM_UTF16_BE) else 'utf-16-le'
+
+
+class TailReader:
+    # 记住已读到的字节位置，只读取并解码新追加的内容
+    def __init__(self, path, encoding, offset):
+        self.path = path
+        self.encoding = encoding
+        self.offset = offset
+        st = os.stat(path)
+        self.identity = (st.st_dev, st.st_ino)
+        self.decoder = self.new_decoder()
+
+    def new_decoder(self):
+        # 有状态的解码器，跨批次截断的多字节字符会留到下一批
+        return codecs.getincrementaldecoder(stream_encoding(self.path, self.encoding))(errors='replace')
+
+    def restart(self, identity):
+        self.identity = identity
+        self.offset = 0
+        self.decoder = self.new_decoder()
+
+    def read(self, limit=READ_SIZE):
+        # 返回 (新文本, 事件, 是否还有未读内容)，事件为 None、'truncated' 或 'rotated'
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            # 轮转过程中旧文件已移走、新文件尚未创建
+            return '', None, False
+        identity = (st.st_dev, st.st_ino)
+        event = None
+        if identity != self.identity:
+            # 按路径重新打开，旧文件中最后未读的部分不再读取
+            event = 'rotated'
+        elif st.st_size < self.offset:
+            event = 'truncated'
+        if event:
+            self.restart(identity)
+        if st.st_size == self.offset:
+            return '', event, False
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(min(limit, st.st_size - self.offset))
+        self.offset += len(data)
+        return self.decoder.decode(data), event, self.offset < st.st_size
\ No newline at end of file
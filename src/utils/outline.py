@@ -0,0 +1,128 @@
+import re
+from .json_format import TOKEN_PATTERN
+
+# 大纲条目：行号（从 0 开始）、层级缩进、类别、名称
+PYTHON_PATTERN = re.compile(r'^([ \t]*)(class|def|async[ \t]+def)[ \t]+(\w+)', re.MULTILINE)
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$')
+FENCE_PATTERN = re.compile(r'^[ \t]{0,3}(```|~~~)')
+SQL_OBJECT_PATTERN = re.compile(r'''
+    ^[ \t]*(CREATE|ALTER|DROP)[ \t]+
+    (?:OR[ \t]+REPLACE[ \t]+)?(?:TEMP(?:ORARY)?[ \t]+)?(?:UNIQUE[ \t]+)?
+    (TABLE|VIEW|INDEX|FUNCTION|PROCEDURE|TRIGGER|SEQUENCE|SCHEMA|DATABASE)[ \t]+
+    (?:IF[ \t]+(?:NOT[ \t]+)?EXISTS[ \t]+)?
+    ([\w."`\[\]]+)
+''', re.MULTILINE | re.IGNORECASE | re.VERBOSE)
+SQL_STATEMENT_PATTERN = re.compile(r'^[ \t]*(SELECT|INSERT|UPDATE|DELETE|WITH|MERGE)\b[^\n]*',
+                                   re.MULTILINE | re.IGNORECASE)
+
+# 只有这些语言的条目只取决于所在的一行，编辑后可以只重新提取修改过的行
+LINE_LOCAL = ('.py', '.sql')
+# JSON 只列出前两层的键，条目过多时截断
+JSON_MAX_DEPTH = 2
+JSON_MAX_ENTRIES = 5000
+STATEMENT_WIDTH = 60
+
+
+def _line_of(text, pos, cache):
+    # cache 为 [上次的位置, 上次的行号]，按位置递增调用时只统计新增部分的换行
+    last_pos, last_line = cache
+    line = last_line + text.count('\n', last_pos, pos)
+    cache[0], cache[1] = pos, line
+    return line
+
+
+def python_outline(text, base_line=0):
+    entries = []
+    cache = [0, base_line]
+    for match in PYTHON_PATTERN.finditer(text):
+        indent = len(match.group(1).expandtabs(4))
+        kind = 'class' if match.group(2) == 'class' else 'def'
+        entries.append((_line_of(text, match.start(), cache), indent, kind, match.group(3)))
+    return entries
+
+
+def markdown_outline(text, base_line=0):
+    entries = []
+    in_fence = None
+    for number, line in enumerate(text.split('\n'), base_line):
+        fence = FENCE_PATTERN.match(line)
+        if fence:
+            # 代码块中以 # 开头的行不是标题
+            if in_fence is None:
+                in_fence = fence.group(1)
+            elif fence.group(1) == in_fence:
+                in_fence = None
+            continue
+        if in_fence is None:
+            match = HEADING_PATTERN.match(line)
+            if match:
+                entries.append((number, len(match.group(1)) - 1, 'heading', match.group(2)))
+    return entries
+
+
+def sql_outline(text, base_line=0):
+    matches = []
+    for match in SQL_OBJECT_PATTERN.finditer(text):
+        name = f"{match.group(2).upper()} {match.group(3)}"
+        matches.append((match.start(), 'object', name))
+    for match in SQL_STATEMENT_PATTERN.finditer(text):
+        statement = ' '.join(match.group(0).split())
+        matches.append((match.start(), 'statement', statement[:STATEMENT_WIDTH]))
+    matches.sort()
+    cache = [0, base_line]
+    return [(_line_of(text, pos, cache), 0, kind, name) for pos, kind, name in matches]
+
+
+def json_outline(text, base_line=0):
+    # 按记号扫描，记录前两层对象的键及其路径
+    entries = []
+    cache = [0, base_line]
+    # 栈中记录容器类型和当前的键
+    stack = []
+    expect_key = False
+    pos = 0
+    match_token = TOKEN_PATTERN.match
+    while len(entries) < JSON_MAX_ENTRIES:
+        match = match_token(text, pos)
+        if match is None:
+            break
+        pos = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        if token in ('{', '['):
+            stack.append([token, None])
+            expect_key = token == '{'
+        elif token in ('}', ']'):
+            if stack:
+                stack.pop()
+            expect_key = False
+        elif token == ',':
+            expect_key = bool(stack) and stack[-1][0] == '{'
+        elif token == ':':
+            expect_key = False
+        elif kind == 'string' and expect_key:
+            key = token[1:-1]
+            stack[-1][1] = key
+            depth = len(stack)
+            if depth <= JSON_MAX_DEPTH and all(container == '{' for container, _ in stack):
+                path = '.'.join(name for _, name in stack)
+                entries.append((_line_of(text, match.start(kind), cache), depth - 1, 'key', path))
+            expect_key = False
+    return entries
+
+
+EXTRACTORS = {
+    '.py': python_outline,
+    '.md': markdown_outline,
+    '.sql': sql_outline,
+    '.json': json_outline,
+}
+
+
+def has_outline(file_extension):
+    return file_extension.lower() in EXTRACTORS
+
+
+def extract_outline(text, file_extension, base_line=0, progress=None):
+    # progress 参数供 run_in_process 传入，这里不需要汇报进度
+    return EXTRACTORS[file_extension.lower()](text, base_line)
\ No newline at end of file
@@ -0,0 +1,240 @@
+import bisect
+import operator
+import os
+import pickle
+import re
+import threading
+from array import array
+from itertools import repeat
+from .errors import OperationCancelled
+from .file_io import atomic_write
+from .trigram_index import SKIP_DIRS
+
+INDEX_VERSION = 1
+# 候选行超过总数的这个比例时直接扫描整段文本，匹配密集时很快就能凑够结果
+DENSE_CANDIDATES = 0.125
+# 0/1 字节转成二进制数字字符
+BIT_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def subsequence_pattern(query):
+    # 每个字符之后只跳过不等于下一个字符的内容，避免回溯
+    parts = [re.escape(query[0])]
+    for char in query[1:]:
+        parts.append('[^%s\n]*%s' % (re.escape(char), re.escape(char)))
+    return re.compile(''.join(parts))
+
+
+def joined_lines(lines):
+    # 所有行拼成一个字符串，正则在 C 层扫描；起始偏移用于把匹配位置换算成行号
+    starts = array('Q', [0])
+    pos = 0
+    for line in lines:
+        pos += len(line) + 1
+        starts.append(pos)
+    return '\n'.join(lines) + '\n', starts
+
+
+def character_bits(lines):
+    # 每个 ASCII 字符一个整数位图，第 i 位表示第 i 行包含该字符；
+    # 非 ASCII 字符种类可能很多，不建位图，查找时不用它们过滤
+    present = set(''.join(lines))
+    bits = {}
+    for char in present:
+        if char.isascii():
+            flags = bytes(map(operator.contains, reversed(lines), repeat(char)))
+            bits[char] = int(flags.translate(BIT_DIGITS) or b'0', 2)
+    return bits, present
+
+
+def candidate_lines(query, bits, present, count):
+    # 返回包含查询中所有字符的行号，候选太多时返回 None 表示不值得逐行检查
+    if not set(query) <= present:
+        return []
+    mask = -1
+    for char in set(query):
+        if char in bits:
+            mask &= bits[char]
+    if mask == -1:
+        return None
+    digits = bin(mask)[:1:-1]
+    if digits.count('1') > count * DENSE_CANDIDATES:
+        return None
+    return [match.start() for match in re.finditer('1', digits)]
+
+
+def matching_lines(pattern, text, starts, limit, seen, candidates=None):
+    # 按行的顺序返回前 limit 个匹配的行号，每行只取一次
+    lines = []
+    if candidates is not None:
+        # 只检查候选行，匹配不能跨行，限定在行内搜索不改变结果
+        for line in candidates:
+            if len(lines) >= limit:
+                break
+            if line not in seen and pattern.search(text, starts[line], starts[line + 1]):
+                seen.add(line)
+                lines.append(line)
+        return lines
+    pos = 0
+    while len(lines) < limit:
+        match = pattern.search(text, pos)
+        if match is None:
+            break
+        line = bisect.bisect_right(starts, match.start()) - 1
+        if line not in seen:
+            seen.add(line)
+            lines.append(line)
+        pos = starts[line + 1]
+    return lines
+
+
+class PathIndex:
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        # 相对目录 -> (mtime_ns, 文件名列表, 子目录名列表)
+        self.directories = {}
+        # 搜索用的快照整体替换，搜索时不需要加锁
+        self.snapshot = ([], '\n', array('Q', [0]), '\n', array('Q', [0]), {}, set())
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, root, cache_path):
+        index = cls(root)
+        try:
+            with open(cache_path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return index
+        if state.get('version') != INDEX_VERSION or state.get('root') != index.root:
+            return index
+        index.directories = state['directories']
+        index.rebuild()
+        return index
+
+    def save(self, cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with self.lock:
+            data = pickle.dumps({
+                'version': INDEX_VERSION,
+                'root': self.root,
+                'directories': self.directories,
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+        atomic_write(cache_path, [data])
+
+    def update(self, is_cancelled=None):
+        # 每个目录只做一次 stat，修改时间未变的目录沿用上次的列表
+        with self.lock:
+            old = self.directories
+        directories = {}
+        changed = False
+        pending = ['']
+        while pending:
+            if is_cancelled and is_cancelled():
+                raise OperationCancelled()
+            rel_dir = pending.pop()
+            path = os.path.join(self.root, rel_dir)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+            cached = old.get(rel_dir)
+            if cached and cached[0] == mtime:
+                files, subdirs = cached[1], cached[2]
+            else:
+                changed = True
+                files, subdirs = self.scan(path)
+            directories[rel_dir] = (mtime, files, subdirs)
+            pending.extend(os.path.join(rel_dir, name) for name in subdirs)
+        if len(directories) != len(old):
+            changed = True
+        if changed:
+            with self.lock:
+                self.directories = directories
+            self.rebuild()
+        return changed
+
+    def scan(self, path):
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if entry.name not in SKIP_DIRS:
+                            subdirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            pass
+        return files, subdirs
+
+    def rebuild(self):
+        # 按文件名长度、路径长度排序，同一匹配级别内较短的排在前面
+        with self.lock:
+            paths = [os.path.join(rel_dir, name).replace(os.sep, '/')
+                     for rel_dir, (mtime, files, subdirs) in self.directories.items()
+                     for name in files]
+        paths.sort(key=lambda path: (len(path) - path.rfind('/'), len(path)))
+        lowered = [path.lower() for path in paths]
+        names = [path[path.rfind('/') + 1:] for path in lowered]
+        name_text, name_starts = joined_lines(names)
+        path_text, path_starts = joined_lines(lowered)
+        bits, present = character_bits(lowered)
+        self.snapshot = (paths, name_text, name_starts, path_text, path_starts, bits, present)
+
+    def __len__(self):
+        return len(self.snapshot[0])
+
+    def search(self, query, limit=50, recent=()):
+        # 依次为：最近打开、文件名包含、文件名子序列、路径子序列
+        query = ''.join(query.lower().replace('\\', '/').split())
+        paths, name_text, name_starts, path_text, path_starts, bits, present = self.snapshot
+        if not query:
+            return [path for path in map(os.path.normpath, recent) if self.contains(path)][:limit]
+
+        pattern = subsequence_pattern(query)
+        results = []
+        for path in map(os.path.normpath, recent):
+            if len(results) >= limit:
+                return results
+            if self.contains(path):
+                rel_path = os.path.relpath(path, self.root).replace(os.sep, '/').lower()
+                if pattern.search(rel_path):
+                    results.append(path)
+
+        # 文件名的字符都在路径中，按路径的字符位图筛出的候选行对每一级都适用
+        candidates = candidate_lines(query, bits, present, len(paths))
+        seen = set()
+        recent_set = set(results)
+        tiers = [(re.compile(re.escape(query)), name_text, name_starts),
+                 (pattern, name_text, name_starts),
+                 (pattern, path_text, path_starts)]
+        if '/' in query:
+            # 包含路径分隔符时只按完整路径匹配
+            tiers = tiers[2:]
+        for tier_pattern, text, starts in tiers:
+            for line in matching_lines(tier_pattern, text, starts, limit - len(results), seen, candidates):
+                path = os.path.join(self.root, paths[line])
+                if path not in recent_set:
+                    results.append(os.path.normpath(path))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def contains(self, path):
+        return os.path.normcase(path).startswith(os.path.normcase(self.root + os.sep))
+
+
+def load_path_index(root, cache_path, is_cancelled=None):
+    # 读取上次保存的路径索引，增量更新后写回磁盘
+    index = PathIndex.load(root, cache_path)
+    if index.update(is_cancelled) or not os.path.exists(cache_path):
+        index.save(cache_path)
+    return index
\ No newline at end of file
@@ -0,0 +1,144 @@
+import json
+import logging
+import math
+import logging.handlers
+import queue
+import threading
+import time
+from collections import deque
+
+# 是否记录性能数据，关闭时所有接口只做一次布尔判断
+enabled = False
+# 内存中保留的最近记录数
+RECENT_LIMIT = 2000
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+_lock = threading.Lock()
+_recent = deque(maxlen=RECENT_LIMIT)
+# (操作名, 键) -> (开始时间, 附加字段)，用于跨越多个回调的异步操作
+_pending = {}
+_logger = None
+_listener = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        record(self.name, time.perf_counter() - self.started, **self.fields)
+        return False
+
+
+def enable(log_path=None):
+    # 记录写入按大小轮转的 JSON Lines 文件，写文件在后台线程中进行
+    global enabled, _logger, _listener
+    if log_path and _listener is None:
+        handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        records = queue.SimpleQueue()
+        _logger = logging.getLogger('editordemo.perf')
+        _logger.propagate = False
+        _logger.setLevel(logging.INFO)
+        _logger.addHandler(logging.handlers.QueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, handler)
+        _listener.start()
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+    with _lock:
+        _pending.clear()
+
+
+def shutdown():
+    global _listener, _logger
+    disable()
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _logger:
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+        _logger = None
+
+
+def record(name, duration, **fields):
+    if not enabled:
+        return
+    entry = {'time': time.time(), 'name': name, 'duration': duration,
+             'thread': threading.current_thread().name}
+    entry.update(fields)
+    with _lock:
+        _recent.append(entry)
+    if _logger:
+        _logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+def span(name, **fields):
+    # with perf.span('open.read', path=path): ...
+    if not enabled:
+        return NULL_SPAN
+    return _Span(name, fields)
+
+
+def begin(name, key, **fields):
+    # 开始一个在之后的回调中结束的操作，同一键重复开始时以最新的为准
+    if not enabled:
+        return
+    with _lock:
+        _pending[(name, key)] = (time.perf_counter(), fields)
+
+
+def end(name, key, **fields):
+    if not enabled:
+        return
+    with _lock:
+        started = _pending.pop((name, key), None)
+    if started is None:
+        return
+    start_time, begin_fields = started
+    begin_fields.update(fields)
+    record(name, time.perf_counter() - start_time, **begin_fields)
+
+
+def discard(name, key):
+    with _lock:
+        _pending.pop((name, key), None)
+
+
+def recent():
+    with _lock:
+        return list(_recent)
+
+
+def percentile(values, fraction):
+    # values 需已排序，取最近秩
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
\ No newline at end of file
@@ -0,0 +1,49 @@
+import multiprocessing
+from .errors import OperationCancelled
+
+# 父进程检查取消和子进程消息的间隔（秒）
+POLL_INTERVAL = 0.05
+
+
+def _run_child(connection, fn, args, kwargs):
+    def progress(done, total):
+        connection.send(('progress', done, total))
+
+    try:
+        result = fn(*args, progress=progress, **kwargs)
+    except Exception as e:
+        connection.send(('error', str(e)))
+    else:
+        connection.send(('result', result))
+    finally:
+        connection.close()
+
+
+def run_in_process(fn, *args, progress=None, is_cancelled=None, **kwargs):
+    # 在独立进程中运行 fn，转发进度；取消时直接结束子进程
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_child, args=(sender, fn, args, kwargs), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        while True:
+            if is_cancelled and is_cancelled():
+                process.terminate()
+                raise OperationCancelled()
+            if not receiver.poll(POLL_INTERVAL):
+                continue
+            try:
+                message = receiver.recv()
+            except EOFError:
+                raise RuntimeError("后台进程意外退出")
+            if message[0] == 'progress':
+                if progress:
+                    progress(*message[1:])
+            elif message[0] == 'result':
+                return message[1]
+            else:
+                raise ValueError(message[1])
+    finally:
+        receiver.close()
+        process.join()
\ No newline at end of file
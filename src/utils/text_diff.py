@@ -0,0 +1,60 @@
+from difflib import SequenceMatcher
+
+# 中间差异部分超过该行数时不再逐行比较，直接整体替换
+DIFF_LINE_LIMIT = 200000
+
+
+def _byte_offsets(lines):
+    # 每行起始处的 UTF-8 字节偏移，最后一项为总长度
+    offsets = [0]
+    total = 0
+    for line in lines:
+        total += len(line) if line.isascii() else len(line.encode('utf-8'))
+        offsets.append(total)
+    return offsets
+
+
+def line_edits(old, new):
+    # 计算把 old 变为 new 的最少行级编辑 [(起始字节, 结束字节, 替换文本)]，偏移基于 UTF-8
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+
+    # 先去掉首尾相同的行，大多数情况下差异只集中在中间一小段
+    prefix = 0
+    limit = min(len(old_lines), len(new_lines))
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    old_middle = old_lines[prefix:len(old_lines) - suffix]
+    new_middle = new_lines[prefix:len(new_lines) - suffix]
+    if not old_middle and not new_middle:
+        return []
+
+    offsets = _byte_offsets(old_lines)
+    if len(old_middle) + len(new_middle) > DIFF_LINE_LIMIT:
+        opcodes = [('replace', 0, len(old_middle), 0, len(new_middle))]
+    else:
+        opcodes = SequenceMatcher(None, old_middle, new_middle, autojunk=False).get_opcodes()
+
+    edits = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            continue
+        edits.append((offsets[prefix + i1], offsets[prefix + i2], ''.join(new_middle[j1:j2])))
+    return edits
+
+
+def apply_edits(text, edits):
+    # 在字符串上应用 line_edits 的结果，仅用于非编辑器场景
+    data = text.encode('utf-8')
+    parts = []
+    last = 0
+    for start, end, replacement in edits:
+        parts.append(data[last:start])
+        parts.append(replacement.encode('utf-8'))
+        last = end
+    parts.append(data[last:])
+    return b''.join(parts).decode('utf-8')
\ No newline at end of file
@@ -0,0 +1,56 @@
+import re
+from array import array
+
+# 每块查找的字节数
+CHUNK_SIZE = 4 * 1024 * 1024
+# 块前额外提供的上下文，使 \b、后顾断言等在块边界处得到正确结果
+LOOKBEHIND = 256
+# 块后额外提供的数据，跨越块边界的匹配最长不超过这么多字节
+OVERLAP = 64 * 1024
+
+GROUP_REFERENCE = re.compile(r'\\(?:\d|g<)')
+
+
+def compile_search(query, regex=False, case_sensitive=True, whole_word=False):
+    # 直接在编辑器的 UTF-8 字节上查找，位置即 Scintilla 的字节位置；
+    # 字节模式下忽略大小写和 \w、\b 只对 ASCII 字符生效
+    pattern = query if regex else re.escape(query)
+    if whole_word:
+        pattern = rf'\b(?:{pattern})\b'
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern.encode('utf-8'), flags)
+
+
+def replacement_template(replacement, regex=False):
+    # 返回 (替换字节, 是否需要对每个匹配展开分组引用)；
+    # 正则替换没有分组引用时只需处理一次 \n 等转义
+    data = replacement.encode('utf-8')
+    if not regex:
+        return data, False
+    if GROUP_REFERENCE.search(replacement):
+        return data, True
+    return re.match(b'', b'').expand(data), False
+
+
+def search_chunk(pattern, data, offset, base, limit, expand=None):
+    # data 对应文档中从 base 开始的字节，查找从 data[offset] 开始、起点在 limit 之前的匹配；
+    # 返回 (起点, 终点, 展开后的替换内容或 None, 下一块的起点)
+    starts = array('q')
+    ends = array('q')
+    replacements = [] if expand is not None else None
+    next_pos = limit
+    for match in pattern.finditer(data, offset):
+        start, end = match.span()
+        if base + start >= limit:
+            break
+        if start == end:
+            # 空匹配没有可以标记或替换的内容
+            continue
+        starts.append(base + start)
+        ends.append(base + end)
+        if replacements is not None:
+            replacements.append(match.expand(expand))
+        next_pos = max(next_pos, base + end)
+    return starts, ends, replacements, next_pos
\ No newline at end of file
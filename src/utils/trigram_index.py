@@ -0,0 +1,309 @@
+import multiprocessing
+import os
+import pickle
+import threading
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .errors import OperationCancelled
+from .file_io import atomic_write
+from .encoding import detect_encoding
+
+INDEX_VERSION = 1
+# 超过该大小的文件不建立索引
+MAX_FILE_SIZE = 4 * 1024 * 1024
+# 每个子进程任务处理的文件数
+BATCH_SIZE = 256
+# 删除的文件超过该比例时整理倒排表
+COMPACT_RATIO = 0.25
+SKIP_DIRS = {'node_modules', '__pycache__'}
+# 查询时同时尝试的文件编码
+QUERY_ENCODINGS = ['utf-8', 'gbk']
+# 短于一个三元组的查询无法用索引缩小范围，需要读取所有文件，不予查找
+MIN_QUERY_BYTES = 3
+SKIPPED = -1
+
+
+def file_trigrams(data):
+    # 不区分 ASCII 大小写；zip 和 set 在 C 层去重，只有不重复的三元组在 Python 中编码为整数
+    data = data.lower()
+    return {(a << 16) | (b << 8) | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+def is_binary(data):
+    return b'\0' in data[:8192]
+
+
+def index_batch(root, batch):
+    # 在子进程中运行：读取一批文件，返回这批文件的倒排表
+    postings = defaultdict(lambda: array('I'))
+    skipped = []
+    for file_id, rel_path in batch:
+        try:
+            with open(os.path.join(root, rel_path), 'rb') as f:
+                data = f.read(MAX_FILE_SIZE + 1)
+        except OSError:
+            skipped.append(file_id)
+            continue
+        if len(data) > MAX_FILE_SIZE or is_binary(data):
+            skipped.append(file_id)
+            continue
+        for trigram in file_trigrams(data):
+            postings[trigram].append(file_id)
+    return dict(postings), skipped
+
+
+class TrigramIndex:
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        # 文件编号 -> 相对路径，已删除或已变更的编号为 None
+        self.files = []
+        # 相对路径 -> (文件编号, mtime_ns, size)
+        self.stats = {}
+        # 三元组 -> 包含它的文件编号
+        self.postings = {}
+        self.dead = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, root, cache_path):
+        index = cls(root)
+        try:
+            with open(cache_path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return index
+        if state.get('version') != INDEX_VERSION or state.get('root') != index.root:
+            return index
+        index.files = state['files']
+        index.stats = state['stats']
+        index.postings = state['postings']
+        index.dead = state['dead']
+        return index
+
+    def save(self, cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with self.lock:
+            data = pickle.dumps({
+                'version': INDEX_VERSION,
+                'root': self.root,
+                'files': self.files,
+                'stats': self.stats,
+                'postings': self.postings,
+                'dead': self.dead,
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+        atomic_write(cache_path, [data])
+
+    def walk(self, is_cancelled=None):
+        current = {}
+        for directory, dirs, files in os.walk(self.root):
+            if is_cancelled and is_cancelled():
+                raise OperationCancelled()
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
+            for name in files:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                current[os.path.relpath(path, self.root)] = (st.st_mtime_ns, st.st_size)
+        return current
+
+    def update(self, progress=None, is_cancelled=None, max_workers=None):
+        # 只重新索引 mtime 或大小变化过的文件
+        current = self.walk(is_cancelled)
+        changed = [path for path, stat in current.items()
+                   if self.stats.get(path, (None,))[1:] != stat]
+        removed = [path for path in self.stats if path not in current]
+
+        with self.lock:
+            for path in removed + changed:
+                if path in self.stats:
+                    self.forget(path)
+            batch = []
+            batches = []
+            for path in changed:
+                file_id = len(self.files)
+                self.files.append(path)
+                self.stats[path] = (file_id,) + current[path]
+                batch.append((file_id, path))
+                if len(batch) >= BATCH_SIZE:
+                    batches.append(batch)
+                    batch = []
+            if batch:
+                batches.append(batch)
+
+        if batches:
+            self.index_batches(batches, progress, is_cancelled, max_workers)
+        if self.dead > len(self.files) * COMPACT_RATIO:
+            self.compact()
+        return len(changed), len(removed)
+
+    def index_batches(self, batches, progress, is_cancelled, max_workers):
+        # 使用 spawn 启动子进程，避免在带有 Qt 线程的进程中 fork
+        context = multiprocessing.get_context('spawn')
+        total = sum(len(batch) for batch in batches)
+        done = 0
+        with ProcessPoolExecutor(max_workers, mp_context=context) as executor:
+            futures = {executor.submit(index_batch, self.root, batch): batch for batch in batches}
+            try:
+                for future in as_completed(futures):
+                    if is_cancelled and is_cancelled():
+                        raise OperationCancelled()
+                    postings, skipped = future.result()
+                    self.merge(postings, skipped)
+                    done += len(futures[future])
+                    if progress:
+                        progress(done, total)
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                # 未完成的文件下次再索引
+                with self.lock:
+                    for future, batch in futures.items():
+                        if (future.cancelled() or not future.done()
+                                or future.exception() is not None):
+                            for file_id, path in batch:
+                                self.forget(path)
+                raise
+
+    def merge(self, postings, skipped):
+        with self.lock:
+            for trigram, ids in postings.items():
+                existing = self.postings.get(trigram)
+                if existing is None:
+                    self.postings[trigram] = ids
+                else:
+                    existing.extend(ids)
+            for file_id in skipped:
+                path = self.files[file_id]
+                self.stats[path] = (SKIPPED,) + self.stats[path][1:]
+                self.files[file_id] = None
+                self.dead += 1
+
+    def forget(self, path):
+        file_id = self.stats.pop(path)[0]
+        if file_id != SKIPPED:
+            self.files[file_id] = None
+            self.dead += 1
+
+    def compact(self):
+        # 重新编号，去掉倒排表中已失效的文件
+        with self.lock:
+            mapping = {}
+            files = []
+            for file_id, path in enumerate(self.files):
+                if path is not None:
+                    mapping[file_id] = len(files)
+                    files.append(path)
+            postings = {}
+            for trigram, ids in self.postings.items():
+                kept = array('I', (mapping[i] for i in ids if i in mapping))
+                if kept:
+                    postings[trigram] = kept
+            for path, (file_id, mtime, size) in self.stats.items():
+                if file_id != SKIPPED:
+                    self.stats[path] = (mapping[file_id], mtime, size)
+            self.files = files
+            self.postings = postings
+            self.dead = 0
+
+    def candidates(self, needle):
+        trigrams = file_trigrams(needle)
+        if not trigrams:
+            return {i for i, path in enumerate(self.files) if path is not None}
+        # 从最短的倒排表开始求交集
+        lists = sorted((self.postings.get(t, ()) for t in trigrams), key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            if not result:
+                break
+            result.intersection_update(ids)
+        return result
+
+    def search(self, query, max_results=200, max_lines=20, progress=None, is_cancelled=None):
+        needles = []
+        for encoding in QUERY_ENCODINGS:
+            try:
+                needle = query.encode(encoding).lower()
+            except UnicodeEncodeError:
+                continue
+            if len(needle) >= MIN_QUERY_BYTES and needle not in (n for n, _ in needles):
+                needles.append((needle, encoding))
+
+        with self.lock:
+            candidates = {}
+            for needle, encoding in needles:
+                for file_id in self.candidates(needle):
+                    path = self.files[file_id]
+                    if path is not None:
+                        candidates.setdefault(path, (needle, encoding))
+
+        # 先按文件名是否包含查询词和路径长度排序候选，只读取到凑够 max_results 个结果为止
+        ranked = []
+        for path, (needle, encoding) in candidates.items():
+            name_match = needle in os.path.basename(path).encode(encoding, 'replace').lower()
+            ranked.append((not name_match, len(path), path, needle, name_match))
+        ranked.sort()
+
+        results = []
+        for done, (_, _, path, needle, name_match) in enumerate(ranked):
+            if len(results) >= max_results:
+                break
+            if is_cancelled and is_cancelled():
+                raise OperationCancelled()
+            if progress and done % 100 == 0:
+                progress(done, len(ranked))
+            hits = self.verify(path, needle, max_lines)
+            if hits:
+                count, lines = hits
+                # 文件名中包含查询词的排在前面，其次按匹配次数和路径长度
+                score = count + (100 if name_match else 0) - len(path) / 1000
+                results.append((score, path, count, lines))
+        results.sort(key=lambda r: r[0], reverse=True)
+        return [(os.path.join(self.root, path), count, lines)
+                for score, path, count, lines in results[:max_results]]
+
+    def verify(self, path, needle, max_lines):
+        # 候选文件只说明包含全部三元组，需要实际查找确认
+        try:
+            with open(os.path.join(self.root, path), 'rb') as f:
+                data = f.read(MAX_FILE_SIZE + 1)
+        except OSError:
+            return None
+        lowered = data.lower()
+        pos = lowered.find(needle)
+        if pos == -1:
+            return None
+        # 预览按文件自身的编码解码，而不是查询词使用的编码
+        encoding = detect_encoding(data).encoding
+        count = 0
+        lines = []
+        line_no = 0
+        line_start_pos = 0
+        while pos != -1:
+            count += 1
+            if len(lines) < max_lines:
+                line_no += data.count(b'\n', line_start_pos, pos)
+                line_start_pos = pos
+                if lines and lines[-1][0] == line_no:
+                    # 同一行的多次匹配只列一次
+                    pos = lowered.find(needle, pos + len(needle))
+                    continue
+                line_start = data.rfind(b'\n', 0, pos) + 1
+                line_end = data.find(b'\n', pos)
+                if line_end == -1:
+                    line_end = len(data)
+                preview = data[line_start:min(line_end, line_start + 200)]
+                lines.append((line_no, preview.decode(encoding, 'replace').strip()))
+            pos = lowered.find(needle, pos + len(needle))
+        return count, lines
+
+def load_index(root, cache_path, progress=None, is_cancelled=None):
+    # 读取上次保存的索引，增量更新后写回磁盘
+    index = TrigramIndex.load(root, cache_path)
+    changed, removed = index.update(progress, is_cancelled)
+    if changed or removed or not os.path.exists(cache_path):
+        index.save(cache_path)
+    return index
\ No newline at end of file
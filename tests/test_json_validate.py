@@ -0,0 +1,38 @@
+import unittest
+from src.utils.json_validate import scan_json, ValidationState
+
+
+def validate(state, data, chunk, interval):
+    # 与 JsonValidator 相同的分块方式：从检查点继续，单个记号超过一块时扩大下一块
+    start, stack, expect = state.resume_point()
+    while True:
+        end = min(len(data), start + chunk)
+        result = scan_json(data[start:end], start, stack, expect, end == len(data),
+                           state.convergence_points(start, end), interval)
+        state.apply(start, result)
+        if result.status != 'incomplete':
+            return state.error
+        if result.pos == start:
+            chunk *= 2
+        start, stack, expect = result.pos, result.stack, result.expect
+
+
+class IncrementalValidationTest(unittest.TestCase):
+    def test_stale_checkpoint_at_chunk_end_is_replaced(self):
+        data = bytearray(b'{"a":1,"b":[2,3],"c":4}')
+        state = ValidationState()
+        self.assertIsNone(validate(state, bytes(data), 4, 2))
+        data[11:11] = b'['
+        state.edited(11, 1, 0)
+        validate(state, bytes(data), 4, 2)
+        del data[19:20]
+        state.edited(19, 0, 1)
+        self.assertEqual(bytes(data), b'{"a":1,"b":[[2,3],"":4}')
+        error = validate(state, bytes(data), 4, 2)
+        self.assertEqual(error[0], 20)
+        fresh = validate(ValidationState(), bytes(data), 4, 2)
+        self.assertEqual(error, fresh)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file